@@ -0,0 +1,148 @@
+"""Streaming client for the local Ollama server behind the Eco AI Assistant page."""
+import json
+import threading
+import time
+
+import requests
+
+import telemetry
+
+SYSTEM_PROMPT = "You are a helpful AI environmental assistant in Bangladesh."
+
+
+def build_prompt(question, context="", follow_up=False):
+    """Prompt for /api/generate; `context` holds numbered notes from retrieval.format_context().
+
+    A follow-up is sent along with the previous turn's context tokens, which already start with
+    the system prompt, so only the new question (and its notes) is added.
+    """
+    if follow_up:
+        notes = f"Notes:\n{context}\n\n" if context else ""
+        return f"{notes}Question: {question}\n\nAnswer:"
+    if not context:
+        return f"{SYSTEM_PROMPT}\n\nQuestion: {question}\n\nAnswer:"
+    return (f"{SYSTEM_PROMPT} Answer briefly, using the notes below when they are relevant and citing them "
+            f"like [1].\n\nNotes:\n{context}\n\nQuestion: {question}\n\nAnswer:")
+
+
+class OllamaError(Exception):
+    def __init__(self, status_code, message=""):
+        super().__init__(message or f"Ollama server error: {status_code}")
+        self.status_code = status_code
+
+
+class Generation:
+    """One streamed /api/generate call; iterate it to receive response tokens as they arrive.
+
+    `context` is the token list Ollama returned at the end of the previous turn; passing it back
+    continues that conversation without re-sending (or re-evaluating) the earlier turns.
+    `keep_alive` is how long Ollama keeps the model loaded afterwards ("30m", or -1 for ever).
+    """
+
+    def __init__(self, url, model, prompt, connect_timeout=3.05, read_timeout=60, total_timeout=300,
+                 session=None, context=None, keep_alive=None):
+        self.url = url
+        self.payload = {"model": model, "prompt": prompt, "stream": True}
+        if context:
+            self.payload["context"] = list(context)
+        if keep_alive is not None:
+            self.payload["keep_alive"] = keep_alive
+        self.timeout = (connect_timeout, read_timeout)   # read timeout applies between chunks
+        self.total_timeout = total_timeout
+        self.session = session or requests
+        self._cancelled = threading.Event()
+        self._response = None
+
+        self.started = None
+        self.first_token_at = None
+        self.finished_at = None
+        self.tokens = 0
+        self.text = ""
+        self.final = {}       # last NDJSON chunk (done=true) with Ollama's own counters
+
+    def cancel(self):
+        self._cancelled.set()
+        if self._response is not None:
+            self._response.close()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def time_to_first_token(self):
+        return None if self.first_token_at is None else self.first_token_at - self.started
+
+    @property
+    def tokens_per_sec(self):
+        if self.final.get("eval_count") and self.final.get("eval_duration"):
+            return self.final["eval_count"] / (self.final["eval_duration"] / 1e9)
+        if self.first_token_at is None or self.tokens < 2:
+            return None
+        end = self.finished_at or time.perf_counter()
+        return (self.tokens - 1) / max(end - self.first_token_at, 1e-9)
+
+    @property
+    def context(self):
+        """Token list to pass as `context` for the next turn, or None before the stream finishes."""
+        return self.final.get("context")
+
+    @property
+    def durations(self):
+        """Seconds Ollama spent loading the model, evaluating the prompt and generating, plus the
+        prompt token count; empty until the stream finishes."""
+        if not self.final:
+            return {}
+        return {"load": self.final.get("load_duration", 0) / 1e9,
+                "prompt_eval": self.final.get("prompt_eval_duration", 0) / 1e9,
+                "eval": self.final.get("eval_duration", 0) / 1e9,
+                "total": self.final.get("total_duration", 0) / 1e9,
+                "prompt_tokens": self.final.get("prompt_eval_count", 0)}
+
+    def __iter__(self):
+        self.started = time.perf_counter()
+        deadline = self.started + self.total_timeout
+        try:
+            # Inside the try, so a refused or timed-out connection is still recorded as an upstream error
+            self._response = self.session.post(self.url, json=self.payload, stream=True, timeout=self.timeout)
+            if self._response.status_code != 200:
+                raise OllamaError(self._response.status_code)
+            for line in self._response.iter_lines():
+                if self.cancelled:
+                    break
+                if time.perf_counter() > deadline:
+                    raise TimeoutError(f"Ollama generation exceeded {self.total_timeout}s")
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if "error" in chunk:
+                    raise OllamaError(self._response.status_code, chunk["error"])
+                token = chunk.get("response", "")
+                if token:
+                    if self.first_token_at is None:
+                        self.first_token_at = time.perf_counter()
+                    self.tokens += 1
+                    self.text += token
+                    yield token
+                if chunk.get("done"):
+                    self.final = chunk
+                    break
+        except Exception:
+            if not self.cancelled:
+                raise
+            # cancel() closed the connection under us; end the stream quietly
+        finally:
+            self.finished_at = time.perf_counter()
+            if self._response is not None:
+                self._response.close()
+            self._record()
+
+    def _record(self):
+        error = not self.final and not self.cancelled
+        telemetry.observe("upstream", self.finished_at - self.started, error, target="ollama")
+        if self.first_token_at is not None:
+            telemetry.observe("llm_first_token", self.time_to_first_token)
+        # Where Ollama itself spent the time
+        for phase, seconds in self.durations.items():
+            if phase in ("load", "prompt_eval", "eval"):
+                telemetry.observe("ollama_phase", seconds, phase=phase)
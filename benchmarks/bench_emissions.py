@@ -0,0 +1,75 @@
+"""Micro-benchmarks for the emission math at 1, 10k and 1M households.
+
+    python benchmarks/bench_emissions.py --json emissions.json
+
+Times emissions.score, EmissionResult.to_frame, score_versions (every
+registry factor set at once), as_matrix on a survey-shaped DataFrame, and
+calculate() for the single household behind the calculator pages.
+Inputs are random but seeded, so runs are comparable. Each case is timed
+with timeit (best and median of `--repeat` rounds). Its peak
+allocation is measured with tracemalloc on one extra call.
+"""
+import argparse
+import timeit
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import common
+import emissions
+from emission_factors import default_registry
+
+
+def households(n, seed=0):
+    rng = np.random.default_rng(seed)
+    highs = np.array([100, 100, 50, 50, 50, 3000, 1000, 50, 500, 10, 50], dtype=np.float64)
+    return rng.random((n, len(emissions.CATEGORIES))) * highs
+
+
+def cases(sizes):
+    factors = default_registry().matrix
+    one = dict(zip(emissions.CATEGORIES, households(1)[0]))
+    yield "calculate/1", 1, lambda: emissions.calculate(one)
+    for n in sizes:
+        matrix = households(n)
+        frame = pd.DataFrame(matrix, columns=list(emissions.CATEGORIES))
+        result = emissions.score(matrix)
+        yield f"score/{n}", n, lambda m=matrix: emissions.score(m)
+        yield f"to_frame/{n}", n, lambda r=result: r.to_frame()
+        yield f"score_versions/{n}", n, lambda m=matrix: emissions.score_versions(m, factors)
+        yield f"as_matrix/{n}", n, lambda f=frame: emissions.as_matrix(f)
+
+
+def measure(fn, repeat):
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()   # enough calls per round to take at least 0.2 s
+    per_call_ms = np.array(timer.repeat(repeat, number)) / number * 1000
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"best_ms": float(per_call_ms.min()), "median_ms": float(np.median(per_call_ms)),
+            "alloc_peak_kb": peak / 1024}
+
+
+def run(sizes, repeat):
+    rows = []
+    for name, n, fn in cases(sizes):
+        row = {"name": name, "households": n, **measure(fn, repeat)}
+        row["households_per_sec"] = n / (row["best_ms"] / 1000)
+        rows.append(row)
+        print(f"{name:28} best {row['best_ms']:10.4f} ms  median {row['median_ms']:10.4f} ms  "
+              f"{row['households_per_sec']:14,.0f} households/s  alloc peak {row['alloc_peak_kb']:10.0f} KiB")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="report path (default: benchmarks/results/emissions-<time>.json)")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat)
+    print(f"wrote {common.write_report('emissions', results, args.json, repeat=args.repeat)}")
@@ -0,0 +1,211 @@
+"""Rerun cost of every page, driven headlessly through Streamlit's AppTest.
+
+    python benchmarks/bench_pages.py                      # all pages, JSON under benchmarks/results/
+    python benchmarks/bench_pages.py --pages search_page --repeat 20 --json search.json
+
+stub_server.py stands in for wttr.in, DuckDuckGo and Ollama, and speech
+uses the silent TTS backend, so runs need no network and are repeatable.
+Assistant answers still go through the speech pipeline; the silent
+backend makes a short blank clip, so audio costs a page next to nothing.
+
+Each page runs in its own subprocess with a fresh data directory. That
+way peak RSS is per page and one page's caches don't warm another's.
+A page is opened once (cold: first import and first render) and then
+replays a short user journey `--repeat` times, e.g. switching city or
+dragging a slider. Each step is timed end to end, including AppTest's own
+overhead. Allocations are measured with tracemalloc in a separate pass,
+because tracing slows everything down.
+
+--no-memo runs the pages with ECO_MEMO=0 (no memoized sections), so
+the saving can be measured on one build:
+
+    python benchmarks/bench_pages.py --no-memo --json off.json
+    python benchmarks/bench_pages.py --json on.json
+    python benchmarks/compare.py off.json on.json --all
+
+AppTest always reruns the whole script, so fragment savings show up in
+load_test.py rather than here.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import common
+
+LABELS = {
+    "weather_page": "🏙️ Weather",
+    "calculator_page": "🧮 Emission Calculator",
+    "breakdown_page": "📊 Emission Breakdown",
+    "search_page": "🔍 Eco Search",
+    "assistant_page": "🤖 Eco AI Assistant",
+    "tasks_page": "✅ Tasks & Rewards",
+}
+
+QUESTIONS = [
+    "How to save electricity?",
+    "How can I reduce plastic waste at home?",
+    "Is rooftop solar worth it in Dhaka?",
+    "What should I do on days with bad air quality?",
+    "How do I compost kitchen waste?",
+    "Which transport is greenest for a daily commute?",
+    "How can farmers adapt to salinity in the south?",
+    "What is the Bangladesh Delta Plan?",
+]
+
+
+def widget(elements, label):
+    return next(e for e in elements if e.label == label)
+
+
+# Journeys: (step name, interaction) pairs; the interaction gets the AppTest and the repeat index,
+# and the harness times the rerun that follows it.
+JOURNEYS = {
+    "weather_page": [
+        ("rerun", lambda at, i: None),
+        ("switch city", lambda at, i: widget(at.selectbox, "Select a city for trend analysis:")
+            .set_value(["Sylhet", "Khulna"][i % 2])),
+        ("switch map view", lambda at, i: widget(at.radio, "Map view").set_value(["Household grid", "Districts"][i % 2])),
+    ],
+    "calculator_page": [
+        ("rerun", lambda at, i: None),
+        ("drag slider", lambda at, i: widget(at.slider, "🔌 Electricity (kWh/month)").set_value(300.0 + 50 * (i % 2))),
+        ("calculate", lambda at, i: widget(at.button, "Calculate Emissions").click()),
+        ("submit household", lambda at, i: widget(at.button, "Submit Household").click()),
+    ],
+    "breakdown_page": [
+        ("rerun", lambda at, i: None),
+        ("drag slider", lambda at, i: widget(at.slider, "🔌 Monthly Electricity Usage (kWh)")
+            .set_value(300.0 + 50 * (i % 2))),
+    ],
+    "search_page": [
+        ("rerun", lambda at, i: None),
+        ("library search", lambda at, i: (widget(at.text_input, "Search eco-friendly topics:").input("solar home system"),
+                                          widget(at.button, "Search").click())),
+        ("web search", lambda at, i: (widget(at.text_input, "Search eco-friendly topics:").input("geothermal heat pumps"),
+                                      widget(at.button, "Search").click())),
+    ],
+    "assistant_page": [
+        ("rerun", lambda at, i: None),
+        ("ask", lambda at, i: (at.text_area[0].input(QUESTIONS[i % len(QUESTIONS)]),
+                               widget(at.button, "Get AI Answer").click())),
+        ("ask again (cached)", lambda at, i: (at.text_area[0].input(QUESTIONS[0]),
+                                              widget(at.button, "Get AI Answer").click())),
+    ],
+    "tasks_page": [
+        ("rerun", lambda at, i: None),
+        ("new user", lambda at, i: widget(at.text_input, "👤 Username (to keep your progress across visits)")
+            .input(f"bench-{os.getpid()}-{i}")),
+        ("tick task", lambda at, i: [c for c in at.checkbox if c.key.startswith("daily_task_")][0].check()),
+        ("answer question", lambda at, i: at.radio(key="quiz_q0").set_value(at.radio(key="quiz_q0").options[i % 4])),
+        ("submit quiz", lambda at, i: widget(at.button, "Submit Quiz").click()),
+    ],
+}
+
+
+def run_step(at, interact, i):
+    interact(at, i)
+    start = time.perf_counter()
+    at.run()
+    elapsed = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return elapsed
+
+
+def bench_page(page, repeat, timeout):
+    """Runs inside the child process; returns this page's result rows."""
+    from streamlit.testing.v1 import AppTest
+
+    rss_start = common.peak_rss_mb()
+    at = AppTest.from_file(os.path.join(common.ROOT, "app.py"), default_timeout=timeout)
+    start = time.perf_counter()
+    at.run()
+    at.sidebar.radio[0].set_value(LABELS[page]).run()
+    cold_ms = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+    journey = JOURNEYS[page]
+    samples = {name: [] for name, _ in journey}
+    for i in range(repeat):
+        for name, interact in journey:
+            samples[name].append(run_step(at, interact, i))
+
+    allocations = {}
+    tracemalloc.start()
+    for name, interact in journey:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        run_step(at, interact, repeat)
+        current, peak = tracemalloc.get_traced_memory()
+        allocations[name] = {"alloc_peak_kb": (peak - before) / 1024, "alloc_retained_kb": (current - before) / 1024}
+    tracemalloc.stop()
+
+    rows = [{"name": f"{page}/cold", "ms": cold_ms}]
+    rows += [{"name": f"{page}/{name}", **common.summarize(samples[name]), **allocations[name]} for name, _ in journey]
+    rows.append({"name": f"{page}/process", "rss_before_app_mb": rss_start, "peak_rss_mb": common.peak_rss_mb()})
+    return rows
+
+
+def run(pages, repeat, timeout, llm_delay, verbose=False, memo=True):
+    import stub_server
+
+    server = stub_server.start(token_delay=llm_delay)
+    upstream = f"http://127.0.0.1:{server.server_port}"
+    results = []
+    for page in pages:
+        with tempfile.TemporaryDirectory() as data_dir:
+            env = {**os.environ, "ECO_DATA_DIR": data_dir, "WEATHER_API": f"{upstream}/weather/",
+                   "DUCKDUCKGO_API": f"{upstream}/search", "OLLAMA_URL": f"{upstream}/api/generate",
+                   "TELEMETRY_PORT": "0", "TTS_BACKEND": "silent", "ECO_PROFILE_RATE": "0",
+                   "ECO_MEMO": "1" if memo else "0"}
+            cmd = [sys.executable, os.path.abspath(__file__), "--child", page, "--repeat", str(repeat),
+                   "--timeout", str(timeout)]
+            proc = subprocess.run(cmd, env=env, cwd=common.ROOT, stdout=subprocess.PIPE,
+                                  stderr=None if verbose else subprocess.PIPE, text=True)
+            if proc.returncode != 0:
+                raise RuntimeError(f"{page} failed:\n{proc.stderr or ''}")
+            rows = json.loads(proc.stdout.strip().splitlines()[-1])
+            results += rows
+            print_rows(rows)
+    server.shutdown()
+    return results, dict(server.counts)
+
+
+def print_rows(rows):
+    for row in rows:
+        if "p50_ms" in row:
+            print(f"{row['name']:42} p50 {row['p50_ms']:8.1f} ms  p95 {row['p95_ms']:8.1f} ms  "
+                  f"alloc peak {row['alloc_peak_kb']:9.0f} KiB")
+        elif "ms" in row:
+            print(f"{row['name']:42} {row['ms']:12.1f} ms")
+        else:
+            print(f"{row['name']:42} peak RSS {row['peak_rss_mb']:7.0f} MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", nargs="+", choices=list(LABELS), default=list(LABELS))
+    parser.add_argument("--repeat", type=int, default=10, help="times each journey is replayed")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds a single rerun may take")
+    parser.add_argument("--llm-delay", type=float, default=0.0, help="seconds between stub LLM tokens")
+    parser.add_argument("--json", help="report path (default: benchmarks/results/pages-<time>.json)")
+    parser.add_argument("--verbose", action="store_true", help="show the app's own log output")
+    parser.add_argument("--no-memo", action="store_true", help="run with memoized sections turned off (ECO_MEMO=0)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(bench_page(args.child, args.repeat, args.timeout)))
+    else:
+        results, upstream_calls = run(args.pages, args.repeat, args.timeout, args.llm_delay, args.verbose,
+                                      not args.no_memo)
+        print(f"upstream calls: {upstream_calls}")
+        path = common.write_report("pages", results, args.json, repeat=args.repeat, llm_delay=args.llm_delay,
+                                   memo=not args.no_memo, upstream_calls=upstream_calls)
+        print(f"wrote {path}")
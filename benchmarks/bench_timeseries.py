@@ -0,0 +1,88 @@
+"""Weather history: append cost and trend-read latency over years of data.
+
+    python benchmarks/bench_timeseries.py --years 5 --cities 20 --json timeseries.json
+
+Synthetic observed readings every 3 hours are appended a day at a time for a
+few cities, the way the prefetcher writes them. The run then
+compares reading a precomputed rollup (cold and warm) with aggregating the
+raw partitions on every read. Daily and monthly rollups over several
+years should read in milliseconds.
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import common
+import timeseries
+
+
+def readings(start, days, seed):
+    rng = np.random.default_rng(seed)
+    ts = pd.date_range(start, periods=days * 8, freq="3h")
+    season = 5 * np.sin(2 * np.pi * ts.dayofyear.to_numpy() / 365)
+    frame = pd.DataFrame({"ts": ts, "temp_c": 26 + season + rng.normal(0, 2, len(ts)),
+                          "humidity": rng.uniform(45, 95, len(ts))})
+    for column in timeseries.FIELDS.values():
+        if column not in frame:
+            frame[column] = np.nan
+    return frame
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def run(years, cities, repeat):
+    rows = []
+    with tempfile.TemporaryDirectory() as root:
+        history = timeseries.WeatherHistory(root)
+        days = int(years * 365)
+        names = [f"city-{i}" for i in range(cities)]
+        start = time.perf_counter()
+        for i, city in enumerate(names):
+            frame = readings("2020-01-01", days, seed=i)
+            # Bulk backfill a month at a time, then time single-day appends on top
+            for _, month in frame.groupby(frame["ts"].dt.strftime("%Y-%m")):
+                history.append(city, month)
+        backfill_s = time.perf_counter() - start
+        rows.append({"name": "backfill", "ms": backfill_s * 1000, "rows": days * 8 * cities})
+
+        later = readings(pd.Timestamp("2020-01-01") + pd.Timedelta(days=days), 30, seed=99)
+        daily = [later.iloc[d * 8:(d + 1) * 8] for d in range(30)]
+        append_ms = [timed(lambda chunk=chunk: history.append(names[0], chunk), 1)[0] for chunk in daily]
+        rows.append({"name": "append/day", **common.summarize(append_ms)})
+
+        for freq in ("daily", "monthly"):
+            cold = timed(lambda: timeseries.WeatherHistory(root).rollup(names[-1], freq), repeat)
+            warm = timed(lambda: history.rollup(names[-1], freq), repeat)
+            scan = timed(lambda: timeseries.aggregate(history.raw(names[-1]), freq), max(1, repeat // 10))
+            rows.append({"name": f"rollup/{freq}/cold", **common.summarize(cold)})
+            rows.append({"name": f"rollup/{freq}/warm", **common.summarize(warm)})
+            rows.append({"name": f"raw+aggregate/{freq}", **common.summarize(scan)})
+        rows.append({"name": "process", "peak_rss_mb": common.peak_rss_mb()})
+    for row in rows:
+        if "p50_ms" in row:
+            print(f"{row['name']:28} p50 {row['p50_ms']:9.2f} ms  p95 {row['p95_ms']:9.2f} ms")
+        elif "ms" in row:
+            print(f"{row['name']:28} {row['ms']:12.0f} ms for {row['rows']:,} rows")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--cities", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--json", help="report path (default: benchmarks/results/timeseries-<time>.json)")
+    args = parser.parse_args()
+
+    results = run(args.years, args.cities, args.repeat)
+    print(f"wrote {common.write_report('timeseries', results, args.json, years=args.years, cities=args.cities)}")
@@ -0,0 +1,69 @@
+"""Helpers shared by the benchmark scripts: run metadata, latency summaries and JSON reports.
+
+Every report is {"benchmark", "meta", "results"}, where each result row has
+a unique "name" plus its measurements, so compare.py can line up any two
+runs of the same benchmark.
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from importlib import metadata
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+PACKAGES = ("numpy", "pandas", "pyarrow", "plotly", "pydeck", "streamlit")
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return out.stdout.strip() + ("-dirty" if dirty else "") or None
+    except OSError:
+        return None
+
+
+def environment():
+    versions = {}
+    for name in PACKAGES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    return {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": git_commit(),
+            "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+            "packages": versions}
+
+
+def summarize(samples_ms):
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    return {"n": len(samples), "mean_ms": float(samples.mean()), "p50_ms": float(np.percentile(samples, 50)),
+            "p95_ms": float(np.percentile(samples, 95)), "max_ms": float(samples.max())}
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far."""
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024   # bytes on macOS, KiB elsewhere
+
+
+def write_report(benchmark, results, path=None, **extra):
+    """Write the report to `path`, or to benchmarks/results/<benchmark>-<time>.json; returns the path."""
+    report = {"benchmark": benchmark, "meta": {**environment(), **extra}, "results": results}
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{benchmark}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
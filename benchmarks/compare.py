@@ -0,0 +1,64 @@
+"""Compare two benchmark reports and flag regressions.
+
+    python benchmarks/compare.py benchmarks/results/pages-20250101-120000.json /tmp/pages.json
+
+Rows are matched by name. Every lower-is-better metric both reports have
+is compared as new / old. The exit status is 1 when any of them grew by
+more than --threshold (default 1.25, i.e. 25% slower or bigger), so the
+script can gate CI. Page timings jitter by a few milliseconds between
+runs, so pass e.g. --min-ms 2 when comparing page reports.
+"""
+import argparse
+import json
+import sys
+
+METRICS = ("ms", "p50_ms", "p95_ms", "best_ms", "median_ms", "alloc_peak_kb", "peak_rss_mb")
+
+
+def load(path):
+    with open(path) as f:
+        report = json.load(f)
+    return report, {row["name"]: row for row in report["results"] if "name" in row}
+
+
+def compare(old_rows, new_rows, threshold, min_ms=0.0, metrics=METRICS):
+    """[(name, metric, old, new, ratio, regressed)] for every metric present in both runs;
+    timings that grew by less than `min_ms` never count as regressions."""
+    out = []
+    for name, new in new_rows.items():
+        old = old_rows.get(name)
+        if old is None:
+            continue
+        for metric in metrics:
+            if old.get(metric) is None or new.get(metric) is None:
+                continue
+            a, b = old[metric], new[metric]
+            ratio = b / a if a else float("inf") if b else 1.0
+            timing = metric == "ms" or metric.endswith("_ms")
+            regressed = ratio > threshold and not (timing and b - a < min_ms)
+            out.append((name, metric, a, b, ratio, regressed))
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    parser.add_argument("--min-ms", type=float, default=0.0, help="ignore timings that grew by less than this")
+    parser.add_argument("--all", action="store_true", help="list every metric, not just regressions")
+    args = parser.parse_args()
+
+    old_report, old_rows = load(args.old)
+    new_report, new_rows = load(args.new)
+    if old_report.get("benchmark") != new_report.get("benchmark"):
+        sys.exit(f"different benchmarks: {old_report.get('benchmark')} vs {new_report.get('benchmark')}")
+    print(f"old: {old_report['meta'].get('commit')} {old_report['meta'].get('timestamp')}")
+    print(f"new: {new_report['meta'].get('commit')} {new_report['meta'].get('timestamp')}")
+
+    rows = compare(old_rows, new_rows, args.threshold, args.min_ms)
+    regressions = [r for r in rows if r[5]]
+    for name, metric, a, b, ratio, regressed in (rows if args.all else regressions):
+        print(f"{'REGRESSED' if regressed else '':9} {name:42} {metric:14} {a:12.3f} -> {b:12.3f}  x{ratio:.2f}")
+    print(f"{len(regressions)} regression(s) in {len(rows)} comparisons (threshold x{args.threshold})")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,472 @@
+"""Load test: many concurrent browser sessions against a running Streamlit server.
+
+    python benchmarks/load_test.py --users 200 --ramp 60 --duration 300 --latency 0.3
+    python benchmarks/load_test.py --url http://127.0.0.1:8501 --users 50   # an app you started yourself
+
+By default the script starts stub_server.py with the requested upstream
+latency, then runs `streamlit run app.py` against it with a fresh data
+directory and the silent TTS backend, so nothing leaves the machine.
+
+Each simulated user opens the same websocket a browser tab would
+(/_stcore/stream) and drives the app by sending widget values, exactly as
+the frontend does. Users loop over weighted journeys (see --mix): switch
+city on the weather page, drag sliders and calculate, take the daily quiz,
+or ask the AI assistant. Between steps they wait for an exponentially
+distributed think time. A step's latency runs from sending the widget
+change until the server reports the rerun finished. Steps that time out,
+render an exception or hit a missing widget count as errors. App-level
+warnings (e.g. "the assistant is busy") are tallied separately.
+
+Widgets inside an st.fragment rerun only their fragment, as in a browser.
+--no-memo starts the app with ECO_MEMO=0 (full-page reruns, no memoized
+sections), so two runs show what the fragments save under load.
+
+While the test runs, the server's CPU and RSS are sampled from /proc.
+The report has one row per journey step (p50/p95/p99), an overall row,
+and a timeline (every --interval seconds) of active users, reruns/s,
+p95 latency, CPU and memory.
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import Counter
+
+import numpy as np
+from websockets.asyncio.client import connect
+
+import common
+from bench_pages import LABELS, QUESTIONS
+from config import CITIES
+from streamlit.proto.Alert_pb2 import Alert
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+PAGE = "Select a Page"
+WIDGETS = ("button", "checkbox", "radio", "selectbox", "slider", "text_area", "text_input")
+DONE = (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_WITH_COMPILE_ERROR,
+        ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY)
+
+
+class StepError(Exception):
+    pass
+
+
+class Session:
+    """One browser tab. Widget values the user has set are re-sent with every rerun, like the frontend does;
+    button clicks are sent once. Changing a widget that lives in an st.fragment reruns only that fragment."""
+
+    def __init__(self, url, timeout):
+        self.url = url
+        self.timeout = timeout
+        self.widgets = {}   # label, and key for keyed widgets -> (kind, proto, fragment id) as last rendered
+        self.states = {}    # widget id -> WidgetState
+        self.alerts = []    # error/warning texts the last rerun showed
+        self._ws = None
+        self._reader = None
+        self._seen = {}
+        self._exceptions = []
+        self._finished = None
+
+    async def open(self):
+        self._ws = await connect(self.url, subprotocols=["streamlit"], max_size=None, open_timeout=self.timeout)
+        self._reader = asyncio.create_task(self._read())
+        await self.rerun({})
+
+    async def close(self):
+        if self._reader:
+            self._reader.cancel()
+        if self._ws:
+            await self._ws.close()
+
+    async def _read(self):
+        try:
+            async for data in self._ws:
+                msg = ForwardMsg()
+                msg.ParseFromString(data)
+                kind = msg.WhichOneof("type")
+                if kind == "new_session":
+                    # Sent at the start of every script run; forget what an interrupted run drew
+                    self._seen, self._exceptions, self.alerts = {}, [], []
+                elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                    self._on_element(msg.delta.new_element, msg.delta.fragment_id)
+                elif kind == "script_finished" and msg.script_finished in DONE:
+                    if self._finished and not self._finished.done():
+                        self._finished.set_result(msg.script_finished)
+        finally:
+            if self._finished and not self._finished.done():
+                self._finished.set_exception(StepError("connection closed"))
+
+    def _on_element(self, element, fragment_id):
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            self._exceptions.append(element.exception.message)
+        elif kind == "alert" and element.alert.format in (Alert.ERROR, Alert.WARNING):
+            self.alerts.append(element.alert.body[:60])
+        elif kind in WIDGETS:
+            widget = getattr(element, kind)
+            self._seen[widget.label] = (kind, widget, fragment_id)
+            key = widget.id.split("-", 2)[-1]   # "$$ID-<hash>-<key>"
+            if key != "None":
+                self._seen[key] = (kind, widget, fragment_id)
+
+    def _state(self, name, value):
+        if name not in self.widgets:
+            raise StepError(f"missing widget: {name}")
+        kind, widget, _ = self.widgets[name]
+        state = WidgetState(id=widget.id)
+        if kind == "button":
+            state.trigger_value = True
+        elif kind == "checkbox":
+            state.bool_value = bool(value)
+        elif kind == "slider":
+            state.double_array_value.data[:] = [float(value)]
+        else:
+            state.string_value = str(value)
+        return state
+
+    async def rerun(self, changes):
+        """Apply {label or key: value} and wait for the rerun; returns its latency in ms."""
+        msg = BackMsg()
+        msg.rerun_script.SetInParent()
+        sticky = dict(self.states)
+        for name, value in changes.items():
+            state = self._state(name, value)
+            if state.WhichOneof("value") != "trigger_value":
+                sticky[state.id] = state
+            else:
+                msg.rerun_script.widget_states.widgets.add().CopyFrom(state)
+        for state in sticky.values():
+            msg.rerun_script.widget_states.widgets.add().CopyFrom(state)
+        fragments = {self.widgets[name][2] for name in changes}
+        if len(fragments) == 1 and "" not in fragments:
+            msg.rerun_script.fragment_id = fragments.pop()
+
+        self._finished = asyncio.get_running_loop().create_future()
+        start = time.perf_counter()
+        await self._ws.send(msg.SerializeToString())
+        try:
+            status = await asyncio.wait_for(self._finished, self.timeout)
+        except asyncio.TimeoutError:
+            raise StepError("timeout") from None
+        elapsed = (time.perf_counter() - start) * 1000
+        if status == ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY:
+            # Only the fragment was redrawn; everything else on the page is unchanged
+            fragment_id = msg.rerun_script.fragment_id
+            self._seen = {**{name: w for name, w in self.widgets.items() if w[2] != fragment_id}, **self._seen}
+        self.widgets = self._seen
+        live = {widget.id for _, widget, _ in self.widgets.values()}
+        self.states = {wid: state for wid, state in sticky.items() if wid in live}
+        if self._exceptions:
+            raise StepError(f"exception: {self._exceptions[0][:80]}")
+        return elapsed
+
+
+# Journeys are generators of (step, {widget label or key: value}); they are resumed after each
+# rerun, so a step can look at what the previous one rendered through session.widgets.
+def weather(session, rng):
+    yield "open weather", {PAGE: LABELS["weather_page"]}
+    for _ in range(3):
+        yield "switch city", {"Select a city for trend analysis:": rng.choice(CITIES)}
+    yield "switch map view", {"Map view": rng.choice(["Districts", "Household grid"])}
+
+
+def calculator(session, rng):
+    yield "open calculator", {PAGE: LABELS["calculator_page"]}
+    sliders = {"🚖 CNG (km/day)": 100, "🔌 Electricity (kWh/month)": 1000, "🚿 Water (liters/day)": 500}
+    for _ in range(3):
+        label = rng.choice(list(sliders))
+        yield "drag slider", {label: round(rng.uniform(0, sliders[label]), 1)}
+    yield "calculate", {"Calculate Emissions": True}
+
+
+def quiz(session, rng):
+    yield "open tasks", {PAGE: LABELS["tasks_page"]}
+    yield "set username", {"👤 Username (to keep your progress across visits)": f"load-{rng.randrange(10 ** 9)}"}
+    for i in range(10):
+        key = f"quiz_q{i}"
+        if key in session.widgets:
+            yield "answer question", {key: rng.choice(list(session.widgets[key][1].options))}
+    yield "submit quiz", {"Submit Quiz": True}
+
+
+def assistant(session, rng):
+    yield "open assistant", {PAGE: LABELS["assistant_page"]}
+    yield "type question", {"Ask something about eco-friendly practices, climate, Bangladesh policies, etc.":
+                            rng.choice(QUESTIONS)}
+    yield "ask", {"Get AI Answer": True}
+
+
+JOURNEYS = {"weather": weather, "calculator": calculator, "quiz": quiz, "assistant": assistant}
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = []        # (t, step, ms, ok)
+        self.errors = Counter()  # (step, reason) -> count
+        self.alerts = Counter()  # alert text -> count
+        self.active = 0
+
+    def add(self, step, ms, ok=True, reason=None):
+        self.samples.append((time.time(), step, ms, ok))
+        if not ok:
+            self.errors[(step, reason)] += 1
+
+
+async def user(url, args, recorder, stop_at, seed):
+    rng = random.Random(seed)
+    names = list(args.mix)
+    weights = [args.mix[n] for n in names]
+    session = Session(url, args.timeout)
+    start = time.perf_counter()
+    try:
+        await session.open()
+    except (OSError, StepError, asyncio.TimeoutError) as e:
+        recorder.add("connect", (time.perf_counter() - start) * 1000, False, str(e) or type(e).__name__)
+        await session.close()
+        return
+    recorder.add("connect", (time.perf_counter() - start) * 1000)
+    recorder.active += 1
+    try:
+        while time.time() < stop_at:
+            journey = rng.choices(names, weights)[0]
+            for step, changes in JOURNEYS[journey](session, rng):
+                if time.time() >= stop_at:
+                    break
+                start = time.perf_counter()
+                try:
+                    recorder.add(f"{journey}/{step}", await session.rerun(changes))
+                except StepError as e:
+                    recorder.add(f"{journey}/{step}", (time.perf_counter() - start) * 1000, False, str(e))
+                    if str(e) == "connection closed":
+                        return
+                    break   # start a fresh journey
+                recorder.alerts.update(session.alerts)
+                await asyncio.sleep(rng.expovariate(1 / args.think) if args.think else 0)
+    finally:
+        recorder.active -= 1
+        await session.close()
+
+
+class ProcessMonitor:
+    """Samples a process's CPU% and RSS from /proc (Linux) every `interval` seconds."""
+
+    def __init__(self, pid, interval):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []   # (t, cpu_percent, rss_mb)
+        self._ticks = os.sysconf("SC_CLK_TCK")
+
+    def _read(self):
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        cpu = (int(fields[11]) + int(fields[12])) / self._ticks   # utime + stime
+        with open(f"/proc/{self.pid}/status") as f:
+            rss_kb = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+        return cpu, rss_kb / 1024
+
+    async def run(self):
+        try:
+            last_cpu, _ = self._read()
+        except OSError:
+            return   # not Linux, or the server is not ours
+        last = time.time()
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                cpu, rss = self._read()
+            except OSError:
+                return
+            now = time.time()
+            self.samples.append((now, (cpu - last_cpu) / (now - last) * 100, rss))
+            last_cpu, last = cpu, now
+
+
+async def load(url, args, pid=None):
+    recorder = Recorder()
+    monitor = ProcessMonitor(pid, args.interval) if pid else None
+    watcher = asyncio.create_task(monitor.run()) if monitor else None
+    started = time.time()
+    stop_at = started + args.ramp + args.duration
+    users = []
+    for i in range(args.users):
+        users.append(asyncio.create_task(user(url, args, recorder, stop_at, args.seed + i)))
+        if args.ramp:
+            await asyncio.sleep(args.ramp / args.users)
+        progress(recorder, started)
+    while time.time() < stop_at:
+        await asyncio.sleep(args.interval)
+        progress(recorder, started)
+    await asyncio.wait(users, timeout=args.timeout)
+    for task in users:
+        task.cancel()
+    if watcher:
+        watcher.cancel()
+    return recorder, monitor.samples if monitor else [], started
+
+
+def progress(recorder, started, _last=[0.0]):
+    now = time.time()
+    if now - _last[0] < 5:
+        return
+    _last[0] = now
+    recent = [ms for t, _, ms, ok in recorder.samples if t > now - 5]
+    p95 = f"{np.percentile(recent, 95):8.0f} ms" if recent else "       - ms"
+    print(f"[{now - started:6.0f}s] users {recorder.active:4}  reruns/s {len(recent) / 5:6.1f}  p95 {p95}  "
+          f"errors {sum(recorder.errors.values())}", flush=True)
+
+
+def summarize(recorder, started, duration):
+    rows = []
+    steps = sorted({step for _, step, _, _ in recorder.samples})
+    for step in steps + ["all"]:
+        samples = [(ms, ok) for _, s, ms, ok in recorder.samples if s == step or (step == "all" and s != "connect")]
+        ok = [ms for ms, good in samples if good]
+        row = {"name": step, "count": len(samples), "errors": len(samples) - len(ok)}
+        if ok:
+            row.update(common.summarize(ok))
+            row["p99_ms"] = float(np.percentile(ok, 99))
+        if step == "all":
+            row["reruns_per_sec"] = len(ok) / duration
+        rows.append(row)
+    return rows
+
+
+def timeline(recorder, monitor_samples, started, interval):
+    end = max([t for t, *_ in recorder.samples] + [t for t, *_ in monitor_samples] + [started])
+    out = []
+    for lo in np.arange(started, end, interval):
+        hi = lo + interval
+        window = [(ms, ok) for t, s, ms, ok in recorder.samples if lo <= t < hi and s != "connect"]
+        ok = [ms for ms, good in window if good]
+        opened = sum(1 for t, s, _, good in recorder.samples if t < hi and s == "connect" and good)
+        usage = [(cpu, rss) for t, cpu, rss in monitor_samples if lo <= t < hi]
+        out.append({"t": round(float(lo - started), 1), "sessions": opened, "reruns_per_sec": len(ok) / interval,
+                    "errors": len(window) - len(ok), "p95_ms": float(np.percentile(ok, 95)) if ok else None,
+                    "cpu_percent": float(np.mean([c for c, _ in usage])) if usage else None,
+                    "rss_mb": max(r for _, r in usage) if usage else None})
+    return out
+
+
+def print_report(rows, tl, recorder):
+    print(f"\n{'step':36} {'count':>7} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for row in rows:
+        if "p50_ms" in row:
+            print(f"{row['name']:36} {row['count']:7} {row['errors']:6} {row['p50_ms']:9.0f} {row['p95_ms']:9.0f} "
+                  f"{row['p99_ms']:9.0f}")
+        else:
+            print(f"{row['name']:36} {row['count']:7} {row['errors']:6}")
+    print(f"throughput: {rows[-1].get('reruns_per_sec', 0):.1f} reruns/s")
+    print(f"\n{'t':>7} {'sessions':>8} {'reruns/s':>9} {'errors':>6} {'p95 ms':>9} {'cpu %':>6} {'rss MiB':>8}")
+    for p in tl:
+        print(f"{p['t']:7.0f} {p['sessions']:8} {p['reruns_per_sec']:9.1f} {p['errors']:6} {_num(p['p95_ms'], 9)} "
+              f"{_num(p['cpu_percent'], 6)} {_num(p['rss_mb'], 8)}")
+    for (step, reason), n in recorder.errors.most_common(10):
+        print(f"error x{n}: {step}: {reason}")
+    for text, n in recorder.alerts.most_common(10):
+        print(f"app warning x{n}: {text}")
+
+
+def _num(value, width):
+    return f"{value:{width}.0f}" if value is not None else f"{'-':>{width}}"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_app(upstream, data_dir, verbose, memo=True):
+    """`streamlit run app.py` on a free port against the stub upstreams; returns (process, base url)."""
+    port = free_port()
+    env = {**os.environ, "ECO_DATA_DIR": data_dir, "WEATHER_API": f"{upstream}/weather/",
+           "DUCKDUCKGO_API": f"{upstream}/search", "OLLAMA_URL": f"{upstream}/api/generate",
+           "TTS_BACKEND": "silent", "ECO_PROFILE_RATE": "0", "ECO_MEMO": "1" if memo else "0"}
+    cmd = [sys.executable, "-m", "streamlit", "run", "app.py", "--server.port", str(port),
+           "--server.address", "127.0.0.1", "--server.headless", "true", "--server.fileWatcherType", "none",
+           "--browser.gatherUsageStats", "false"]
+    out = None if verbose else subprocess.DEVNULL
+    proc = subprocess.Popen(cmd, env=env, cwd=common.ROOT, stdout=out, stderr=out)
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("streamlit exited during start-up (rerun with --verbose)")
+        try:
+            with urllib.request.urlopen(f"{base}/_stcore/health", timeout=1):
+                return proc, base
+        except OSError:
+            time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError("streamlit did not become healthy within 60 s")
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in JOURNEYS:
+            raise argparse.ArgumentTypeError(f"unknown journey {name!r} (choose from {', '.join(JOURNEYS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="an already running app (default: start one against the stub upstreams)")
+    parser.add_argument("--users", type=int, default=50, help="concurrent sessions")
+    parser.add_argument("--ramp", type=float, default=30, help="seconds over which sessions are opened")
+    parser.add_argument("--duration", type=float, default=120, help="seconds to hold full load after the ramp")
+    parser.add_argument("--think", type=float, default=2.0, help="mean seconds a user waits between steps")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("weather=3,calculator=2,quiz=3,assistant=2"),
+                        help="journey weights, e.g. quiz=5,assistant=1")
+    parser.add_argument("--latency", type=float, default=0.2, help="mean seconds each stub upstream call takes")
+    parser.add_argument("--llm-delay", type=float, default=0.02, help="seconds between stub LLM tokens")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds a single rerun may take")
+    parser.add_argument("--interval", type=float, default=5, help="seconds per timeline bucket and /proc sample")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="report path (default: benchmarks/results/load-<time>.json)")
+    parser.add_argument("--no-memo", action="store_true", help="start the app with ECO_MEMO=0")
+    parser.add_argument("--verbose", action="store_true", help="show the app's own log output")
+    args = parser.parse_args()
+
+    server = proc = data_dir = None
+    if args.url:
+        base = args.url.rstrip("/")
+    else:
+        import stub_server
+
+        server = stub_server.start(token_delay=args.llm_delay, latency=args.latency)
+        data_dir = tempfile.TemporaryDirectory()
+        proc, base = start_app(f"http://127.0.0.1:{server.server_port}", data_dir.name, args.verbose, not args.no_memo)
+        print(f"app on {base}, stub upstreams on port {server.server_port} (latency {args.latency} s)")
+    ws_url = base.replace("http", "ws", 1) + "/_stcore/stream"
+    try:
+        recorder, usage, started = asyncio.run(load(ws_url, args, proc.pid if proc else None))
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait(timeout=30)
+        if server:
+            server.shutdown()
+        if data_dir:
+            data_dir.cleanup()
+
+    rows = summarize(recorder, started, args.ramp + args.duration)
+    tl = timeline(recorder, usage, started, args.interval)
+    print_report(rows, tl, recorder)
+    path = common.write_report("load", rows, args.json, timeline=tl, users=args.users, ramp=args.ramp,
+                               duration=args.duration, think=args.think, mix=args.mix, latency=args.latency,
+                               llm_delay=args.llm_delay, url=args.url, memo=not args.no_memo,
+                               upstream_calls=dict(server.counts) if server else None,
+                               errors=[{"step": s, "reason": r, "count": n} for (s, r), n in recorder.errors.items()],
+                               app_warnings=dict(recorder.alerts))
+    print(f"wrote {path}")
@@ -0,0 +1,69 @@
+"""Cached Plotly charts for the Emission Breakdown page.
+
+Charts are keyed on the household inputs rounded to CHART_QUANT_STEP, so slider
+moves that would not visibly change a chart reuse the figures already
+built. The cache is bounded and shared by every session on the server.
+"""
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.graph_objects as go
+
+import emissions
+import telemetry
+from config import CHART_QUANT_STEP
+
+PERIOD_LABELS = {"daily": "Daily (tons)", "monthly": "Monthly (tons)", "yearly": "Yearly (tons)"}
+
+
+def quantize(household, step=CHART_QUANT_STEP):
+    """Inputs as a hashable tuple in CATEGORIES order, rounded to the nearest step."""
+    return tuple(round(float(household.get(c, 0)) / step) * step for c in emissions.CATEGORIES)
+
+
+class ChartCache:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            charts = self._items.get(key)
+            if charts is not None:
+                self._items.move_to_end(key)
+                self.stats["hits"] += 1
+                return charts
+            self.stats["misses"] += 1
+        charts = build()   # outside the lock; two sessions may rarely build the same key
+        with self._lock:
+            self._items[key] = charts
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+                self.stats["evictions"] += 1
+        return charts
+
+    def hit_rate(self):
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
+
+
+@telemetry.timed("chart_build", chart="breakdown")
+def build_breakdown(key, factors=None):
+    """Pie, grouped bar and table for the quantized inputs `key` (see quantize())."""
+    breakdown = emissions.calculate(dict(zip(emissions.CATEGORIES, key)), factors)["breakdown"]
+    table = pd.DataFrame({PERIOD_LABELS[p]: breakdown[p] for p in emissions.PERIODS})
+    table.index.name = "Source"
+    table = table.round({"Daily (tons)": 4, "Monthly (tons)": 3, "Yearly (tons)": 3})
+
+    pie = go.Figure(go.Pie(labels=table.index, values=table["Monthly (tons)"], sort=False,
+                           textinfo="percent", hovertemplate="%{label}: %{value} t<extra></extra>"))
+    pie.update_layout(margin=dict(t=10, b=10, l=10, r=10))
+
+    bar = go.Figure([go.Bar(name=column, x=table.index, y=table[column]) for column in table.columns])
+    bar.update_layout(barmode="group", title="Emission Comparison by Source", xaxis_tickangle=-45,
+                      yaxis_title="Tons CO₂", legend_title="Period")
+    return {"pie": pie, "bar": bar, "table": table}
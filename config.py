@@ -0,0 +1,80 @@
+"""Settings shared by the app and its pages; most can be overridden with environment variables."""
+import os
+
+DATA_DIR = os.environ.get("ECO_DATA_DIR", ".eco_data")  # runtime caches and stores
+OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://localhost:11434/api/generate")
+OLLAMA_MODEL = "mistral"
+OLLAMA_READ_TIMEOUT = 60  # max seconds between streamed tokens
+OLLAMA_TOTAL_TIMEOUT = 300  # max seconds for a whole answer
+OLLAMA_MAX_IN_FLIGHT = 2  # concurrent generations sent to the Ollama server
+OLLAMA_MAX_QUEUE = 64  # queued questions across all users before new ones are turned away
+OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")  # how long the idle model stays loaded; "-1m" = for ever
+OLLAMA_CONTEXT_LIMIT = 3072  # conversation tokens carried into a follow-up before starting afresh
+RAG_EMBED_MODEL = os.environ.get("RAG_EMBED_MODEL", "")  # Ollama embedding model; empty = built-in hashing
+RAG_INDEX = os.environ.get("RAG_INDEX", "flat")  # "flat" or "ivf" (for large document sets)
+RAG_TOP_K = 4  # notes retrieved per question
+RAG_BUDGET_MS = 50  # retrieval latency budget; the best notes found so far are used when it runs out
+RAG_CONTEXT_TOKENS = 600  # upper bound on the notes added to the prompt
+RAG_MIN_SCORE = 0.1  # cosine similarity below which a note is not used
+TTS_BACKEND = os.environ.get("TTS_BACKEND", "gtts")  # "pyttsx3" for offline speech, "silent" for load tests
+TTS_CACHE_BYTES = 32 * 1024 * 1024
+TTS_WAIT_SECONDS = 20  # longest an answer waits on its audio; parts not ready by then are listed as pending
+TASK_STORE_URL = os.environ.get("TASK_STORE_URL", f"sqlite:///{os.path.join(DATA_DIR, 'tasks.sqlite')}")
+RESPONSE_CACHE_TTL = 7 * 24 * 3600  # seconds
+RESPONSE_CACHE_SIMILARITY = 0.85  # cosine threshold for reusing a near-duplicate question's answer
+WEATHER_API = os.environ.get("WEATHER_API", "https://wttr.in/")
+WEATHER_CACHE_TTL = 600  # seconds
+WEATHER_REFRESH_INTERVAL = 300  # seconds between background refreshes of all cities
+WEATHER_MAX_CONCURRENCY = 4  # simultaneous requests to the weather host
+DUCKDUCKGO_API = os.environ.get("DUCKDUCKGO_API", "https://api.duckduckgo.com/")
+SEARCH_CACHE_TTL = 24 * 3600  # seconds a search result is served from cache
+SEARCH_RATE_PER_SEC = 1.0  # sustained upstream searches per second (bursts of up to 5)
+SEARCH_PREFETCH_INTERVAL = 900  # seconds between refreshes of the most popular queries
+SEARCH_PREFETCH_TOP = 20  # how many popular queries are kept warm
+SEARCH_LOCAL_MIN_SCORE = 3.0  # BM25 score a local result needs before DuckDuckGo is skipped
+SEARCH_LOCAL_MIN_MATCH = 0.5  # fraction of the query's words a local result must contain to be shown
+EMISSION_MAP_REFRESH_INTERVAL = 300  # seconds between folding new household submissions into the map
+EMISSION_MAP_TILE_KM = 5  # side of the grid cells that located submissions are aggregated into
+CHART_CACHE_ENTRIES = 256  # breakdown chart sets kept in memory, shared by all sessions
+CHART_QUANT_STEP = float(os.environ.get("CHART_QUANT_STEP", "0.5"))  # inputs are rounded to this step before looking up cached charts
+MEMO_ENABLED = os.environ.get("ECO_MEMO", "1") != "0"  # memoize page sections and rerun them as fragments
+MEMO_LIMITS = {  # memo cache -> (max entries, ttl seconds or None); least recently used entries are evicted first
+    "quiz": (4096, 24 * 3600),
+    "leaderboard": (4, 15),  # shared by all sessions, so points show up within 15 s
+    "user_summary": (4096, 3600),
+}
+DEBUG = os.environ.get("ECO_DEBUG", "") == "1"  # show the debug panel (import times, latency) in the sidebar
+TELEMETRY_PORT = int(os.environ.get("TELEMETRY_PORT", "0"))  # serve /metrics and /metrics.json here; 0 = off
+PROFILE_SAMPLE_RATE = float(os.environ.get("ECO_PROFILE_RATE", "0"))  # fraction of reruns run under cProfile
+PROFILE_SLOW_MS = 1000  # sampled reruns at least this slow keep their profile
+
+CITIES = [
+    "Dhaka", "Chittagong", "Khulna", "Rajshahi", "Sylhet",
+    "Barisal", "Rangpur", "Mymensingh", "Comilla", "Narayanganj",
+    "Gazipur", "Jessore", "Bogra", "Cox's Bazar", "Tangail",
+    "Narsingdi", "Kushtia", "Feni", "Moulvibazar", "Pabna"
+]
+
+
+CITY_COORDS = {
+    "Dhaka": (23.8103, 90.4125),
+    "Chittagong": (22.3569, 91.7832),
+    "Khulna": (22.8456, 89.5403),
+    "Rajshahi": (24.3745, 88.6042),
+    "Sylhet": (24.8949, 91.8687),
+    "Barisal": (22.7010, 90.3535),
+    "Rangpur": (25.7460, 89.2500),
+    "Mymensingh": (24.7471, 90.4203),
+    "Comilla": (23.4607, 91.1809),
+    "Narayanganj": (23.6238, 90.5000),
+    "Gazipur": (23.9999, 90.4203),
+    "Jessore": (23.1706, 89.2140),
+    "Bogra": (24.8481, 89.3730),
+    "Cox's Bazar": (21.4272, 92.0058),
+    "Tangail": (24.2513, 89.9167),
+    "Narsingdi": (23.9323, 90.7152),
+    "Kushtia": (23.9013, 89.1205),
+    "Feni": (22.9415, 91.3958),
+    "Moulvibazar": (24.4829, 91.7774),
+    "Pabna": (24.0064, 89.2372)
+}
@@ -0,0 +1,91 @@
+"""Region/year/version-aware emission factor registry.
+
+Factor sets live in data/emission_factors.json and are compiled into one
+dense (sets x categories) array whose columns follow emissions.CATEGORIES,
+so scoring indexes by integer position rather than by category name.
+"""
+import json
+import math
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from emissions import CATEGORIES
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "emission_factors.json")
+DEFAULT_REGION = "Bangladesh"
+
+
+class FactorRegistry:
+    def __init__(self, factor_sets):
+        entries = [_validate(entry, i) for i, entry in enumerate(factor_sets)]
+        if not entries:
+            raise ValueError("emission factor file contains no factor sets")
+        entries.sort(key=lambda e: (e["region"], e["year"], _version_key(e["version"])))
+
+        self.keys = [(e["region"], e["year"], e["version"]) for e in entries]
+        if len(set(self.keys)) != len(self.keys):
+            raise ValueError("duplicate (region, year, version) factor sets")
+        self.sources = [e.get("source", "") for e in entries]
+        self.matrix = np.array([[e["factors"][c] for c in CATEGORIES] for e in entries], dtype=np.float64)
+        self.matrix.setflags(write=False)
+        self._index = {key: row for row, key in enumerate(self.keys)}
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_PATH):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f)["factor_sets"])
+
+    def __len__(self):
+        return len(self.keys)
+
+    def regions(self):
+        return sorted({key[0] for key in self.keys})
+
+    def row(self, region=DEFAULT_REGION, year=None, version=None):
+        """Row id of the matching factor set; the latest year/version wins when not given."""
+        if year is not None and version is not None:
+            try:
+                return self._index[(region, year, str(version))]
+            except KeyError:
+                raise KeyError(f"no emission factors for {region} {year} v{version}") from None
+        rows = [
+            row for row, (r, y, v) in enumerate(self.keys)
+            if r == region and (year is None or y == year) and (version is None or v == str(version))
+        ]
+        if not rows:
+            raise KeyError(f"no emission factors for region {region!r}")
+        return rows[-1]
+
+    def vector(self, region=DEFAULT_REGION, year=None, version=None):
+        return self.matrix[self.row(region, year, version)]
+
+    def label(self, row):
+        region, year, version = self.keys[row]
+        return f"{region} {year} v{version}"
+
+
+def _version_key(version):
+    return tuple(int(p) if p.isdigit() else p for p in version.split("."))
+
+
+def _validate(entry, position):
+    where = f"factor set #{position}"
+    for field in ("region", "year", "version", "factors"):
+        if field not in entry:
+            raise ValueError(f"{where} is missing {field!r}")
+    factors = entry["factors"]
+    missing = [c for c in CATEGORIES if c not in factors]
+    unknown = [c for c in factors if c not in CATEGORIES]
+    if missing or unknown:
+        raise ValueError(f"{where} ({entry['region']} {entry['year']}): missing {missing}, unknown {unknown}")
+    for name, value in factors.items():
+        if not isinstance(value, (int, float)) or isinstance(value, bool) or not math.isfinite(value) or value < 0:
+            raise ValueError(f"{where}: factor {name}={value!r} must be a non-negative number")
+    return {**entry, "year": int(entry["year"]), "version": str(entry["version"])}
+
+
+@lru_cache(maxsize=None)
+def default_registry():
+    return FactorRegistry.from_file(os.environ.get("EMISSION_FACTORS_FILE", DEFAULT_PATH))
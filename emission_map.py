@@ -0,0 +1,175 @@
+"""Per-district household emission dataset behind the Weather page map.
+
+Households submitted from the calculator are appended to a SQLite log.
+refresh() scores only submissions newer than the last run and merges
+their per-district sums into a small Parquet file; the page just reads
+that file. Districts with no submissions show the baseline household.
+Submissions that share a location are also folded into grid tiles. Both
+files record the last household id they hold, so a refresh that fails
+between writing the tiles and the main file never counts a household twice.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import emissions
+import fileio
+import geo
+import telemetry
+
+# The calculator's default slider values
+BASELINE_HOUSEHOLD = {
+    "CNG": 10.0, "Bus": 10.0, "Uber": 5.0, "Bike": 5.0, "Motorbike": 5.0, "Air": 0.0,
+    "Electricity": 200.0, "LPG": 5.0, "Water": 100.0, "Diet": 3, "Waste": 5.0,
+}
+
+COLUMNS = ["City", "lat", "lon", "households", "monthly_tons_sum", "monthly_tons", "emission", "estimated"]
+TILE_KM = 5.0
+
+
+class HouseholdLog:
+    def __init__(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        columns = ", ".join(f'"{c}" REAL NOT NULL' for c in emissions.CATEGORIES)
+        self._db.execute(f"CREATE TABLE IF NOT EXISTS households "
+                         f"(id INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL NOT NULL, city TEXT NOT NULL, {columns})")
+        existing = {row[1] for row in self._db.execute("PRAGMA table_info(households)")}
+        for column in ("lat", "lon"):   # logs created before submissions carried a location
+            if column not in existing:
+                self._db.execute(f"ALTER TABLE households ADD COLUMN {column} REAL")
+        self._db.commit()
+        names = ", ".join(f'"{c}"' for c in emissions.CATEGORIES)
+        placeholders = ", ".join("?" * (len(emissions.CATEGORIES) + 4))
+        self._insert = f"INSERT INTO households (ts, city, lat, lon, {names}) VALUES ({placeholders})"
+
+    def append(self, city, household, lat=None, lon=None):
+        values = [float(household.get(c, 0)) for c in emissions.CATEGORIES]
+        with self._lock:
+            self._db.execute(self._insert, [time.time(), city, lat, lon, *values])
+            self._db.commit()
+
+    def since(self, after_id):
+        with self._lock:
+            return pd.read_sql_query("SELECT * FROM households WHERE id > ? ORDER BY id", self._db, params=(after_id,))
+
+
+class CityEmissionDataset:
+    def __init__(self, path, log, index, tiles_path=None, tile_km=TILE_KM):
+        self.path = path
+        self.log = log
+        self.index = index               # geo.LocationIndex of the districts shown on the map
+        self.city_coords = index.coords()
+        self.tiles_path = tiles_path or f"{os.path.splitext(path)[0]}_tiles.parquet"
+        self.tile_km = tile_km
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return None, 0
+        table = pq.read_table(self.path)
+        watermark = int((table.schema.metadata or {}).get(b"last_household_id", b"0"))
+        return table.to_pandas(), watermark
+
+    def refresh(self):
+        """Fold new submissions into the dataset; returns how many households were added."""
+        with self._lock, telemetry.span("emission_map_refresh"):
+            current, watermark = self._read()
+            new = self.log.since(watermark)
+            if current is not None and new.empty:
+                return 0
+
+            sums = pd.DataFrame({"City": list(self.city_coords), "households": 0, "monthly_tons_sum": 0.0})
+            sums = sums.set_index("City")
+            if current is not None:
+                previous = current.set_index("City")[["households", "monthly_tons_sum"]]
+                sums = sums.add(previous.reindex(sums.index, fill_value=0), fill_value=0)
+            if not new.empty:
+                monthly = emissions.score(new).total("monthly") / 1000
+                located = new["lat"].notna().to_numpy() & new["lon"].notna().to_numpy()
+                if located.any():
+                    # A shared location decides the district, whatever was picked in the form
+                    nearest = self.index.assign(new.loc[located, "lat"], new.loc[located, "lon"])
+                    new.loc[located, "city"] = self.index.names[nearest]
+                    self._merge_tiles(new.loc[located], monthly[located], watermark)
+                added = pd.DataFrame({"households": 1, "monthly_tons_sum": monthly}, index=new["city"])
+                added = added.groupby(level=0).sum()
+                sums = sums.add(added.reindex(sums.index, fill_value=0), fill_value=0)
+
+            baseline = float(emissions.score(BASELINE_HOUSEHOLD).total("monthly")[0] / 1000)
+            df = sums.reset_index()
+            df["households"] = df["households"].astype(np.int64)
+            df["estimated"] = df["households"] == 0
+            df["monthly_tons"] = np.where(df["estimated"], baseline,
+                                          df["monthly_tons_sum"] / df["households"].clip(lower=1))
+            df = df[df["City"].isin(self.city_coords)]   # drop names no longer in the index
+            df["lat"] = [self.city_coords[c][0] for c in df["City"]]
+            df["lon"] = [self.city_coords[c][1] for c in df["City"]]
+            # 20-100 index relative to the highest district, for marker colour and radius
+            df["emission"] = (20 + 80 * df["monthly_tons"] / df["monthly_tons"].max()).round(1)
+
+            last_id = int(new["id"].max()) if not new.empty else watermark
+            table = pa.Table.from_pandas(df[COLUMNS], preserve_index=False)
+            table = table.replace_schema_metadata({"last_household_id": str(last_id)})
+            fileio.write_atomic(table, self.path)
+            return len(new)
+
+    def _merge_tiles(self, located, monthly, watermark):
+        # The tile file keeps its own watermark: households it already holds from a refresh that failed
+        # before the main file was written are skipped. Older files without one are as current as the main file
+        previous, tiles_watermark = None, watermark
+        if os.path.exists(self.tiles_path):
+            table = pq.read_table(self.tiles_path)
+            tiles_watermark = int((table.schema.metadata or {}).get(b"last_household_id", watermark))
+            previous = table.to_pandas()
+        fresh = (located["id"] > tiles_watermark).to_numpy()
+        if not fresh.any():
+            return
+        tiles = geo.grid_tiles(located.loc[fresh, "lat"], located.loc[fresh, "lon"], monthly[fresh],
+                               cell_km=self.tile_km)
+        if previous is not None:
+            tiles = geo.merge_tiles(previous, tiles, cell_km=self.tile_km)
+        table = pa.Table.from_pandas(tiles, preserve_index=False)
+        table = table.replace_schema_metadata({"last_household_id": str(int(located["id"].max()))})
+        fileio.write_atomic(table, self.tiles_path)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            self.refresh()
+        return pq.read_table(self.path).to_pandas()
+
+    def load_tiles(self):
+        """Grid tiles of located submissions (empty until someone shares a location)."""
+        self.load()
+        if not os.path.exists(self.tiles_path):
+            return geo.grid_tiles([], [], [], cell_km=self.tile_km)
+        return pq.read_table(self.tiles_path).to_pandas()
+
+    def version(self):
+        """Changes whenever refresh() rewrites the file; use it as a cache key."""
+        return os.stat(self.path).st_mtime_ns if os.path.exists(self.path) else 0
+
+    def _run(self, interval):
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                pass  # keep serving the previous file; retry next interval
+            time.sleep(interval)
+
+    def start(self, interval=300):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, args=(interval,), name="emission-map-refresh",
+                                            daemon=True)
+            self._thread.start()
+        return self
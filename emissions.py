@@ -0,0 +1,112 @@
+"""Vectorized household CO₂ emission engine shared by the calculator pages.
+
+Inputs are a matrix with one row per household and one column per entry of
+CATEGORIES, in the unit given by UNITS (km/day, kWh/month, kg/week ...).
+"""
+import numpy as np
+import pandas as pd
+
+CATEGORIES = (
+    "CNG", "Bus", "Uber", "Bike", "Motorbike", "Air",
+    "Electricity", "LPG", "Water", "Diet", "Waste",
+)
+CATEGORY_INDEX = {name: i for i, name in enumerate(CATEGORIES)}
+
+UNITS = {
+    "CNG": "km/day", "Bus": "km/day", "Uber": "km/day",
+    "Bike": "km/day", "Motorbike": "km/day", "Air": "km/month",
+    "Electricity": "kWh/month", "LPG": "kg/month", "Water": "liters/day",
+    "Diet": "meals/day", "Waste": "kg/week",
+}
+
+PERIODS = ("daily", "monthly", "yearly")
+
+# How many input units fall into each reporting period. Monthly/weekly
+# activities are not spread over days, so they count as zero in "daily".
+_PER_PERIOD = {
+    "day": (1, 30, 365),
+    "month": (0, 1, 12),
+    "week": (0, 4, 52),
+}
+PERIOD_MULTIPLIERS = np.array(
+    [[_PER_PERIOD[UNITS[c].split("/")[1]][p] for c in CATEGORIES] for p in range(len(PERIODS))],
+    dtype=np.float64,
+)
+
+
+def factor_vector(factors=None):
+    """Factor vector in CATEGORIES order; None means the default region's latest registry entry."""
+    if factors is None:
+        from emission_factors import default_registry  # imported late: it depends on CATEGORIES
+        return default_registry().vector()
+    if isinstance(factors, dict):
+        return np.array([factors[c] for c in CATEGORIES], dtype=np.float64)
+    return np.asarray(factors, dtype=np.float64)
+
+
+def as_matrix(inputs):
+    """Coerce a DataFrame, a dict of per-category values or an array into an (n, 11) float matrix."""
+    if isinstance(inputs, pd.DataFrame):
+        columns = {str(col).lower(): col for col in inputs.columns}
+        out = np.zeros((len(inputs), len(CATEGORIES)), dtype=np.float64)
+        for i, name in enumerate(CATEGORIES):
+            col = columns.get(name.lower())
+            if col is not None:
+                out[:, i] = pd.to_numeric(inputs[col], errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+        return out
+    if isinstance(inputs, dict):
+        return np.array([[inputs.get(c, 0) for c in CATEGORIES]], dtype=np.float64)
+    matrix = np.asarray(inputs, dtype=np.float64)
+    return matrix.reshape(1, -1) if matrix.ndim == 1 else matrix
+
+
+class EmissionResult:
+    """Emissions in kg CO₂ for n households; totals[:, p] is the total for PERIODS[p]."""
+
+    def __init__(self, inputs, weights):
+        self.inputs = inputs
+        self.weights = weights              # (periods, categories) = factor * period multiplier
+        self.totals = inputs @ weights.T    # (n, periods) in one BLAS call
+
+    def __len__(self):
+        return len(self.totals)
+
+    def total(self, period):
+        return self.totals[:, PERIODS.index(period)]
+
+    def breakdown(self, period="monthly"):
+        return self.inputs * self.weights[PERIODS.index(period)]
+
+    def to_frame(self, tons=True):
+        scale = 1000 if tons else 1
+        return pd.DataFrame(self.totals / scale, columns=list(PERIODS))
+
+
+def score(inputs, factors=None):
+    matrix = as_matrix(inputs)
+    weights = factor_vector(factors)[None, :] * PERIOD_MULTIPLIERS
+    return EmissionResult(matrix, weights)
+
+
+def calculate(values, factors=None):
+    """Single-household totals and per-category breakdowns in tons CO₂."""
+    result = score(values, factors)
+    totals = result.totals[0] / 1000
+    return {
+        "daily": float(totals[0]),
+        "monthly": float(totals[1]),
+        "yearly": float(totals[2]),
+        "breakdown": {
+            period: {c: float(v) / 1000 for c, v in zip(CATEGORIES, result.breakdown(period)[0])}
+            for period in PERIODS
+        },
+    }
+
+
+def score_versions(inputs, factor_matrix):
+    """Totals in kg for every factor set at once: returns an (n, sets, periods) array."""
+    matrix = as_matrix(inputs)
+    factor_matrix = np.atleast_2d(np.asarray(factor_matrix, dtype=np.float64))
+    weights = factor_matrix[:, None, :] * PERIOD_MULTIPLIERS[None, :, :]   # (sets, periods, categories)
+    totals = matrix @ weights.reshape(-1, len(CATEGORIES)).T
+    return totals.reshape(len(matrix), len(factor_matrix), len(PERIODS))
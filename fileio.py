@@ -0,0 +1,13 @@
+"""Parquet writes shared by the stores that keep their data as Parquet files."""
+import os
+
+import pyarrow.parquet as pq
+
+
+def write_atomic(table, path):
+    """Write a pyarrow Table to `path` through a temporary file, creating the directory if needed."""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)   # readers never see a half-written file
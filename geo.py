@@ -0,0 +1,225 @@
+"""Spatial lookups over Bangladesh districts (and upazilas, when the file is present).
+
+LocationIndex buckets locations into a regular lat/lon grid and keeps, for
+every cell, the short list of locations that can be nearest to any point in
+it, so assigning millions of points is a few vectorized numpy passes.
+grid_tiles() aggregates points into fixed square cells for the map.
+"""
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+DISTRICTS_PATH = os.environ.get("DISTRICTS_FILE", os.path.join(os.path.dirname(__file__), "data", "districts.csv"))
+UPAZILAS_PATH = os.environ.get("UPAZILAS_FILE", os.path.join(os.path.dirname(__file__), "data", "upazilas.csv"))
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = 111.32
+TILE_REFERENCE_LAT = 23.7   # fixes the longitude width of grid tiles across all of Bangladesh
+_TILE_STRIDE = 1 << 24
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=np.float64)) for a in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def load_locations(path):
+    """CSV with name, lat, lon and any extra columns (division, district, ...)."""
+    df = pd.read_csv(path)
+    missing = {"name", "lat", "lon"} - set(df.columns)
+    if missing:
+        raise ValueError(f"{path}: missing columns {sorted(missing)}")
+    if df["name"].duplicated().any():
+        raise ValueError(f"{path}: duplicate names {sorted(df.loc[df['name'].duplicated(), 'name'])}")
+    return df.reset_index(drop=True)
+
+
+class LocationIndex:
+    def __init__(self, locations, cell_deg=0.25):
+        self.locations = locations
+        self.names = locations["name"].to_numpy()
+        self.lats = locations["lat"].to_numpy(dtype=np.float64)
+        self.lons = locations["lon"].to_numpy(dtype=np.float64)
+        self.cell_deg = cell_deg
+
+        # Grid covering every location plus one cell of margin
+        self.lat0 = np.floor(self.lats.min() / cell_deg) * cell_deg - cell_deg
+        self.lon0 = np.floor(self.lons.min() / cell_deg) * cell_deg - cell_deg
+        self.rows = int(np.ceil((self.lats.max() - self.lat0) / cell_deg)) + 2
+        self.cols = int(np.ceil((self.lons.max() - self.lon0) / cell_deg)) + 2
+
+        # Per-cell members, for radius queries
+        cells = self._cells(self.lats, self.lons)
+        order = np.argsort(cells, kind="stable")
+        self._members_order = order
+        self._members_start = np.searchsorted(cells[order], np.arange(self.rows * self.cols + 1))
+
+        # Per-cell nearest candidates: for any point in a cell, its nearest location is within
+        # d(centre, closest to centre) + 2 * half-diagonal of the centre.
+        r, c = np.divmod(np.arange(self.rows * self.cols), self.cols)
+        centre_lat = self.lat0 + (r + 0.5) * cell_deg
+        centre_lon = self.lon0 + (c + 0.5) * cell_deg
+        d = haversine_km(centre_lat[:, None], centre_lon[:, None], self.lats[None, :], self.lons[None, :])
+        half_diag = haversine_km(centre_lat, centre_lon, centre_lat + cell_deg / 2, centre_lon + cell_deg / 2)
+        within = d <= (d.min(axis=1) + 2 * half_diag)[:, None] + 1e-9
+        width = int(within.sum(axis=1).max())
+        rank = np.argsort(np.where(within, d, np.inf), axis=1)[:, :width]
+        self._candidates = np.where(np.take_along_axis(within, rank, axis=1), rank, -1).astype(np.int32)
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        return cls(load_locations(path), **kwargs)
+
+    def __len__(self):
+        return len(self.names)
+
+    def coords(self):
+        return {name: (lat, lon) for name, lat, lon in zip(self.names, self.lats, self.lons)}
+
+    def _cells(self, lats, lons):
+        r = np.floor((lats - self.lat0) / self.cell_deg).astype(np.int64)
+        c = np.floor((lons - self.lon0) / self.cell_deg).astype(np.int64)
+        inside = (r >= 0) & (r < self.rows) & (c >= 0) & (c < self.cols)
+        return np.where(inside, r * self.cols + c, -1)
+
+    def assign(self, lats, lons, chunk_size=250_000):
+        """Index of the nearest location for every point (vectorized, chunked to bound memory)."""
+        lats = np.asarray(lats, dtype=np.float64).ravel()
+        lons = np.asarray(lons, dtype=np.float64).ravel()
+        out = np.empty(len(lats), dtype=np.int32)
+        for start in range(0, len(lats), chunk_size):
+            la, lo = lats[start:start + chunk_size], lons[start:start + chunk_size]
+            cells = self._cells(la, lo)
+            result = np.empty(len(la), dtype=np.int32)
+
+            inside = cells >= 0
+            if inside.any():
+                cand = self._candidates[cells[inside]]
+                d = haversine_km(la[inside, None], lo[inside, None], self.lats[cand], self.lons[cand])
+                d[cand < 0] = np.inf
+                result[inside] = cand[np.arange(len(cand)), d.argmin(axis=1)]
+            if not inside.all():
+                # Off the grid (outside Bangladesh): compare against every location
+                d = haversine_km(la[~inside, None], lo[~inside, None], self.lats[None, :], self.lons[None, :])
+                result[~inside] = d.argmin(axis=1)
+            out[start:start + chunk_size] = result
+        return out
+
+    def nearest(self, lat, lon, k=1):
+        """[(name, km), ...] for the k nearest locations."""
+        if k == 1:
+            i = int(self.assign([lat], [lon])[0])
+            return [(self.names[i], float(haversine_km(lat, lon, self.lats[i], self.lons[i])))]
+        d = haversine_km(lat, lon, self.lats, self.lons)
+        order = np.argsort(d)[:k]
+        return [(self.names[i], float(d[i])) for i in order]
+
+    def within(self, lat, lon, radius_km):
+        """[(name, km), ...] for locations within radius_km, nearest first."""
+        dlat = radius_km / KM_PER_DEG_LAT
+        dlon = radius_km / (KM_PER_DEG_LAT * max(np.cos(np.radians(abs(lat) + dlat)), 1e-6))
+        r0, r1 = (np.floor((np.array([lat - dlat, lat + dlat]) - self.lat0) / self.cell_deg).astype(int)
+                  .clip(0, self.rows - 1))
+        c0, c1 = (np.floor((np.array([lon - dlon, lon + dlon]) - self.lon0) / self.cell_deg).astype(int)
+                  .clip(0, self.cols - 1))
+        if r1 - r0 + 1 >= self.rows and c1 - c0 + 1 >= self.cols:
+            ids = np.arange(len(self))
+        else:
+            blocks = [self._members_order[self._members_start[r * self.cols + c0]:
+                                          self._members_start[r * self.cols + c1 + 1]]
+                      for r in range(r0, r1 + 1)]
+            ids = np.concatenate(blocks)
+        d = haversine_km(lat, lon, self.lats[ids], self.lons[ids])
+        keep = d <= radius_km
+        ids, d = ids[keep], d[keep]
+        order = np.argsort(d)
+        return [(self.names[i], float(km)) for i, km in zip(ids[order], d[order])]
+
+    def bucket(self, lats, lons, values=None):
+        """Count (and sum/mean of values) of points per nearest location, for every location."""
+        idx = self.assign(lats, lons)
+        counts = np.bincount(idx, minlength=len(self))
+        df = pd.DataFrame({"name": self.names, "lat": self.lats, "lon": self.lons, "count": counts})
+        if values is not None:
+            sums = np.bincount(idx, weights=np.asarray(values, dtype=np.float64).ravel(), minlength=len(self))
+            df["sum"] = sums
+            df["mean"] = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+        return df
+
+
+def tile_size_deg(cell_km):
+    return cell_km / KM_PER_DEG_LAT, cell_km / (KM_PER_DEG_LAT * np.cos(np.radians(TILE_REFERENCE_LAT)))
+
+
+def grid_tiles(lats, lons, values=None, cell_km=5.0):
+    """Aggregate points into cell_km squares: one row per non-empty tile with its integer key,
+    south-west corner, count and value sum. Keys are stable, so tiles from separate batches
+    can be merged with merge_tiles()."""
+    dlat, dlon = tile_size_deg(cell_km)
+    ty = np.floor(np.asarray(lats, dtype=np.float64) / dlat).astype(np.int64)
+    tx = np.floor(np.asarray(lons, dtype=np.float64) / dlon).astype(np.int64)
+    # Pack both indices into one int64 so np.unique runs on a flat array
+    keys, inverse = np.unique(ty * _TILE_STRIDE + (tx + _TILE_STRIDE // 2), return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(keys))
+    sums = (np.bincount(inverse, weights=np.asarray(values, dtype=np.float64).ravel(), minlength=len(keys))
+            if values is not None else np.zeros(len(keys)))
+    ty, tx = np.divmod(keys, _TILE_STRIDE)
+    return _tile_frame(ty, tx - _TILE_STRIDE // 2, counts, sums, cell_km)
+
+
+def merge_tiles(a, b, cell_km=5.0):
+    merged = pd.concat([a, b]).groupby(["ty", "tx"], as_index=False)[["count", "sum"]].sum()
+    return _tile_frame(merged["ty"].to_numpy(), merged["tx"].to_numpy(), merged["count"].to_numpy(),
+                       merged["sum"].to_numpy(), cell_km)
+
+
+def _tile_frame(ty, tx, counts, sums, cell_km):
+    dlat, dlon = tile_size_deg(cell_km)
+    counts = np.asarray(counts, dtype=np.int64)
+    return pd.DataFrame({
+        "ty": ty, "tx": tx,
+        "lat": ty * dlat, "lon": tx * dlon,
+        "count": counts, "sum": np.asarray(sums, dtype=np.float64),
+        "mean": np.asarray(sums, dtype=np.float64) / np.maximum(counts, 1),
+    })
+
+
+@lru_cache(maxsize=None)
+def districts():
+    return LocationIndex.from_file(DISTRICTS_PATH)
+
+
+@lru_cache(maxsize=None)
+def upazilas():
+    """Upazila index, or None when no upazila file is installed."""
+    if not os.path.exists(UPAZILAS_PATH):
+        return None
+    return LocationIndex.from_file(UPAZILAS_PATH, cell_deg=0.1)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Assign random points in Bangladesh to districts.")
+    parser.add_argument("--points", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    index = districts()
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(20.6, 26.6, args.points)
+    lons = rng.uniform(88.0, 92.7, args.points)
+    start = time.perf_counter()
+    idx = index.assign(lats, lons)
+    elapsed = time.perf_counter() - start
+    print(f"{args.points:,} points assigned in {elapsed:.2f}s ({args.points / elapsed:,.0f}/s)")
+
+    sample = rng.choice(args.points, 2000, replace=False)
+    brute = haversine_km(lats[sample, None], lons[sample, None], index.lats, index.lons).argmin(axis=1)
+    print(f"agreement with brute force on {len(sample)} points: {(brute == idx[sample]).mean():.2%}")
+    start = time.perf_counter()
+    tiles = grid_tiles(lats, lons, cell_km=5)
+    print(f"{len(tiles):,} tiles in {time.perf_counter() - start:.2f}s")
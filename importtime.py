@@ -0,0 +1,53 @@
+"""Per-module import cost of a module, measured in a fresh interpreter with `python -X importtime`."""
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def report(module, python=sys.executable, cwd=ROOT, timeout=120):
+    """One row per imported module, in import order: module, self_ms, cumulative_ms, depth."""
+    proc = subprocess.run([python, "-X", "importtime", "-c", f"import {module}"], cwd=cwd,
+                          capture_output=True, text=True, timeout=timeout)
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"importing {module} failed")
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            rows.append({"module": m[4], "self_ms": int(m[1]) / 1000, "cumulative_ms": int(m[2]) / 1000,
+                         "depth": (len(m[3]) - 1) // 2})
+    return rows
+
+
+def total_ms(rows):
+    return sum(row["self_ms"] for row in rows)
+
+
+def top_level(rows, limit=None):
+    """Modules imported directly by the measured one, heaviest first; their cumulative cost includes
+    everything they pulled in. Interpreter start-up imports (site, encodings) are left out."""
+    # -X importtime prints children before their parent, one extra level of indent each
+    end = max(i for i, row in enumerate(rows) if row["depth"] == 0)
+    start = max((i for i, row in enumerate(rows[:end]) if row["depth"] == 0), default=-1) + 1
+    direct = sorted((row for row in rows[start:end] if row["depth"] == 1), key=lambda row: -row["cumulative_ms"])
+    return direct[:limit] if limit else direct
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Cold import cost of modules, heaviest dependencies first.")
+    parser.add_argument("modules", nargs="+", help="e.g. app views.search_page")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        rows = report(module)
+        print(f"{module}: {total_ms(rows):.0f} ms, {len(rows)} modules")
+        for row in top_level(rows, args.top):
+            print(f"  {row['cumulative_ms']:8.1f} ms  {row['module']}")
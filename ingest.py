@@ -0,0 +1,110 @@
+"""Stream a CSV/Parquet export of household activity data through the emission engine.
+
+    python ingest.py survey.csv scored.parquet --chunksize 200000
+
+Columns named after emissions.CATEGORIES (case-insensitive) are scored;
+every other column (household id, district, ...) is passed through. CSV
+pass-through columns are kept as text, so an id column that looks numeric
+in the first chunk and holds "x7" later still has one type in the output.
+"""
+import argparse
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import emissions
+
+CATEGORY_COLUMNS = {c.lower() for c in emissions.CATEGORIES}
+
+
+def detect_format(source, file_format=None):
+    if file_format is None:
+        name = source if isinstance(source, (str, os.PathLike)) else getattr(source, "name", "")
+        file_format = "parquet" if str(name).lower().endswith((".parquet", ".pq")) else "csv"
+    return file_format
+
+
+def iter_chunks(source, chunksize=100_000, file_format=None):
+    """Yield DataFrames of at most `chunksize` rows without reading the whole file."""
+    if detect_format(source, file_format) == "parquet":
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, chunksize=chunksize, dtype=_text_dtypes(source))
+
+
+def _text_dtypes(source):
+    """read_csv dtype mapping that reads every pass-through column as text; category columns are inferred."""
+    header = pd.read_csv(source, nrows=0).columns
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return {c: str for c in header if str(c).lower() not in CATEGORY_COLUMNS}
+
+
+def score_chunk(df, factors=None):
+    result = emissions.score(df, factors)
+    scored = result.to_frame(tons=True).add_suffix("_tons")
+    scored.index = df.index
+    passthrough = df[[c for c in df.columns if str(c).lower() not in CATEGORY_COLUMNS]]
+    return pd.concat([passthrough, scored], axis=1)
+
+
+def score_file(source, destination, chunksize=100_000, factors=None, file_format=None, progress=None):
+    """Score `source` chunk by chunk, appending each scored chunk to a Parquet file.
+
+    Returns a stats dict with rows, seconds and rows_per_sec. `progress`, if
+    given, is called with the running stats after every chunk.
+    """
+    started = time.perf_counter()
+    rows = 0
+    writer = None
+    file_format = detect_format(source, file_format)
+    source_types = {f.name: f.type for f in pq.read_schema(source)} if file_format == "parquet" else {}
+    try:
+        for chunk in iter_chunks(source, chunksize, file_format):
+            scored = score_chunk(chunk, factors)
+            if writer is None:
+                schema = _output_schema(pa.Table.from_pandas(scored, preserve_index=False).schema, source_types)
+                writer = pq.ParquetWriter(destination, schema)
+            writer.write_table(pa.Table.from_pandas(scored, schema=writer.schema, preserve_index=False))
+            rows += len(chunk)
+            if progress is not None:
+                progress(_stats(rows, started))
+    finally:
+        if writer is not None:
+            writer.close()
+    return _stats(rows, started)
+
+
+def _output_schema(schema, source_types):
+    """The first chunk's schema, except that a column that was empty throughout that chunk takes its
+    type from the source file (text for CSV) instead of Arrow's null type."""
+    return pa.schema([pa.field(f.name, source_types.get(f.name, pa.string())) if pa.types.is_null(f.type) else f
+                      for f in schema])
+
+
+def _stats(rows, started):
+    seconds = time.perf_counter() - started
+    return {"rows": rows, "seconds": seconds, "rows_per_sec": rows / seconds if seconds else 0.0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="input .csv or .parquet file")
+    parser.add_argument("destination", help="output .parquet file")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--format", choices=["csv", "parquet"], help="input format (default: from extension)")
+    args = parser.parse_args(argv)
+
+    def report(stats):
+        print(f"\r{stats['rows']:,} rows · {stats['rows_per_sec']:,.0f} rows/s", end="", flush=True)
+
+    stats = score_file(args.source, args.destination, args.chunksize, file_format=args.format, progress=report)
+    print(f"\nScored {stats['rows']:,} rows in {stats['seconds']:.2f}s ({stats['rows_per_sec']:,.0f} rows/s) -> {args.destination}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""In-process gateway in front of the single Ollama server.
+
+Requests wait in per-user queues that are served round-robin, at most
+`max_in_flight` generations run upstream at once, and identical prompts
+that are queued or running share one upstream generation.
+
+All generations go through one pooled HTTP session with `keep_alive`, so
+the model stays loaded between questions. Ollama's own timings (model
+load, prompt evaluation, generation) are collected for metrics().
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict, deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import assistant
+import telemetry
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+    """One upstream generation; any number of subscribers can stream its tokens."""
+
+    def __init__(self, key, user, prompt, context=None):
+        self.key = key
+        self.user = user
+        self.prompt = prompt
+        self.context = context
+        self.created = time.perf_counter()
+        self.started = None
+        self.finished = None
+        self.generation = None
+        self.error = None
+        self.subscribers = 1
+        self._tokens = []
+        self._done = False
+        self._cond = threading.Condition()
+        self._gateway = None
+
+    @property
+    def wait_time(self):
+        return None if self.started is None else self.started - self.created
+
+    @property
+    def done(self):
+        return self._done
+
+    def _append(self, token):
+        with self._cond:
+            self._tokens.append(token)
+            self._cond.notify_all()
+
+    def _finish(self, error=None):
+        with self._cond:
+            self.error = error
+            self.finished = time.perf_counter()
+            self._done = True
+            self._cond.notify_all()
+
+    def stream(self, poll=0.5):
+        """Yield every token from the start, blocking for new ones until the job finishes."""
+        i = 0
+        while True:
+            with self._cond:
+                while i >= len(self._tokens) and not self._done:
+                    self._cond.wait(poll)
+                tokens = self._tokens[i:]
+                done = self._done
+            yield from tokens
+            i += len(tokens)
+            if done and i >= len(self._tokens):
+                break
+        if self.error is not None:
+            raise self.error
+
+    def cancel(self):
+        """Drop this subscriber; the upstream call is abandoned once nobody is listening."""
+        if self._gateway is not None:
+            self._gateway._release(self)
+
+
+class LLMGateway:
+    def __init__(self, url, model, max_in_flight=2, max_queue=64, max_per_user=2,
+                 read_timeout=60, total_timeout=300, keep_alive=None, samples=1000):
+        self.url = url
+        self.model = model
+        self.max_queue = max_queue
+        self.max_per_user = max_per_user
+        self.read_timeout = read_timeout
+        self.total_timeout = total_timeout
+        self.keep_alive = keep_alive
+
+        # One connection per worker, reused across generations
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_in_flight)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._cond = threading.Condition()
+        self._queues = OrderedDict()   # user -> deque of queued jobs, in round-robin order
+        self._jobs = {}                # key -> queued or running job, for coalescing
+        self._running = 0
+        # "cancelled" counts generations stopped after they started; "abandoned" also counts queued jobs dropped
+        self.stats = {"submitted": 0, "coalesced": 0, "rejected": 0, "completed": 0, "failed": 0, "cancelled": 0,
+                      "abandoned": 0}
+        self._times = {name: telemetry.Series(samples) for name in ("wait", "service", "load", "prompt_eval", "eval")}
+
+        for i in range(max_in_flight):
+            threading.Thread(target=self._worker, name=f"llm-gateway-{i}", daemon=True).start()
+
+    def _key(self, prompt, context=None):
+        history = ",".join(map(str, context or ()))
+        return hashlib.sha256(f"{self.model}\0{history}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def preload(self, background=False):
+        """Ask Ollama to load the model now (a request without a prompt), so the first question
+        skips the load. Returns the load time in seconds, or starts a thread when `background`."""
+        if background:
+            threading.Thread(target=self._preload_quietly, name="llm-gateway-preload", daemon=True).start()
+            return None
+        payload = {"model": self.model, "stream": False}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        res = self.session.post(self.url, json=payload, timeout=(3.05, self.total_timeout))
+        if res.status_code != 200:
+            raise assistant.OllamaError(res.status_code)
+        return res.json().get("load_duration", 0) / 1e9
+
+    def _preload_quietly(self):
+        # The first question loads the model anyway if this fails
+        try:
+            self.preload()
+        except Exception:
+            pass
+
+    def submit(self, user, prompt, context=None):
+        """Queue a generation; `context` continues the conversation that returned those tokens."""
+        key = self._key(prompt, context)
+        with self._cond:
+            job = self._jobs.get(key)
+            if job is not None:
+                job.subscribers += 1
+                self.stats["coalesced"] += 1
+                return job
+            queued = self._queues.get(user, ())
+            if self.queue_depth() >= self.max_queue or len(queued) >= self.max_per_user:
+                self.stats["rejected"] += 1
+                raise QueueFull("The AI assistant is busy, please try again in a moment.")
+            job = Job(key, user, prompt, context)
+            job._gateway = self
+            self._queues.setdefault(user, deque()).append(job)
+            self._jobs[key] = job
+            self.stats["submitted"] += 1
+            self._cond.notify()
+            return job
+
+    def _release(self, job):
+        with self._cond:
+            job.subscribers -= 1
+            if job.subscribers > 0 or job.done:
+                return
+            self.stats["abandoned"] += 1
+            if job.started is None:
+                queue = self._queues.get(job.user)
+                if queue is not None and job in queue:
+                    queue.remove(job)
+                    if not queue:
+                        del self._queues[job.user]
+                self._jobs.pop(job.key, None)
+                job._finish()
+            elif job.generation is not None:
+                # A new submit of the same prompt must start a fresh generation, not join this one
+                if self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+                job.generation.cancel()
+
+    def _next_job(self):
+        # Round-robin across users: take one job from the first user, then move them to the back
+        user, queue = next(iter(self._queues.items()))
+        job = queue.popleft()
+        del self._queues[user]
+        if queue:
+            self._queues[user] = queue
+        return job
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._queues:
+                    self._cond.wait()
+                job = self._next_job()
+                job.started = time.perf_counter()
+                job.generation = assistant.Generation(self.url, self.model, job.prompt,
+                                                      read_timeout=self.read_timeout,
+                                                      total_timeout=self.total_timeout,
+                                                      session=self.session, context=job.context,
+                                                      keep_alive=self.keep_alive)
+                self._running += 1
+            error = None
+            try:
+                for token in job.generation:
+                    job._append(token)
+            except Exception as e:
+                error = e
+            with self._cond:
+                self._running -= 1
+                if self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+                cancelled = job.generation.cancelled
+                self.stats["failed" if error else "cancelled" if cancelled else "completed"] += 1
+                self._times["wait"].add(job.wait_time)
+                telemetry.observe("llm_queue_wait", job.wait_time)
+                if not cancelled:   # a cut-off generation would understate the service time
+                    self._times["service"].add(time.perf_counter() - job.started)
+                for phase, seconds in job.generation.durations.items():
+                    if phase in ("load", "prompt_eval", "eval"):
+                        self._times[phase].add(seconds)
+            job._finish(error)
+
+    def queue_depth(self):
+        return sum(len(q) for q in self._queues.values())
+
+    def metrics(self):
+        with self._cond:
+            metrics = {**self.stats, "queue_depth": self.queue_depth(), "in_flight": self._running}
+            for name, series in self._times.items():
+                q = series.quantiles()
+                metrics[f"{name}_p50"], metrics[f"{name}_p95"] = q[0.5], q[0.95]
+            return metrics
@@ -0,0 +1,75 @@
+"""Memoized computations and fragment sections, so a rerun redoes only what changed.
+
+    @memo.data("quiz")
+    def daily_quiz(user, day): ...
+
+    @memo.section("quiz")
+    def quiz_section(store, user): ...
+
+memo.data(name) is st.cache_data keyed on the function's arguments. Pass
+everything a result depends on as an argument (e.g. the user's current
+points), and the result is recomputed exactly when one of them changes.
+Arguments starting with "_" (stores, clients) are not hashed.
+memo.resource(name) is the same over st.cache_resource, for results that
+are shared without being copied.
+
+Sizes come from config.MEMO_LIMITS: (max entries, ttl seconds or None) per
+name. Past max entries the least recently used entry is evicted, and an
+entry older than its ttl is recomputed. To retune one cache without a code
+change, set ECO_MEMO_<NAME>=<entries>[:<ttl>].
+
+memo.section(name) runs a page section as an st.fragment. A widget inside
+it reruns only that section, not the whole page. The section's render
+time is recorded as the "section_render" span.
+
+ECO_MEMO=0 turns all of this off (plain calls, full-page reruns), so a
+benchmark can measure the difference.
+"""
+import functools
+import os
+
+import streamlit as st
+
+import telemetry
+from config import MEMO_ENABLED, MEMO_LIMITS
+
+DEFAULT_LIMITS = (256, None)
+
+
+def limits(name):
+    """(max_entries, ttl) for the cache `name`, after any ECO_MEMO_<NAME> override."""
+    entries, ttl = MEMO_LIMITS.get(name, DEFAULT_LIMITS)
+    override = os.environ.get(f"ECO_MEMO_{name.upper()}")
+    if override:
+        entries_text, _, ttl_text = override.partition(":")
+        entries = int(entries_text)
+        ttl = float(ttl_text) if ttl_text else ttl
+    return entries, ttl
+
+
+def data(name):
+    def decorator(fn):
+        if not MEMO_ENABLED:
+            return fn
+        entries, ttl = limits(name)
+        return st.cache_data(max_entries=entries, ttl=ttl, show_spinner=False)(fn)
+    return decorator
+
+
+def resource(name):
+    def decorator(fn):
+        if not MEMO_ENABLED:
+            return fn
+        entries, ttl = limits(name)
+        return st.cache_resource(max_entries=entries, ttl=ttl, show_spinner=False)(fn)
+    return decorator
+
+
+def section(name):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def render(*args, **kwargs):
+            with telemetry.span("section_render", section=name):
+                return fn(*args, **kwargs)
+        return st.fragment(render) if MEMO_ENABLED else render
+    return decorator
@@ -0,0 +1,125 @@
+"""Multiprocess district-level emission scoring over a shared-memory input matrix.
+
+    python parallel.py households.parquet --district-column district --workers 32
+
+The household matrix is copied once into multiprocessing.shared_memory;
+workers score row ranges of it in place and send back only per-district
+sums, which the parent adds together.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+import emissions
+
+# Set in each worker by _attach()
+_worker = {}
+
+
+def _share(array):
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    return shm
+
+
+def _attach(matrix_spec, codes_spec, weights, n_districts):
+    arrays = []
+    for name, shape, dtype in (matrix_spec, codes_spec):
+        shm = shared_memory.SharedMemory(name=name)
+        arrays.append((shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)))
+    _worker.update(shms=[a[0] for a in arrays], matrix=arrays[0][1], codes=arrays[1][1],
+                   weights=weights, n_districts=n_districts)
+
+
+def _score_shard(bounds):
+    start, stop = bounds
+    matrix = _worker["matrix"][start:stop]
+    codes = _worker["codes"][start:stop]
+    weights = _worker["weights"]
+    k = _worker["n_districts"]
+
+    totals = matrix @ weights.T                 # (rows, periods)
+    monthly = matrix * weights[1]               # (rows, categories)
+    sums = np.empty((k, totals.shape[1] + monthly.shape[1]))
+    for j in range(totals.shape[1]):
+        sums[:, j] = np.bincount(codes, weights=totals[:, j], minlength=k)
+    for j in range(monthly.shape[1]):
+        sums[:, totals.shape[1] + j] = np.bincount(codes, weights=monthly[:, j], minlength=k)
+    return np.bincount(codes, minlength=k), sums
+
+
+def _shards(n_rows, workers, shard_rows=None):
+    # A few shards per worker keeps cores busy when some finish early
+    shard_rows = shard_rows or max(1, -(-n_rows // (workers * 4)))
+    return [(i, min(i + shard_rows, n_rows)) for i in range(0, n_rows, shard_rows)]
+
+
+def score_by_district(inputs, districts, factors=None, workers=None, shard_rows=None):
+    """Per-district household counts plus total daily/monthly/yearly and monthly-by-category tons."""
+    matrix = np.ascontiguousarray(emissions.as_matrix(inputs))
+    codes, names = pd.factorize(pd.Series(districts), sort=True)
+    if (codes < 0).any():
+        raise ValueError("district column contains missing values")
+    codes = codes.astype(np.int64)
+    weights = emissions.factor_vector(factors)[None, :] * emissions.PERIOD_MULTIPLIERS
+    workers = workers or os.cpu_count() or 1
+
+    matrix_shm = _share(matrix)
+    codes_shm = _share(codes)
+    try:
+        initargs = (
+            (matrix_shm.name, matrix.shape, matrix.dtype),
+            (codes_shm.name, codes.shape, codes.dtype),
+            weights,
+            len(names),
+        )
+        counts = np.zeros(len(names), dtype=np.int64)
+        sums = np.zeros((len(names), len(emissions.PERIODS) + len(emissions.CATEGORIES)))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=initargs) as pool:
+            for shard_counts, shard_sums in pool.map(_score_shard, _shards(len(matrix), workers, shard_rows)):
+                counts += shard_counts
+                sums += shard_sums
+    finally:
+        for shm in (matrix_shm, codes_shm):
+            shm.close()
+            shm.unlink()
+
+    columns = [f"{p}_tons" for p in emissions.PERIODS] + [f"{c}_monthly_tons" for c in emissions.CATEGORIES]
+    out = pd.DataFrame(sums / 1000, index=pd.Index(names, name="district"), columns=columns)
+    out.insert(0, "households", counts)
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="input .csv or .parquet file")
+    parser.add_argument("--district-column", default="district")
+    parser.add_argument("--workers", type=int, default=None, help="default: all cores")
+    parser.add_argument("--output", help="write per-district totals to this .csv/.parquet file")
+    args = parser.parse_args(argv)
+
+    if args.source.lower().endswith((".parquet", ".pq")):
+        df = pd.read_parquet(args.source)
+    else:
+        df = pd.read_csv(args.source)
+    started = time.perf_counter()
+    result = score_by_district(df, df[args.district_column], workers=args.workers)
+    seconds = time.perf_counter() - started
+    print(f"Scored {len(df):,} households across {len(result)} districts in {seconds:.2f}s "
+          f"({len(df) / seconds:,.0f} rows/s)")
+    if args.output:
+        if args.output.lower().endswith(".parquet"):
+            result.to_parquet(args.output)
+        else:
+            result.to_csv(args.output)
+    else:
+        print(result[["households"] + [f"{p}_tons" for p in emissions.PERIODS]].to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""On-disk cache of Eco AI answers with exact and near-duplicate lookup.
+
+Exact hits are keyed on (model, system prompt, normalized question).
+Near-duplicate hits use a TF-IDF cosine index over cached questions that
+share the same model and system prompt.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from textvec import TfidfIndex, normalize
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    system TEXT NOT NULL,
+    prompt TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+
+def cache_key(prompt, model, system):
+    return hashlib.sha256("\0".join((model, system, normalize(prompt))).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path, max_entries=5000, ttl=7 * 24 * 3600, similarity=0.9, semantic=True):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity = similarity   # minimum cosine similarity for a near-duplicate hit
+        self.semantic = semantic
+        self.stats = {"exact_hits": 0, "similar_hits": 0, "misses": 0, "evictions": 0}
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._indexes = {}             # (model, system) -> TfidfIndex of cached prompts
+        with self._lock:
+            self._evict()
+            for key, model, system, prompt in self._db.execute("SELECT key, model, system, prompt FROM responses"):
+                self._index_for(model, system).add(key, prompt)
+
+    def _index_for(self, model, system):
+        if (model, system) not in self._indexes:
+            self._indexes[(model, system)] = TfidfIndex()
+        return self._indexes[(model, system)]
+
+    def _evict(self):
+        expired = self._db.execute("SELECT key, model, system FROM responses WHERE created < ?",
+                                   (time.time() - self.ttl,)).fetchall()
+        (count,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        overflow = max(0, count - len(expired) - self.max_entries)
+        if overflow:
+            expired += self._db.execute(
+                "SELECT key, model, system FROM responses WHERE created >= ? ORDER BY accessed LIMIT ?",
+                (time.time() - self.ttl, overflow)).fetchall()
+        if expired:
+            self._db.executemany("DELETE FROM responses WHERE key = ?", [(k,) for k, _, _ in expired])
+            self._db.commit()
+            for key, model, system in expired:
+                if (model, system) in self._indexes:
+                    self._indexes[(model, system)].remove(key)
+            self.stats["evictions"] += len(expired)
+
+    def _touch(self, key):
+        self._db.execute("UPDATE responses SET accessed = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+        self._db.commit()
+
+    def _lookup(self, key):
+        row = self._db.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] < time.time() - self.ttl:
+            return None
+        return row[0]
+
+    def get(self, prompt, model, system):
+        """Return (response, "exact" | "similar") or None."""
+        key = cache_key(prompt, model, system)
+        with self._lock:
+            response = self._lookup(key)
+            if response is not None:
+                self._touch(key)
+                self.stats["exact_hits"] += 1
+                return response, "exact"
+            if self.semantic and (model, system) in self._indexes:
+                for near_key, score in self._indexes[(model, system)].query(prompt, k=1):
+                    if score >= self.similarity:
+                        response = self._lookup(near_key)
+                        if response is not None:
+                            self._touch(near_key)
+                            self.stats["similar_hits"] += 1
+                            return response, "similar"
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, prompt, model, system, response):
+        key = cache_key(prompt, model, system)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, model, system, prompt, response, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, system, prompt, response, now, now))
+            self._db.commit()
+            self._index_for(model, system).add(key, prompt)
+            self._evict()
+
+    def hit_rate(self):
+        hits = self.stats["exact_hits"] + self.stats["similar_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
@@ -0,0 +1,216 @@
+"""Retrieval stage for the Eco AI Assistant: chunk curated documents, embed
+them, and find the chunks closest to a question within a latency budget.
+
+Embeddings default to signed feature hashing of unigrams and bigrams
+(HashingEmbedder), which needs no model and works for Bangla too.
+OllamaEmbedder uses a local embedding model instead. Vectors are L2
+normalized, so inner product is cosine similarity.
+
+FlatIndex scans every vector in blocks. IVFIndex clusters the vectors
+with k-means and scans only the lists whose centroids are closest to the
+query. Both stop early when the budget runs out and return the best hits
+found so far.
+"""
+import time
+import zlib
+
+import numpy as np
+import requests
+
+import telemetry
+from textvec import tokenize
+
+
+class HashingEmbedder:
+    def __init__(self, dim=256):
+        self.dim = dim
+
+    def _embed_one(self, text):
+        tokens = tokenize(text)
+        terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        v = np.zeros(self.dim, dtype=np.float32)
+        for term in terms:
+            h = zlib.crc32(term.encode("utf-8"))
+            # The top bit picks a sign, so colliding terms cancel out instead of piling up
+            v[h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        v = np.sign(v) * np.log1p(np.abs(v))
+        norm = np.linalg.norm(v)
+        return v / norm if norm else v
+
+    def embed(self, texts):
+        return np.stack([self._embed_one(t) for t in texts]) if texts else np.empty((0, self.dim), np.float32)
+
+
+class OllamaEmbedder:
+    def __init__(self, url, model="nomic-embed-text", timeout=(3.05, 30), session=None):
+        self.url = url                 # e.g. http://localhost:11434/api/embed
+        self.model = model
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.dim = None
+
+    def embed(self, texts):
+        with telemetry.span("upstream", target="ollama_embed"):
+            res = self.session.post(self.url, json={"model": self.model, "input": list(texts)}, timeout=self.timeout)
+        res.raise_for_status()
+        vectors = np.asarray(res.json()["embeddings"], dtype=np.float32)
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        self.dim = vectors.shape[1]
+        return vectors
+
+
+def _top_k(scores, ids, k):
+    if len(scores) > k:
+        keep = np.argpartition(-scores, k)[:k]
+        scores, ids = scores[keep], ids[keep]
+    order = np.argsort(-scores)
+    return scores[order], ids[order]
+
+
+class FlatIndex:
+    def __init__(self, dim, block=65536):
+        self.dim = dim
+        self.block = block
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def add(self, vectors):
+        self.vectors = np.vstack([self.vectors, np.asarray(vectors, dtype=np.float32)])
+
+    def search(self, query, k=5, budget_ms=None):
+        """(scores, ids, complete); complete is False when the budget cut the scan short."""
+        deadline = None if budget_ms is None else time.perf_counter() + budget_ms / 1000
+        best_s, best_i = np.empty(0, np.float32), np.empty(0, np.int64)
+        for start in range(0, len(self.vectors), self.block):
+            s = self.vectors[start:start + self.block] @ query
+            best_s, best_i = _top_k(np.concatenate([best_s, s]),
+                                    np.concatenate([best_i, np.arange(start, start + len(s))]), k)
+            if deadline is not None and time.perf_counter() > deadline and start + self.block < len(self.vectors):
+                return best_s, best_i, False
+        return best_s, best_i, True
+
+
+class IVFIndex:
+    def __init__(self, dim, nlist=256, nprobe=8, train_size=50000, iterations=10, seed=0):
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_size = train_size
+        self.iterations = iterations
+        self.seed = seed
+        self.centroids = None
+        self.vectors = np.empty((0, dim), dtype=np.float32)   # grouped by list
+        self.ids = np.empty(0, dtype=np.int64)                # original id of each row in self.vectors
+        self.offsets = None                                   # rows of list j: offsets[j]:offsets[j + 1]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _assign(self, vectors, chunk=65536):
+        return np.concatenate([np.argmax(vectors[i:i + chunk] @ self.centroids.T, axis=1)
+                               for i in range(0, len(vectors), chunk)]) if len(vectors) else np.empty(0, np.int64)
+
+    def train(self, vectors):
+        """Spherical k-means on a sample of `vectors`."""
+        rng = np.random.default_rng(self.seed)
+        nlist = min(self.nlist, len(vectors))
+        sample = vectors[rng.choice(len(vectors), min(len(vectors), self.train_size), replace=False)]
+        self.centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(self.iterations):
+            labels = self._assign(sample)
+            order = np.argsort(labels, kind="stable")
+            counts = np.bincount(labels, minlength=nlist)
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+            empty = counts == 0
+            sums = np.zeros_like(self.centroids)
+            sums[~empty] = np.add.reduceat(sample[order], starts[~empty])
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]   # re-seed empty clusters
+            self.centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+        self.nlist = nlist
+
+    def add(self, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.centroids is None:
+            self.train(vectors)
+        all_vectors = np.vstack([self.vectors, vectors])
+        all_ids = np.concatenate([self.ids, np.arange(len(self.ids), len(self.ids) + len(vectors))])
+        labels = self._assign(all_vectors)
+        order = np.argsort(labels, kind="stable")
+        self.vectors, self.ids = all_vectors[order], all_ids[order]
+        self.offsets = np.searchsorted(labels[order], np.arange(self.nlist + 1))
+
+    def search(self, query, k=5, budget_ms=None, nprobe=None):
+        deadline = None if budget_ms is None else time.perf_counter() + budget_ms / 1000
+        if self.centroids is None:
+            return np.empty(0, np.float32), np.empty(0, np.int64), True
+        probes = np.argsort(-(self.centroids @ query))[:nprobe or self.nprobe]
+        best_s, best_i = np.empty(0, np.float32), np.empty(0, np.int64)
+        for n, j in enumerate(probes):
+            start, end = self.offsets[j], self.offsets[j + 1]
+            best_s, best_i = _top_k(np.concatenate([best_s, self.vectors[start:end] @ query]),
+                                    np.concatenate([best_i, self.ids[start:end]]), k)
+            if deadline is not None and time.perf_counter() > deadline and n + 1 < len(probes):
+                return best_s, best_i, False
+        return best_s, best_i, True
+
+
+def chunk_text(text, max_words=120, overlap=20):
+    words = text.split()
+    if len(words) <= max_words:
+        return [text] if words else []
+    step = max_words - overlap
+    return [" ".join(words[i:i + max_words]) for i in range(0, max(len(words) - overlap, 1), step)]
+
+
+def estimate_tokens(text):
+    # Roughly what Llama/Mistral tokenizers produce for English; Bangla runs higher per word
+    return int(len(text.split()) * 1.4) + 1
+
+
+def format_context(hits, max_tokens=600):
+    """Numbered notes from the best hits, stopping before max_tokens."""
+    lines, used = [], 0
+    for _, chunk in hits:
+        line = f"[{len(lines) + 1}] {chunk['title']}: {chunk['text']}"
+        cost = estimate_tokens(line)
+        if used + cost > max_tokens:
+            break
+        lines.append(line)
+        used += cost
+    return "\n".join(lines)
+
+
+class Retriever:
+    def __init__(self, embedder, index_factory=None, min_score=0.1):
+        self.embedder = embedder
+        self.index_factory = index_factory or (lambda dim: FlatIndex(dim))
+        self.min_score = min_score
+        self.index = None
+        self.chunks = []
+        self.stats = {"queries": 0, "partial": 0, "last_ms": None}
+
+    def add_documents(self, docs, max_words=120):
+        chunks = [{"doc_id": doc["id"], "title": doc.get("title", ""), "text": part, "source": doc.get("source", "")}
+                  for doc in docs for part in chunk_text(doc.get("text", ""), max_words)]
+        if not chunks:
+            return
+        vectors = self.embedder.embed([f"{c['title']} {c['text']}" for c in chunks])
+        if self.index is None:
+            self.index = self.index_factory(vectors.shape[1])
+        self.index.add(vectors)
+        self.chunks += chunks
+
+    def retrieve(self, question, k=4, budget_ms=50):
+        """[(score, chunk)] best first, at most k, none below min_score."""
+        if self.index is None:
+            return []
+        start = time.perf_counter()
+        query = self.embedder.embed([question])[0]
+        scores, ids, complete = self.index.search(query, k, budget_ms=budget_ms)
+        self.stats["queries"] += 1
+        self.stats["partial"] += not complete
+        self.stats["last_ms"] = (time.perf_counter() - start) * 1000
+        telemetry.observe("retrieval", self.stats["last_ms"] / 1000)
+        return [(float(s), self.chunks[i]) for s, i in zip(scores, ids) if s >= self.min_score]
@@ -0,0 +1,262 @@
+"""DuckDuckGo instant-answer client with a memory + SQLite cache, request
+coalescing, a rate limit towards upstream and prefetching of popular queries.
+
+Queries are cached under their normalized form, so "Solar  Energy?" and
+"solar energy" share one entry; a query that normalizes to nothing (only
+punctuation or emoji) is keyed on its raw text. Every user query is counted
+in a query log; SearchPrefetcher keeps the most frequent ones fresh in the
+background.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import telemetry
+from textvec import query_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    fetched REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_fetched ON results (fetched);
+CREATE TABLE IF NOT EXISTS queries (
+    key TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    last REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS queries_count ON queries (count);
+"""
+
+
+class RateLimited(Exception):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate               # tokens added per second
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout=0.0, reserve=0):
+        """Take one token, waiting up to `timeout` seconds; `reserve` tokens are left for others."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1 + reserve:
+                    self._tokens -= 1
+                    return True
+                wait = (1 + reserve - self._tokens) / self.rate
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class SearchClient:
+    def __init__(self, api_url, path, ttl=24 * 3600, max_entries=256, max_disk_entries=20000,
+                 connect_timeout=3.05, read_timeout=8, rate=1.0, burst=5, rate_wait=5.0, pool_size=4,
+                 on_result=None):
+        self.api_url = api_url
+        self.on_result = on_result     # called with (query, data) after every upstream fetch
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.timeout = (connect_timeout, read_timeout)
+        self.rate_wait = rate_wait     # seconds a user query may wait for a rate-limit token
+        self.limiter = TokenBucket(rate, burst)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._db_lock = threading.Lock()
+
+        self._memory = OrderedDict()   # key -> (fetched, data)
+        self._inflight = {}            # key -> Future shared by concurrent identical queries
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0, "errors": 0,
+                      "rate_limited": 0, "evictions": 0}
+
+    def _remember(self, key, fetched, data):
+        with self._lock:
+            self._memory[key] = (fetched, data)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def _fetch(self, query, background):
+        # Background fetches never wait and leave one token spare for users
+        acquired = (self.limiter.acquire(reserve=1) if background else
+                    self.limiter.acquire(timeout=self.rate_wait))
+        if not acquired:
+            with self._lock:
+                self.stats["rate_limited"] += 1
+            raise RateLimited("Search is busy right now, please try again in a few seconds.")
+        params = {"q": query, "format": "json", "no_redirect": 1, "no_html": 1}
+        with telemetry.span("upstream", target="duckduckgo"):
+            res = self.session.get(self.api_url, params=params, timeout=self.timeout)
+        res.raise_for_status()
+        return res.json()
+
+    def _store(self, key, data):
+        fetched = time.time()
+        self._remember(key, fetched, data)
+        with self._db_lock:
+            self._db.execute("INSERT OR REPLACE INTO results (key, data, fetched) VALUES (?, ?, ?)",
+                             (key, json.dumps(data), fetched))
+            (count,) = self._db.execute("SELECT COUNT(*) FROM results").fetchone()
+            if count > self.max_disk_entries:
+                self._db.execute("DELETE FROM results WHERE key IN "
+                                 "(SELECT key FROM results ORDER BY fetched LIMIT ?)",
+                                 (count - self.max_disk_entries,))
+            self._db.commit()
+
+    def _log(self, key, query):
+        with self._db_lock:
+            self._db.execute("INSERT INTO queries (key, query, count, last) VALUES (?, ?, 1, ?) "
+                             "ON CONFLICT (key) DO UPDATE SET count = count + 1, last = excluded.last",
+                             (key, query.strip(), time.time()))
+            self._db.commit()
+
+    def cached(self, key):
+        """(fetched, data, "memory" | "disk") for a fresh cached entry, or None."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._memory.move_to_end(key)
+                return entry[0], entry[1], "memory"
+        with self._db_lock:
+            row = self._db.execute("SELECT fetched, data FROM results WHERE key = ?", (key,)).fetchone()
+        if row is not None and now - row[0] < self.ttl:
+            data = json.loads(row[1])
+            self._remember(key, row[0], data)
+            return row[0], data, "disk"
+        return None
+
+    def refresh(self, query, background=False):
+        """Fetch from upstream (sharing any identical request already in flight) and cache the result."""
+        key = query_key(query)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                owner = False
+            else:
+                future = self._inflight[key] = Future()
+                owner = True
+        if not owner:
+            return future.result()
+        try:
+            data = self._fetch(query, background)
+            self._store(key, data)
+            future.set_result(data)
+            if self.on_result is not None:
+                try:
+                    self.on_result(query, data)
+                except Exception:
+                    pass  # a failing listener must not fail the search
+            return data
+        except Exception as e:
+            if not isinstance(e, RateLimited):
+                with self._lock:
+                    self.stats["errors"] += 1
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def get(self, query):
+        """Return (data, source) where source is "memory", "disk" or "live"."""
+        key = query_key(query)
+        if not key:
+            raise ValueError("empty query")
+        self._log(key, query)
+        entry = self.cached(key)
+        if entry is not None:
+            with self._lock:
+                self.stats["memory_hits" if entry[2] == "memory" else "disk_hits"] += 1
+            return entry[1], entry[2]
+        with self._lock:
+            self.stats["misses"] += 1
+        return self.refresh(query), "live"
+
+    def popular(self, limit=20):
+        """Most frequently searched queries as [(query, count)], most frequent first."""
+        with self._db_lock:
+            return self._db.execute("SELECT query, count FROM queries ORDER BY count DESC, last DESC LIMIT ?",
+                                    (limit,)).fetchall()
+
+    def hit_rate(self):
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+
+class SearchPrefetcher:
+    """Re-fetches the most popular queries before their cached results expire."""
+
+    def __init__(self, client, interval=900, top=20, refresh_after=0.5):
+        self.client = client
+        self.interval = interval
+        self.top = top
+        self.refresh_after = refresh_after   # fraction of the TTL after which a popular entry is refreshed
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_cycle = {"started": None, "refreshed": 0, "fresh": 0, "skipped": 0}
+
+    def refresh_popular(self):
+        cycle = {"started": time.time(), "refreshed": 0, "fresh": 0, "skipped": 0}
+        for query, _ in self.client.popular(self.top):
+            entry = self.client.cached(query_key(query))
+            if entry is not None and time.time() - entry[0] < self.client.ttl * self.refresh_after:
+                cycle["fresh"] += 1
+                continue
+            try:
+                self.client.refresh(query, background=True)
+                cycle["refreshed"] += 1
+            except Exception:
+                cycle["skipped"] += 1
+        self.last_cycle = cycle
+        return cycle
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh_popular()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="search-prefetcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
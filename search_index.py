@@ -0,0 +1,256 @@
+"""Offline BM25 full-text index over the bundled eco corpus and cached web results.
+
+The index is a directory of immutable segments. Each add() writes one new
+segment, and merge() folds them together when there are too many. A
+segment's postings are plain .npy arrays opened with mmap_mode="r", so
+opening the index is cheap and the OS page cache is shared between
+processes:
+
+    terms.npy    sorted 64-bit term hashes
+    offsets.npy  postings range of each term (len(terms) + 1)
+    docs.npy     local doc number of each posting
+    tfs.npy      term frequency of each posting
+    lengths.npy  token count of each doc
+    live.npy     False where a newer segment replaced the doc
+    docs.jsonl   stored fields (id, title, text, source, url)
+
+Tokenization is textvec.tokenize, which covers English and Bangla.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+
+import telemetry
+from textvec import query_key, tokenize
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "eco_corpus.jsonl")
+
+
+def term_hash(term):
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little", signed=True)
+
+
+def load_corpus(path=CORPUS_PATH):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def corpus_digest(path=CORPUS_PATH):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def web_result_doc(query, data):
+    """Index document for a DuckDuckGo answer, or None when it has no abstract."""
+    abstract = data.get("Abstract", "").strip()
+    if not abstract:
+        return None
+    return {"id": f"web:{query_key(query)}", "title": data.get("Heading") or query.strip(), "text": abstract,
+            "source": "web", "url": data.get("AbstractURL", "")}
+
+
+def _doc_tokens(doc):
+    # Titles count twice, which is cheaper than a separate field boost at query time
+    return tokenize(f"{doc.get('title', '')} {doc.get('title', '')} {doc.get('text', '')}")
+
+
+class Segment:
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path)
+        load = lambda name: np.load(os.path.join(path, name), mmap_mode="r")
+        self.terms = load("terms.npy")
+        self.offsets = load("offsets.npy")
+        self.docs = load("docs.npy")
+        self.tfs = load("tfs.npy")
+        self.lengths = load("lengths.npy")
+        self.live = np.load(os.path.join(path, "live.npy"))   # small and rewritten in place, so not mapped
+        with open(os.path.join(path, "docs.jsonl"), encoding="utf-8") as f:
+            self.stored = [json.loads(line) for line in f]
+        self.ids = {doc["id"]: i for i, doc in enumerate(self.stored)}
+        self.sources = np.array([doc.get("source", "") for doc in self.stored])
+        self.live_length = int(self.lengths[self.live].sum())
+
+    @classmethod
+    def write(cls, path, docs):
+        postings = {}
+        lengths = np.zeros(len(docs), dtype=np.int32)
+        for i, doc in enumerate(docs):
+            tokens = _doc_tokens(doc)
+            lengths[i] = len(tokens)
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                postings.setdefault(term_hash(token), []).append((i, tf))
+
+        terms = np.array(sorted(postings), dtype=np.int64)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum([len(postings[t]) for t in terms], out=offsets[1:])
+        flat = [p for t in terms for p in postings[t]]
+        docs_arr = np.array([d for d, _ in flat], dtype=np.int32)
+        tfs = np.array([tf for _, tf in flat], dtype=np.float32)
+
+        tmp = f"{path}.tmp"
+        # Either can be left over from a write that crashed before the manifest listed it, so neither is in use
+        for stale in (tmp, path):
+            shutil.rmtree(stale, ignore_errors=True)
+        os.makedirs(tmp)
+        for name, arr in (("terms", terms), ("offsets", offsets), ("docs", docs_arr), ("tfs", tfs),
+                          ("lengths", lengths), ("live", np.ones(len(docs), dtype=bool))):
+            np.save(os.path.join(tmp, f"{name}.npy"), arr)
+        with open(os.path.join(tmp, "docs.jsonl"), "w", encoding="utf-8") as f:
+            for doc in docs:
+                f.write(json.dumps(doc, ensure_ascii=False) + "\n")
+        os.replace(tmp, path)
+        return cls(path)
+
+    def __len__(self):
+        return len(self.stored)
+
+    def postings(self, h):
+        i = np.searchsorted(self.terms, h)
+        if i == len(self.terms) or self.terms[i] != h:
+            return None, None
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.docs[start:end], self.tfs[start:end]
+
+    def kill(self, local_ids):
+        self.live[local_ids] = False
+        self.live_length = int(self.lengths[self.live].sum())
+        np.save(os.path.join(self.path, "live.npy"), self.live)
+
+
+class SearchIndex:
+    def __init__(self, path, k1=1.2, b=0.75, max_segments=8):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.max_segments = max_segments
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self.manifest = self._read_manifest()
+        self.segments = [Segment(os.path.join(path, name)) for name in self.manifest["segments"]]
+
+    def _read_manifest(self):
+        try:
+            with open(os.path.join(self.path, "manifest.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"segments": [], "next": 0, "corpus": None}
+
+    def _write_manifest(self):
+        tmp = os.path.join(self.path, "manifest.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp, os.path.join(self.path, "manifest.json"))
+
+    def __len__(self):
+        return sum(int(s.live.sum()) for s in self.segments)
+
+    def add(self, docs):
+        """Index docs as a new segment; a doc whose id is already indexed replaces the old copy."""
+        docs = list({doc["id"]: doc for doc in docs}.values())
+        if not docs:
+            return
+        with self._lock:
+            name = f"seg_{self.manifest['next']:06d}"
+            segment = Segment.write(os.path.join(self.path, name), docs)
+            for old in self.segments:
+                replaced = [old.ids[doc["id"]] for doc in docs if doc["id"] in old.ids]
+                if replaced:
+                    old.kill(replaced)
+            self.segments.append(segment)
+            self.manifest["segments"].append(name)
+            self.manifest["next"] += 1
+            self._write_manifest()
+            if len(self.segments) > self.max_segments:
+                self._merge()
+
+    def _merge(self):
+        live = [doc for s in self.segments for i, doc in enumerate(s.stored) if s.live[i]]
+        old = self.segments
+        name = f"seg_{self.manifest['next']:06d}"
+        self.segments = [Segment.write(os.path.join(self.path, name), live)]
+        self.manifest["segments"] = [name]
+        self.manifest["next"] += 1
+        self._write_manifest()
+        for s in old:
+            shutil.rmtree(s.path, ignore_errors=True)
+
+    def merge(self):
+        with self._lock:
+            if len(self.segments) > 1:
+                self._merge()
+
+    def ensure_corpus(self, path=CORPUS_PATH):
+        """Index the bundled corpus the first time, and again whenever the file changes."""
+        digest = corpus_digest(path)
+        if self.manifest.get("corpus") != digest:
+            self.add(load_corpus(path))
+            with self._lock:
+                self.manifest["corpus"] = digest
+                self._write_manifest()
+        return self
+
+    @telemetry.timed("local_search")
+    def search(self, query, k=5, sources=None, min_match=0.0):
+        """[(score, doc)] best first. `sources` restricts results to those doc sources; `min_match`
+        drops docs containing less than that fraction of the distinct query terms."""
+        hashes = sorted({term_hash(t) for t in tokenize(query)})
+        segments = self.segments
+        if not hashes or not segments:
+            return []
+        # Collection statistics count live docs only, so a replaced doc's old copy doesn't skew the IDF
+        n_docs = sum(int(s.live.sum()) for s in segments)
+        avg_len = sum(s.live_length for s in segments) / max(n_docs, 1)
+
+        hits = [[s.postings(h) for h in hashes] for s in segments]
+        df = np.zeros(len(hashes))
+        for s, seg_hits in zip(segments, hits):
+            df += [0 if docs is None else int(s.live[docs].sum()) for docs, _ in seg_hits]
+        idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+        results = []
+        for s, seg_hits in zip(segments, hits):
+            scores = np.zeros(len(s), dtype=np.float32)
+            matched = np.zeros(len(s), dtype=np.int32)
+            for w, (docs, tfs) in zip(idf, seg_hits):
+                if docs is not None:
+                    norm = self.k1 * (1 - self.b + self.b * s.lengths[docs] / avg_len)
+                    scores[docs] += w * tfs * (self.k1 + 1) / (tfs + norm)
+                    matched[docs] += 1
+            scores[~s.live] = 0
+            scores[matched < min_match * len(hashes)] = 0
+            if sources is not None:
+                scores[~np.isin(s.sources, list(sources))] = 0
+            top = np.argsort(-scores)[:k]
+            results += [(float(scores[i]), s.stored[i]) for i in top if scores[i] > 0]
+        results.sort(key=lambda r: -r[0])
+        return results[:k]
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Build the offline eco search index and run a query.")
+    parser.add_argument("path", help="index directory, e.g. .eco_data/search_index")
+    parser.add_argument("query", nargs="?")
+    parser.add_argument("--merge", action="store_true", help="merge all segments into one")
+    args = parser.parse_args()
+
+    index = SearchIndex(args.path).ensure_corpus()
+    if args.merge:
+        index.merge()
+    print(f"{len(index)} docs in {len(index.segments)} segment(s)")
+    if args.query:
+        start = time.perf_counter()
+        results = index.search(args.query)
+        print(f"{(time.perf_counter() - start) * 1000:.2f} ms")
+        for score, doc in results:
+            print(f"{score:6.2f}  [{doc['source']}] {doc['title']}")
@@ -0,0 +1,157 @@
+"""Process-wide services shared by every session, created on first use.
+
+Each getter imports its module when first called, so a page only pays
+for the dependencies it actually touches.
+"""
+import os
+
+import streamlit as st
+
+from config import (CHART_CACHE_ENTRIES, CITIES, DATA_DIR, DUCKDUCKGO_API, EMISSION_MAP_REFRESH_INTERVAL,
+                    EMISSION_MAP_TILE_KM, OLLAMA_KEEP_ALIVE, OLLAMA_MAX_IN_FLIGHT, OLLAMA_MAX_QUEUE, OLLAMA_MODEL,
+                    OLLAMA_READ_TIMEOUT, OLLAMA_TOTAL_TIMEOUT, OLLAMA_URL, PROFILE_SAMPLE_RATE, PROFILE_SLOW_MS,
+                    RAG_EMBED_MODEL, RAG_INDEX, RAG_MIN_SCORE, RESPONSE_CACHE_SIMILARITY, RESPONSE_CACHE_TTL,
+                    SEARCH_CACHE_TTL, SEARCH_PREFETCH_INTERVAL, SEARCH_PREFETCH_TOP, SEARCH_RATE_PER_SEC,
+                    TASK_STORE_URL, TELEMETRY_PORT, TTS_BACKEND, TTS_CACHE_BYTES, WEATHER_API, WEATHER_CACHE_TTL,
+                    WEATHER_MAX_CONCURRENCY, WEATHER_REFRESH_INTERVAL)
+
+
+@st.cache_resource
+def get_weather_client():
+    from weather import WeatherClient
+
+    # Shared by every session in this server process; every fetch is also kept in the weather history
+    return WeatherClient(WEATHER_API, ttl=WEATHER_CACHE_TTL, max_per_host=WEATHER_MAX_CONCURRENCY,
+                         on_result=get_weather_history().record)
+
+
+@st.cache_resource
+def get_weather_history():
+    from timeseries import WeatherHistory
+
+    return WeatherHistory(os.path.join(DATA_DIR, "weather_history"))
+
+
+@st.cache_resource
+def get_weather_prefetcher():
+    from weather import WeatherPrefetcher
+
+    return WeatherPrefetcher(get_weather_client(), CITIES, interval=WEATHER_REFRESH_INTERVAL,
+                             workers=WEATHER_MAX_CONCURRENCY).start()
+
+
+@st.cache_resource
+def get_response_cache():
+    from response_cache import ResponseCache
+
+    return ResponseCache(os.path.join(DATA_DIR, "responses.sqlite"), ttl=RESPONSE_CACHE_TTL,
+                         similarity=RESPONSE_CACHE_SIMILARITY)
+
+
+@st.cache_resource
+def get_llm_gateway():
+    from llm_gateway import LLMGateway
+
+    gateway = LLMGateway(OLLAMA_URL, OLLAMA_MODEL, max_in_flight=OLLAMA_MAX_IN_FLIGHT, max_queue=OLLAMA_MAX_QUEUE,
+                         read_timeout=OLLAMA_READ_TIMEOUT, total_timeout=OLLAMA_TOTAL_TIMEOUT,
+                         keep_alive=OLLAMA_KEEP_ALIVE)
+    gateway.preload(background=True)
+    return gateway
+
+
+@st.cache_resource
+def get_tts_service():
+    from tts import TTSService
+
+    return TTSService(TTS_BACKEND, cache_bytes=TTS_CACHE_BYTES)
+
+
+@st.cache_resource
+def get_task_store():
+    from store import open_store
+
+    return open_store(TASK_STORE_URL)
+
+
+@st.cache_resource
+def get_household_log():
+    from emission_map import HouseholdLog
+
+    return HouseholdLog(os.path.join(DATA_DIR, "households.sqlite"))
+
+
+@st.cache_resource
+def get_emission_dataset():
+    import geo
+    from emission_map import CityEmissionDataset
+
+    return CityEmissionDataset(os.path.join(DATA_DIR, "city_emissions.parquet"), get_household_log(),
+                               geo.districts(), tile_km=EMISSION_MAP_TILE_KM).start(EMISSION_MAP_REFRESH_INTERVAL)
+
+
+@st.cache_resource
+def get_chart_cache():
+    import charts
+
+    return charts.ChartCache(CHART_CACHE_ENTRIES)
+
+
+@st.cache_resource
+def get_search_client():
+    from search import SearchClient
+    from search_index import web_result_doc
+
+    # Web answers are added to the local index, so the same question is answered offline next time
+    index = get_search_index()
+
+    def index_web_result(query, data):
+        doc = web_result_doc(query, data)
+        if doc is not None:
+            index.add([doc])
+
+    return SearchClient(DUCKDUCKGO_API, os.path.join(DATA_DIR, "search.sqlite"), ttl=SEARCH_CACHE_TTL,
+                        rate=SEARCH_RATE_PER_SEC, on_result=index_web_result)
+
+
+@st.cache_resource
+def get_search_prefetcher():
+    from search import SearchPrefetcher
+
+    return SearchPrefetcher(get_search_client(), interval=SEARCH_PREFETCH_INTERVAL, top=SEARCH_PREFETCH_TOP).start()
+
+
+@st.cache_resource
+def get_search_index():
+    from search_index import SearchIndex
+
+    return SearchIndex(os.path.join(DATA_DIR, "search_index")).ensure_corpus()
+
+
+@st.cache_resource
+def get_retriever():
+    import retrieval
+    from search_index import load_corpus
+
+    if RAG_EMBED_MODEL:
+        embedder = retrieval.OllamaEmbedder(OLLAMA_URL.replace("/api/generate", "/api/embed"), RAG_EMBED_MODEL)
+    else:
+        embedder = retrieval.HashingEmbedder()
+    index_factory = retrieval.IVFIndex if RAG_INDEX == "ivf" else retrieval.FlatIndex
+    retriever = retrieval.Retriever(embedder, index_factory, min_score=RAG_MIN_SCORE)
+    retriever.add_documents(load_corpus())
+    return retriever
+
+
+@st.cache_resource
+def get_metrics_server():
+    """The /metrics endpoint, or None when TELEMETRY_PORT is not set."""
+    import telemetry
+
+    return telemetry.MetricsServer(port=TELEMETRY_PORT).start() if TELEMETRY_PORT else None
+
+
+@st.cache_resource
+def get_rerun_profiler():
+    import telemetry
+
+    return telemetry.RerunProfiler(PROFILE_SAMPLE_RATE, PROFILE_SLOW_MS, out_dir=os.path.join(DATA_DIR, "profiles"))
@@ -0,0 +1,389 @@
+"""Persistent Tasks & Rewards storage with an append-only reward event log.
+
+open_store("sqlite:///path/to/tasks.sqlite") or open_store("memory://").
+
+Every task completion and quiz submission is appended to `events`, once:
+an event repeating a (user, day, kind, ref) already logged is dropped.
+Aggregates (per user and per city, by day/ISO week/month), the all-time
+leaderboard tables and daily streaks are advanced one event at a time
+from a watermark, so dashboard reads are primary-key lookups whatever
+the length of the history.
+"""
+import datetime
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    city TEXT,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    user_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    task_key TEXT NOT NULL,
+    task TEXT NOT NULL,
+    custom INTEGER NOT NULL,
+    done INTEGER NOT NULL,
+    PRIMARY KEY (user_id, day, task_key)
+);
+CREATE TABLE IF NOT EXISTS quiz (
+    user_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    PRIMARY KEY (user_id, day)
+);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    day TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    city TEXT,
+    kind TEXT NOT NULL,
+    points INTEGER NOT NULL,
+    ref TEXT NOT NULL DEFAULT ''
+);
+-- One reward per task per day and one per daily quiz, however often a session resubmits it
+CREATE UNIQUE INDEX IF NOT EXISTS events_once ON events (user_id, day, kind, ref);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS aggregates (
+    scope TEXT NOT NULL,
+    key TEXT NOT NULL,
+    period TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    points INTEGER NOT NULL,
+    events INTEGER NOT NULL,
+    PRIMARY KEY (scope, key, period, bucket)
+);
+CREATE TABLE IF NOT EXISTS streaks (
+    user_id TEXT PRIMARY KEY,
+    last_day TEXT NOT NULL,
+    current INTEGER NOT NULL,
+    best INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS city_members (
+    city TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    PRIMARY KEY (city, user_id)
+);
+CREATE TABLE IF NOT EXISTS user_totals (
+    user_id TEXT PRIMARY KEY,
+    city TEXT,
+    points INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS user_totals_rank ON user_totals (points DESC, user_id);
+CREATE INDEX IF NOT EXISTS user_totals_city_rank ON user_totals (city, points DESC);
+CREATE TABLE IF NOT EXISTS city_totals (
+    city TEXT PRIMARY KEY,
+    points INTEGER NOT NULL,
+    users INTEGER NOT NULL
+);
+"""
+
+
+def period_buckets(day):
+    """(period, bucket) pairs an event on ISO date `day` counts towards."""
+    d = datetime.date.fromisoformat(day)
+    year, week, _ = d.isocalendar()
+    return [("day", day), ("week", f"{year}-W{week:02d}"), ("month", day[:7])]
+
+
+def next_streak(streak, day):
+    """Advance a (last_day, current, best) streak with activity on `day`."""
+    if streak is None:
+        return day, 1, 1
+    last_day, current, best = streak
+    if day <= last_day:
+        return streak  # same day, or a late event for a day already counted
+    if datetime.date.fromisoformat(day) - datetime.date.fromisoformat(last_day) == datetime.timedelta(days=1):
+        current += 1
+    else:
+        current = 1
+    return day, current, max(best, current)
+
+
+def _summary(points, week_points, month_points, day_points, streak):
+    return {
+        "points": points,
+        "today": day_points,
+        "week": week_points,
+        "month": month_points,
+        "streak": streak[1] if streak else 0,
+        "best_streak": streak[2] if streak else 0,
+        "last_active": streak[0] if streak else None,
+    }
+
+
+class MemoryStore:
+    """Dict-backed store with the same interface; nothing survives a restart."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.cities = {}
+        self.tasks = {}        # (user, day) -> {task_key: (task, custom, done)}
+        self.quiz = {}         # (user, day) -> score
+        self.events = []
+        self.event_keys = set()  # (user, day, kind, ref) already logged
+        self.aggregates = {}   # (scope, key, period, bucket) -> points
+        self.points = {}       # user -> points
+        self.city_points = {}  # city -> (points, set of users)
+        self.streaks = {}      # user -> (last_day, current, best)
+
+    def set_profile(self, user, city):
+        with self._lock:
+            self.cities[user] = city
+
+    def save_task(self, user, day, task_key, task, custom, done):
+        with self._lock:
+            self.tasks.setdefault((user, day), {})[task_key] = (task, bool(custom), bool(done))
+
+    def record_quiz(self, user, day, score):
+        with self._lock:
+            self.quiz[(user, day)] = score
+
+    def record_event(self, user, city, day, kind, points, ref=""):
+        with self._lock:
+            if (user, day, kind, ref) in self.event_keys:
+                return
+            self.event_keys.add((user, day, kind, ref))
+            self.events.append((time.time(), day, user, city, kind, points, ref))
+            self.points[user] = self.points.get(user, 0) + points
+            for period, bucket in period_buckets(day):
+                for scope, key in (("user", user), ("city", city)):
+                    if key is not None:
+                        k = (scope, key, period, bucket)
+                        self.aggregates[k] = self.aggregates.get(k, 0) + points
+            if city is not None:
+                total, members = self.city_points.get(city, (0, set()))
+                self.city_points[city] = (total + points, members | {user})
+            self.streaks[user] = next_streak(self.streaks.get(user), day)
+
+    def load_day(self, user, day):
+        with self._lock:
+            tasks = [
+                {"key": k, "task": t, "custom": c, "done": d}
+                for k, (t, c, d) in self.tasks.get((user, day), {}).items()
+            ]
+            return {"tasks": tasks, "quiz_score": self.quiz.get((user, day))}
+
+    def user_points(self, user):
+        with self._lock:
+            return self.points.get(user, 0)
+
+    def user_summary(self, user, day):
+        with self._lock:
+            totals = {period: self.aggregates.get(("user", user, period, bucket), 0)
+                      for period, bucket in period_buckets(day)}
+            return _summary(self.points.get(user, 0), totals["week"], totals["month"], totals["day"],
+                            self.streaks.get(user))
+
+    def leaderboard(self, limit=10, city=None):
+        with self._lock:
+            rows = [(u, self.cities.get(u), p) for u, p in self.points.items()
+                    if city is None or self.cities.get(u) == city]
+        rows.sort(key=lambda r: (-r[2], r[0]))
+        return rows[:limit]
+
+    def city_totals(self):
+        with self._lock:
+            rows = [(c, p, len(members)) for c, (p, members) in self.city_points.items()]
+        return sorted(rows, key=lambda r: (-r[1], r[0]))
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class SQLiteStore:
+    """SQLite (WAL) store.
+
+    Writes are queued and committed in batches by a background thread, which
+    then folds any new events into the aggregate tables. Reads flush and
+    aggregate first so a session always sees its own writes.
+    """
+
+    def __init__(self, path, batch_size=500, flush_interval=0.5, aggregate_batch=10_000):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.aggregate_batch = aggregate_batch
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._db_lock = threading.Lock()
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        threading.Thread(target=self._writer, name="task-store-writer", daemon=True).start()
+
+    # ---- writes (batched) ----
+    def _queue(self, sql, params):
+        with self._pending_lock:
+            self._pending.append((sql, params))
+            if len(self._pending) >= self.batch_size:
+                self._wake.set()
+
+    def set_profile(self, user, city):
+        self._queue("INSERT INTO users (user_id, city, created) VALUES (?, ?, ?) "
+                    "ON CONFLICT (user_id) DO UPDATE SET city = excluded.city", (user, city, time.time()))
+        self._queue("UPDATE user_totals SET city = ? WHERE user_id = ?", (city, user))
+
+    def save_task(self, user, day, task_key, task, custom, done):
+        self._queue("INSERT INTO tasks (user_id, day, task_key, task, custom, done) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (user_id, day, task_key) DO UPDATE SET task = excluded.task, done = excluded.done",
+                    (user, day, task_key, task, int(bool(custom)), int(bool(done))))
+
+    def record_quiz(self, user, day, score):
+        self._queue("INSERT OR REPLACE INTO quiz (user_id, day, score) VALUES (?, ?, ?)", (user, day, score))
+
+    def record_event(self, user, city, day, kind, points, ref=""):
+        self._queue("INSERT OR IGNORE INTO events (ts, day, user_id, city, kind, points, ref) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", (time.time(), day, user, city, kind, points, ref))
+
+    def flush(self):
+        with self._pending_lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        with self._db_lock:
+            self._db.execute("BEGIN")
+            try:
+                for sql, params in batch:
+                    self._db.execute(sql, params)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                # Keep the batch, ahead of anything queued since, so the next flush retries it in order
+                with self._pending_lock:
+                    self._pending[:0] = batch
+                raise
+
+    # ---- incremental aggregation ----
+    def _apply_event(self, db, day, user, city, points):
+        for period, bucket in period_buckets(day):
+            for scope, key in (("user", user), ("city", city)):
+                if key is not None:
+                    db.execute("INSERT INTO aggregates (scope, key, period, bucket, points, events) "
+                               "VALUES (?, ?, ?, ?, ?, 1) ON CONFLICT (scope, key, period, bucket) "
+                               "DO UPDATE SET points = points + excluded.points, events = events + 1",
+                               (scope, key, period, bucket, points))
+        db.execute("INSERT INTO user_totals (user_id, city, points) VALUES (?, ?, ?) "
+                   "ON CONFLICT (user_id) DO UPDATE SET points = points + excluded.points", (user, city, points))
+        if city is not None:
+            joined = db.execute("INSERT OR IGNORE INTO city_members (city, user_id) VALUES (?, ?)",
+                                (city, user)).rowcount
+            db.execute("INSERT INTO city_totals (city, points, users) VALUES (?, ?, ?) "
+                       "ON CONFLICT (city) DO UPDATE SET points = points + excluded.points, "
+                       "users = users + excluded.users", (city, points, joined))
+        row = db.execute("SELECT last_day, current, best FROM streaks WHERE user_id = ?", (user,)).fetchone()
+        streak = next_streak(row, day)
+        if streak != row:
+            db.execute("INSERT OR REPLACE INTO streaks (user_id, last_day, current, best) VALUES (?, ?, ?, ?)",
+                       (user, *streak))
+
+    def aggregate(self):
+        """Fold events past the watermark into the aggregates; returns how many were applied."""
+        applied = 0
+        with self._db_lock:
+            while True:
+                self._db.execute("BEGIN")
+                try:
+                    row = self._db.execute("SELECT value FROM meta WHERE name = 'aggregated_event_id'").fetchone()
+                    watermark = row[0] if row else 0
+                    events = self._db.execute(
+                        "SELECT id, day, user_id, city, points FROM events WHERE id > ? ORDER BY id LIMIT ?",
+                        (watermark, self.aggregate_batch)).fetchall()
+                    for _, day, user, city, points in events:
+                        self._apply_event(self._db, day, user, city, points)
+                    if events:
+                        self._db.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('aggregated_event_id', ?)",
+                                         (events[-1][0],))
+                    self._db.execute("COMMIT")
+                except Exception:
+                    self._db.execute("ROLLBACK")
+                    raise
+                applied += len(events)
+                if len(events) < self.aggregate_batch:
+                    return applied
+
+    def _writer(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+                self.aggregate()
+            except sqlite3.Error:
+                # The batch was rolled back and requeued; the next flush (here or from a read) retries it
+                log.exception("task store flush failed; will retry")
+
+    # ---- reads ----
+    def _query(self, sql, params=()):
+        self.flush()
+        self.aggregate()
+        with self._db_lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def load_day(self, user, day):
+        tasks = [
+            {"key": k, "task": t, "custom": bool(c), "done": bool(d)}
+            for k, t, c, d in self._query(
+                "SELECT task_key, task, custom, done FROM tasks WHERE user_id = ? AND day = ? ORDER BY rowid",
+                (user, day))
+        ]
+        quiz = self._query("SELECT score FROM quiz WHERE user_id = ? AND day = ?", (user, day))
+        return {"tasks": tasks, "quiz_score": quiz[0][0] if quiz else None}
+
+    def user_points(self, user):
+        row = self._query("SELECT points FROM user_totals WHERE user_id = ?", (user,))
+        return row[0][0] if row else 0
+
+    def user_summary(self, user, day):
+        buckets = period_buckets(day)
+        rows = dict(self._query(
+            "SELECT period, points FROM aggregates WHERE scope = 'user' AND key = ? AND "
+            "((period = ? AND bucket = ?) OR (period = ? AND bucket = ?) OR (period = ? AND bucket = ?))",
+            (user, *[v for pair in buckets for v in pair])))
+        streak = self._query("SELECT last_day, current, best FROM streaks WHERE user_id = ?", (user,))
+        return _summary(self.user_points(user), rows.get("week", 0), rows.get("month", 0), rows.get("day", 0),
+                        streak[0] if streak else None)
+
+    def leaderboard(self, limit=10, city=None):
+        if city is None:
+            return self._query("SELECT user_id, city, points FROM user_totals "
+                               "ORDER BY points DESC, user_id LIMIT ?", (limit,))
+        return self._query("SELECT user_id, city, points FROM user_totals WHERE city = ? "
+                           "ORDER BY points DESC, user_id LIMIT ?", (city, limit))
+
+    def city_totals(self):
+        return self._query("SELECT city, points, users FROM city_totals WHERE users > 0 ORDER BY points DESC, city")
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        self.flush()
+        self.aggregate()
+        with self._db_lock:
+            self._db.close()
+
+
+def open_store(url):
+    if url.startswith("memory://"):
+        return MemoryStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteStore(url[len("sqlite:///"):])
+    raise ValueError(f"unsupported task store URL: {url!r}")
@@ -0,0 +1,176 @@
+"""Local stand-ins for the upstream APIs so the app can run offline.
+
+    python stub_server.py --port 8765
+    WEATHER_API=http://localhost:8765/weather/ \
+    OLLAMA_URL=http://localhost:8765/api/generate \
+    DUCKDUCKGO_API=http://localhost:8765/search streamlit run app.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+def fake_weather(city):
+    rng = random.Random(city)
+    base = rng.uniform(18, 32)
+    today = date.today()
+    days = []
+    for d in range(3):
+        hourly = [
+            {"time": str(h * 300), "tempC": str(round(base + rng.uniform(-4, 4))),
+             "humidity": str(rng.randint(45, 95))}
+            for h in range(8)
+        ]
+        days.append({
+            "date": (today + timedelta(days=d)).isoformat(),
+            "avgtempC": str(round(base + rng.uniform(-2, 2))),
+            "hourly": hourly,
+        })
+    return {
+        "current_condition": [{
+            "localObsDateTime": datetime.now().strftime("%Y-%m-%d %I:%M %p"),
+            "temp_C": str(round(base)),
+            "humidity": str(rng.randint(45, 95)),
+            "weatherDesc": [{"value": rng.choice(["Sunny", "Partly cloudy", "Haze", "Light rain"])}],
+        }],
+        "weather": days,
+    }
+
+
+def fake_search(query):
+    slug = "_".join(query.split())
+    return {
+        "Abstract": f"{query.strip().capitalize()} is a topic in sustainable living." if query.strip() else "",
+        "RelatedTopics": [
+            {"Text": f"{query} {i}", "FirstURL": f"https://duckduckgo.com/{slug}_{i}"} for i in range(1, 4)
+        ],
+    }
+
+
+FAKE_ANSWER = (
+    "Switch off lights and fans when you leave a room, and use LED bulbs. "
+    "Take the bus or share a CNG instead of riding alone. "
+    "Carry a cloth bag and avoid single-use plastic."
+)
+
+
+def fake_tokens():
+    # Split into word-sized pieces the way Ollama streams sub-word tokens
+    return [w + " " for w in FAKE_ANSWER.split(" ")]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _delay(self):
+        # Network plus upstream processing time before the first byte, with +-50% jitter
+        if self.server.latency:
+            time.sleep(self.server.latency * random.uniform(0.5, 1.5))
+
+    def do_POST(self):
+        self._delay()
+        path = urlparse(self.path).path
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if path != "/api/generate":
+            self._send_json({"error": "not found"}, status=404)
+            return
+        # Like Ollama, the first request loads the model and a request without a prompt only loads it
+        load = 0 if self.server.loaded else self.server.load_time
+        self.server.loaded = True
+        if not body.get("prompt"):
+            time.sleep(load)
+            self._send_json({"model": body.get("model"), "response": "", "done": True, "done_reason": "load",
+                             "load_duration": int(load * 1e9)})
+            return
+        self.server.counts["generate"] += 1
+        time.sleep(load)
+        tokens = fake_tokens()
+        delay = self.server.token_delay
+        # Fake token ids: one per prompt word, appended to the context the client sent back
+        prompt_ids = [hash(w) % 32000 for w in body["prompt"].split()]
+        stats = {"load_duration": int(load * 1e9), "prompt_eval_count": len(prompt_ids),
+                 "prompt_eval_duration": int(len(prompt_ids) * 1e5), "eval_count": len(tokens),
+                 "eval_duration": int(delay * len(tokens) * 1e9),
+                 "context": list(body.get("context") or []) + prompt_ids + list(range(len(tokens)))}
+        stats["total_duration"] = stats["load_duration"] + stats["prompt_eval_duration"] + stats["eval_duration"]
+        if not body.get("stream", True):
+            time.sleep(delay * len(tokens))
+            self._send_json({"model": body.get("model"), "response": "".join(tokens), "done": True, **stats})
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for token in tokens:
+                time.sleep(delay)
+                self._send_chunk(json.dumps({"model": body.get("model"), "response": token, "done": False}).encode() + b"\n")
+            done = {"model": body.get("model"), "response": "", "done": True, **stats}
+            self._send_chunk(json.dumps(done).encode() + b"\n")
+            self._send_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True   # client cancelled mid-stream
+
+    def do_GET(self):
+        self._delay()
+        path = urlparse(self.path).path
+        if path.startswith("/weather/"):
+            self.server.counts["weather"] += 1
+            self._send_json(fake_weather(unquote(path[len("/weather/"):])))
+        elif path == "/search":
+            self.server.counts["search"] += 1
+            self._send_json(fake_search(parse_qs(urlparse(self.path).query).get("q", [""])[0]))
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def log_message(self, *args):
+        pass
+
+
+def make_server(host="127.0.0.1", port=0, token_delay=0.05, load_time=0.0, latency=0.0):
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.counts = {"weather": 0, "generate": 0, "search": 0}
+    server.token_delay = token_delay   # seconds between streamed Ollama tokens
+    server.load_time = load_time       # seconds the first request spends "loading the model"
+    server.latency = latency           # mean seconds before any response starts
+    server.loaded = False
+    return server
+
+
+def start(host="127.0.0.1", port=0, token_delay=0.05, load_time=0.0, latency=0.0):
+    """Start the stub server on a daemon thread and return it (port 0 picks a free port)."""
+    server = make_server(host, port, token_delay, load_time, latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--token-delay", type=float, default=0.05, help="seconds between streamed LLM tokens")
+    parser.add_argument("--load-time", type=float, default=0.0, help="seconds the first LLM request spends loading")
+    parser.add_argument("--latency", type=float, default=0.0, help="mean seconds before every response starts")
+    args = parser.parse_args()
+    server = make_server(args.host, args.port, args.token_delay, args.load_time, args.latency)
+    print(f"Stub upstreams on http://{args.host}:{args.port} "
+          "(weather: /weather/<city>, ollama: /api/generate, search: /search?q=)")
+    server.serve_forever()
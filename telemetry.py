@@ -0,0 +1,240 @@
+"""In-process latency telemetry: spans around hot paths, summarized as p50/p95/p99.
+
+    with telemetry.span("upstream", target="wttr"):
+        res = session.get(...)
+
+    @telemetry.timed("chart_build", chart="breakdown")
+    def build_breakdown(...): ...
+
+Each (name, labels) series keeps a count, a sum, an error count and the
+last `samples` durations; percentiles are computed when read. The
+process-wide REGISTRY is rendered as Prometheus text (summaries named
+eco_<name>_seconds) or as a JSON-friendly snapshot, and MetricsServer
+serves both at /metrics and /metrics.json.
+
+RerunProfiler runs cProfile on a sample of page reruns and keeps the
+profiles of the ones that turned out slow.
+"""
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Series:
+    def __init__(self, samples):
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+        self.samples = deque(maxlen=samples)
+
+    def add(self, seconds, error=False):
+        self.count += 1
+        self.total += seconds
+        self.errors += error
+        self.samples.append(seconds)
+
+    def quantiles(self):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {q: None for q in QUANTILES}
+        return {q: ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))] for q in QUANTILES}
+
+
+class Registry:
+    def __init__(self, samples=2048):
+        self.samples = samples
+        self._series = {}   # (name, sorted label items) -> Series
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds, error=False, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = Series(self.samples)
+            series.add(seconds, error)
+
+    @contextmanager
+    def span(self, name, **labels):
+        """Time the block; a block that raises is still timed and counted as an error."""
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, error, **labels)
+
+    def timed(self, name, **labels):
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name, **labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def snapshot(self):
+        """[{series, name, labels, count, errors, mean, p50, p95, p99}] in seconds, sorted by name;
+        `series` is the readable name{label="value"} form."""
+        with self._lock:
+            items = [(name, dict(labels), s.count, s.errors, s.total, s.quantiles())
+                     for (name, labels), s in sorted(self._series.items())]
+        return [{"series": name + _labels(labels), "name": name, "labels": labels, "count": count,
+                 "errors": errors, "mean": total / count, "p50": q[0.5], "p95": q[0.95], "p99": q[0.99]}
+                for name, labels, count, errors, total, q in items]
+
+    def prometheus(self):
+        """Prometheus text exposition format (0.0.4)."""
+        families = {}
+        for row in self.snapshot():
+            families.setdefault(row["name"], []).append(row)
+        lines = []
+        for name, rows in families.items():
+            metric = f"eco_{name}_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for row in rows:
+                labels = row["labels"]
+                for q in QUANTILES:
+                    lines.append(f"{metric}{_labels({**labels, 'quantile': q})} {row[f'p{round(q * 100)}']}")
+                lines.append(f"{metric}_sum{_labels(labels)} {row['mean'] * row['count']}")
+                lines.append(f"{metric}_count{_labels(labels)} {row['count']}")
+            lines.append(f"# TYPE eco_{name}_errors_total counter")
+            lines += [f"eco_{name}_errors_total{_labels(row['labels'])} {row['errors']}" for row in rows]
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+REGISTRY = Registry()
+observe = REGISTRY.observe
+span = REGISTRY.span
+timed = REGISTRY.timed
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        registry = self.server.registry
+        if self.path == "/metrics":
+            body, content_type = registry.prometheus().encode(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, content_type = json.dumps(registry.snapshot()).encode(), "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class MetricsServer:
+    """Serves a registry at /metrics (Prometheus text) and /metrics.json on a daemon thread."""
+
+    def __init__(self, registry=REGISTRY, host="127.0.0.1", port=9464):
+        self.server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self.server.registry = registry
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server.server_port
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class RerunProfiler:
+    """cProfile a random `sample_rate` of reruns; keep the last `keep` that took at least `slow_ms`.
+
+    Only one rerun is profiled at a time (Python allows one active profiler), so concurrent
+    sessions are simply not sampled while another profile is running.
+    """
+
+    def __init__(self, sample_rate=0.0, slow_ms=1000, keep=10, out_dir=None, top=25):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.out_dir = out_dir
+        self.top = top
+        self.recent = deque(maxlen=keep)   # {"label", "ms", "at", "stats", "path"}, newest last
+        self._busy = threading.Lock()
+
+    @contextmanager
+    def profile(self, label):
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate or not self._busy.acquire(blocking=False):
+            yield
+            return
+        try:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:   # another profiler (e.g. a debugger) is active
+                yield
+                return
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                self._keep_if_slow(label, profiler, (time.perf_counter() - start) * 1000)
+        finally:
+            self._busy.release()
+
+    def _keep_if_slow(self, label, profiler, ms):
+        if ms < self.slow_ms:
+            return
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(self.top)
+        path = None
+        if self.out_dir:
+            os.makedirs(self.out_dir, exist_ok=True)
+            path = os.path.join(self.out_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{label}.prof")
+            profiler.dump_stats(path)
+        self.recent.append({"label": label, "ms": ms, "at": time.time(), "stats": out.getvalue(), "path": path})
+
+
+if __name__ == "__main__":
+    import argparse
+    import urllib.request
+
+    parser = argparse.ArgumentParser(description="Print the telemetry of a running app.")
+    parser.add_argument("--url", default="http://127.0.0.1:9464/metrics.json")
+    args = parser.parse_args()
+
+    with urllib.request.urlopen(args.url, timeout=5) as res:
+        rows = json.load(res)
+    print(f"{'series':48} {'count':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for row in rows:
+        print(f"{row['series']:48} {row['count']:>7} {row['p50'] * 1000:8.1f} {row['p95'] * 1000:8.1f} {row['p99'] * 1000:8.1f}")
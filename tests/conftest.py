@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import stub_server  # noqa: E402
+
+
+@pytest.fixture
+def stub():
+    """stub_server.py on a free port; its counts show how many upstream calls were made."""
+    server = stub_server.start(token_delay=0.02)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def stub_url(stub):
+    return f"http://127.0.0.1:{stub.server_address[1]}"
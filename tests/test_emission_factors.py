@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+import emissions
+from emission_factors import FactorRegistry
+
+BASE = dict(zip(emissions.CATEGORIES, [0.1] * len(emissions.CATEGORIES)))
+
+
+def factor_set(year, version, region="Bangladesh", **factors):
+    return {"region": region, "year": year, "version": version, "factors": {**BASE, **factors}}
+
+
+def test_the_latest_year_and_version_win_by_default():
+    registry = FactorRegistry([
+        factor_set(2025, "1.9", CNG=1.9),
+        factor_set(2025, "1.10", CNG=1.10),   # numeric, not string, version order
+        factor_set(2024, "3", CNG=3.0),
+        factor_set(2030, "1", region="India", CNG=9.0),
+    ])
+    assert registry.regions() == ["Bangladesh", "India"]
+    cng = emissions.CATEGORY_INDEX["CNG"]
+    assert registry.vector()[cng] == 1.10
+    assert registry.vector(year=2024)[cng] == 3.0
+    assert registry.vector(year=2025, version=1.9)[cng] == 1.9
+    assert registry.label(registry.row(year=2025)) == "Bangladesh 2025 v1.10"
+    with pytest.raises(KeyError):
+        registry.row(year=2025, version="2")
+    with pytest.raises(KeyError):
+        registry.row(region="Nepal")
+
+
+def test_the_matrix_follows_category_order_and_is_read_only():
+    registry = FactorRegistry([factor_set(2025, "1", Waste=7.0)])
+    assert registry.matrix.shape == (1, len(emissions.CATEGORIES))
+    assert registry.matrix[0, emissions.CATEGORY_INDEX["Waste"]] == 7.0
+    with pytest.raises(ValueError):
+        registry.matrix[0, 0] = 1.0
+
+
+@pytest.mark.parametrize("factor_sets", [
+    [],
+    [{"region": "Bangladesh", "year": 2025, "factors": BASE}],
+    [factor_set(2025, "1", Solar=0.1)],
+    [{**factor_set(2025, "1"), "factors": {k: v for k, v in BASE.items() if k != "LPG"}}],
+    [factor_set(2025, "1", LPG=-1.0)],
+    [factor_set(2025, "1", LPG=float("nan"))],
+    [factor_set(2025, "1", LPG=True)],
+    [factor_set(2025, "1"), factor_set(2025, 1)],
+])
+def test_invalid_factor_files_are_rejected(factor_sets):
+    with pytest.raises(ValueError):
+        FactorRegistry(factor_sets)
+
+
+def test_from_file(tmp_path):
+    path = tmp_path / "factors.json"
+    path.write_text(json.dumps({"factor_sets": [factor_set(2025, "2", Bus=0.5)]}))
+    assert FactorRegistry.from_file(str(path)).vector()[emissions.CATEGORY_INDEX["Bus"]] == 0.5
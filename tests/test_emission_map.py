@@ -0,0 +1,58 @@
+import pytest
+
+import emission_map
+import fileio
+import geo
+from emission_map import CityEmissionDataset, HouseholdLog
+
+DHAKA = (23.8103, 90.4125)
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    log = HouseholdLog(str(tmp_path / "households.sqlite"))
+    return CityEmissionDataset(str(tmp_path / "city_emissions.parquet"), log, geo.districts())
+
+
+def household(cng):
+    return {**emission_map.BASELINE_HOUSEHOLD, "CNG": cng}
+
+
+def dhaka(dataset):
+    return dataset.load().set_index("City").loc["Dhaka"]
+
+
+def test_refresh_folds_only_new_submissions(dataset):
+    assert dataset.load()["estimated"].all()
+    dataset.log.append("Dhaka", household(10))
+    dataset.log.append("Dhaka", household(30), *DHAKA)
+    assert dataset.refresh() == 2
+    assert dataset.refresh() == 0
+    dataset.log.append("Sylhet", household(0))
+    assert dataset.refresh() == 1
+    assert dhaka(dataset)["households"] == 2
+    assert dataset.load_tiles()["count"].sum() == 1
+
+
+def test_a_refresh_that_dies_after_the_tiles_does_not_count_them_twice(dataset, monkeypatch):
+    dataset.log.append("Dhaka", household(10), *DHAKA)
+    dataset.refresh()
+    dataset.log.append("Dhaka", household(20), *DHAKA)
+
+    write = fileio.write_atomic
+
+    def crash_on_main_file(table, path):
+        if path == dataset.path:
+            raise OSError("disk full")
+        write(table, path)
+
+    monkeypatch.setattr(fileio, "write_atomic", crash_on_main_file)
+    with pytest.raises(OSError):
+        dataset.refresh()
+    monkeypatch.setattr(fileio, "write_atomic", write)
+
+    assert dataset.refresh() == 1
+    assert dhaka(dataset)["households"] == 2
+    tiles = dataset.load_tiles()
+    assert tiles["count"].sum() == 2
+    assert dhaka(dataset)["monthly_tons_sum"] == pytest.approx(tiles["sum"].sum())
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+import emissions
+from emission_factors import FactorRegistry, default_registry
+
+# The factors and formulas of the original calculator page, kept here verbatim as the reference
+EF = {
+    "CNG": 0.055, "Bus": 0.028, "Uber": 0.14,
+    "Bike": 0.005, "Motorbike": 0.08, "Air": 0.25,
+    "Electricity": 0.62, "LPG": 1.5, "Water": 0.0003,
+    "Diet": 1.15, "Waste": 0.09
+}
+
+
+def baseline(v, ef=EF):
+    daily = (ef["CNG"] * v["CNG"] + ef["Bus"] * v["Bus"] + ef["Uber"] * v["Uber"] + ef["Bike"] * v["Bike"]
+             + ef["Motorbike"] * v["Motorbike"] + ef["Water"] * v["Water"] + ef["Diet"] * v["Diet"])
+    monthly = (daily * 30 + ef["Electricity"] * v["Electricity"] + ef["LPG"] * v["LPG"] + ef["Air"] * v["Air"]
+               + ef["Waste"] * v["Waste"] * 4)
+    yearly = (daily * 365 + ef["Electricity"] * v["Electricity"] * 12 + ef["LPG"] * v["LPG"] * 12
+              + ef["Air"] * v["Air"] * 12 + ef["Waste"] * v["Waste"] * 52)
+    breakdown = {
+        "CNG": ef["CNG"] * v["CNG"] * 30, "Bus": ef["Bus"] * v["Bus"] * 30, "Uber": ef["Uber"] * v["Uber"] * 30,
+        "Bike": ef["Bike"] * v["Bike"] * 30, "Motorbike": ef["Motorbike"] * v["Motorbike"] * 30,
+        "Electricity": ef["Electricity"] * v["Electricity"], "LPG": ef["LPG"] * v["LPG"],
+        "Water": ef["Water"] * v["Water"] * 30, "Air": ef["Air"] * v["Air"], "Diet": ef["Diet"] * v["Diet"] * 30,
+        "Waste": ef["Waste"] * v["Waste"] * 4,
+    }
+    return {"daily": daily / 1000, "monthly": monthly / 1000, "yearly": yearly / 1000,
+            "breakdown": {k: b / 1000 for k, b in breakdown.items()}}
+
+
+def households(n, seed=0):
+    rng = np.random.default_rng(seed)
+    high = {"CNG": 100, "Bus": 100, "Uber": 50, "Bike": 50, "Motorbike": 50, "Air": 3000,
+            "Electricity": 1000, "LPG": 50, "Water": 500, "Diet": 10, "Waste": 50}
+    return [{c: float(rng.uniform(0, high[c])) for c in emissions.CATEGORIES} for _ in range(n)]
+
+
+def rows_matrix(rows):
+    return np.array([[r[c] for c in emissions.CATEGORIES] for r in rows])
+
+
+def test_default_factors_are_the_calculator_defaults():
+    assert dict(zip(emissions.CATEGORIES, default_registry().vector())) == EF
+
+
+def test_calculate_matches_baseline():
+    slider_defaults = {"CNG": 10, "Bus": 10, "Uber": 5, "Bike": 5, "Motorbike": 5, "Air": 0,
+                       "Electricity": 200, "LPG": 5, "Water": 100, "Diet": 3, "Waste": 5}
+    for values in [slider_defaults] + households(50):
+        got, want = emissions.calculate(values), baseline(values)
+        for period in emissions.PERIODS:
+            assert got[period] == pytest.approx(want[period], rel=1e-12, abs=1e-15)
+        assert got["breakdown"]["monthly"] == pytest.approx(want["breakdown"], rel=1e-12, abs=1e-15)
+
+
+def test_score_matches_calculate_row_by_row():
+    rows = households(200, seed=1)
+    result = emissions.score(rows_matrix(rows))
+    for i, values in enumerate(rows):
+        want = baseline(values)
+        assert result.totals[i] / 1000 == pytest.approx([want[p] for p in emissions.PERIODS], rel=1e-12)
+
+
+def test_score_accepts_dataframes_with_any_column_case():
+    import pandas as pd
+
+    rows = households(5, seed=2)
+    frame = pd.DataFrame(rows).rename(columns=str.lower)
+    frame["electricity"] = frame["electricity"].astype(str)
+    np.testing.assert_allclose(emissions.score(frame).totals, emissions.score(pd.DataFrame(rows)).totals)
+
+
+def test_score_versions_matches_baseline_per_factor_set():
+    rows = households(20, seed=3)
+    doubled = {c: f * 2 for c, f in EF.items()}
+    registry = FactorRegistry([
+        {"region": "Bangladesh", "year": 2024, "version": "1", "factors": EF},
+        {"region": "Bangladesh", "year": 2025, "version": "1", "factors": doubled},
+    ])
+    totals = emissions.score_versions(rows_matrix(rows), registry.matrix)
+    assert totals.shape == (20, 2, 3)
+    for i, values in enumerate(rows):
+        for s, factors in enumerate((EF, doubled)):
+            want = baseline(values, factors)
+            assert totals[i, s] / 1000 == pytest.approx([want[p] for p in emissions.PERIODS], rel=1e-12)
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import geo
+
+
+@pytest.fixture(scope="module")
+def index():
+    return geo.districts()
+
+
+def brute_force(index, lats, lons):
+    return geo.haversine_km(lats[:, None], lons[:, None], index.lats[None, :], index.lons[None, :]).argmin(axis=1)
+
+
+def test_the_64_districts_load():
+    assert len(geo.districts()) == 64
+    lat, lon = geo.districts().coords()["Dhaka"]
+    assert 23 < lat < 24.5 and 89.5 < lon < 91
+
+
+def test_assign_matches_brute_force_inside_and_off_the_grid(index):
+    rng = np.random.default_rng(5)
+    # Bangladesh, plus a margin that falls outside the grid
+    lats = rng.uniform(19.5, 27.5, 20_000)
+    lons = rng.uniform(86.0, 94.5, 20_000)
+    np.testing.assert_array_equal(index.assign(lats, lons, chunk_size=3_000), brute_force(index, lats, lons))
+
+
+def test_points_on_a_district_are_assigned_to_it(index):
+    assert list(index.names[index.assign(index.lats, index.lons)]) == list(index.names)
+
+
+def test_nearest_and_within_agree_with_distances(index):
+    lat, lon = 23.8103, 90.4125
+    d = geo.haversine_km(lat, lon, index.lats, index.lons)
+    order = np.argsort(d)
+    assert index.nearest(lat, lon) == [(index.names[order[0]], pytest.approx(d[order[0]]))]
+    assert [name for name, _ in index.nearest(lat, lon, k=5)] == list(index.names[order[:5]])
+    within = index.within(lat, lon, 120)
+    assert [name for name, _ in within] == list(index.names[order[d[order] <= 120]])
+    assert len(index.within(lat, lon, 5000)) == len(index)
+
+
+def test_bucket_counts_and_sums_per_district(index):
+    lats, lons = np.repeat(index.lats[:2], [3, 1]), np.repeat(index.lons[:2], [3, 1])
+    df = index.bucket(lats, lons, values=[1.0, 2.0, 3.0, 10.0])
+    assert df["count"].sum() == 4
+    assert df.loc[0, ["count", "sum", "mean"]].tolist() == [3, 6.0, 2.0]
+    assert df.loc[1, ["count", "sum", "mean"]].tolist() == [1, 10.0, 10.0]
+    assert df["mean"].iloc[2:].isna().all()
+
+
+def test_tiles_from_separate_batches_merge_into_the_whole(index):
+    rng = np.random.default_rng(6)
+    lats, lons, values = rng.uniform(22, 25, 1000), rng.uniform(89, 92, 1000), rng.uniform(0, 1, 1000)
+    whole = geo.grid_tiles(lats, lons, values)
+    merged = geo.merge_tiles(geo.grid_tiles(lats[:400], lons[:400], values[:400]),
+                             geo.grid_tiles(lats[400:], lons[400:], values[400:]))
+    key = ["ty", "tx"]
+    pd.testing.assert_frame_equal(whole.sort_values(key, ignore_index=True), merged.sort_values(key, ignore_index=True))
+    assert whole["count"].sum() == 1000
+    # Every point lies in its tile, whose side is cell_km
+    dlat, dlon = geo.tile_size_deg(5.0)
+    assert dlat * geo.KM_PER_DEG_LAT == pytest.approx(5.0)
+    ty = np.floor(lats / dlat).astype(np.int64)
+    assert set(ty) == set(whole["ty"])
@@ -0,0 +1,67 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+import emissions
+import ingest
+
+
+def survey(n=30):
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({c: rng.uniform(0, 20, n).round(2) for c in emissions.CATEGORIES})
+    frame.insert(0, "id", [str(i) for i in range(n)])
+    frame.insert(1, "district", [None] * 10 + ["Dhaka"] * (n - 10))   # empty throughout the first chunk
+    frame.loc[25, "id"] = "x7"                                        # ids look numeric until the third chunk
+    return frame
+
+
+def check(destination, frame):
+    out = pq.read_table(destination).to_pandas()
+    assert len(out) == len(frame)
+    assert list(out["id"]) == list(frame["id"])
+    assert out["district"].isna().sum() == 10 and out["district"].iloc[-1] == "Dhaka"
+    expected = emissions.score(frame).to_frame(tons=True)
+    np.testing.assert_allclose(out["monthly_tons"], expected["monthly"])
+    assert pq.read_schema(destination).field("id").type in (pa.string(), pa.large_string())
+
+
+def test_csv_columns_that_change_type_between_chunks(tmp_path):
+    frame = survey()
+    source = tmp_path / "survey.csv"
+    frame.to_csv(source, index=False)
+    stats = ingest.score_file(str(source), str(tmp_path / "scored.parquet"), chunksize=10)
+    assert stats["rows"] == len(frame)
+    check(tmp_path / "scored.parquet", frame)
+
+
+def test_csv_upload_file_object(tmp_path):
+    frame = survey()
+    upload = io.BytesIO(frame.to_csv(index=False).encode())
+    upload.name = "survey.CSV"
+    ingest.score_file(upload, str(tmp_path / "scored.parquet"), chunksize=7)
+    check(tmp_path / "scored.parquet", frame)
+
+
+@pytest.mark.parametrize("as_file", [False, True])
+def test_parquet_column_empty_in_the_first_batch(tmp_path, as_file):
+    frame = survey()
+    source = tmp_path / "survey.parquet"
+    pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), source, row_group_size=10)
+    if as_file:
+        source = io.BytesIO(source.read_bytes())
+        source.name = "survey.parquet"
+    ingest.score_file(source if as_file else str(source), str(tmp_path / "scored.parquet"), chunksize=10)
+    check(tmp_path / "scored.parquet", frame)
+
+
+def test_category_columns_are_matched_case_insensitively(tmp_path):
+    source = tmp_path / "survey.csv"
+    source.write_text("household,cng,ELECTRICITY\nh1,10,200\nh2,,abc\n")
+    ingest.score_file(str(source), str(tmp_path / "scored.parquet"))
+    out = pq.read_table(tmp_path / "scored.parquet").to_pandas()
+    assert list(out.columns) == ["household", "daily_tons", "monthly_tons", "yearly_tons"]
+    assert out["monthly_tons"].tolist() == pytest.approx([(0.055 * 10 * 30 + 0.62 * 200) / 1000, 0.0])
@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pytest
+
+import stub_server
+from llm_gateway import LLMGateway, QueueFull
+
+ANSWER = "".join(stub_server.fake_tokens())
+
+
+@pytest.fixture
+def gateway(stub_url):
+    return LLMGateway(f"{stub_url}/api/generate", "test-model", max_in_flight=1, max_queue=4, max_per_user=2)
+
+
+def started(job, timeout=5):
+    deadline = time.monotonic() + timeout
+    while job.started is None:
+        assert time.monotonic() < deadline, "job never started"
+        time.sleep(0.005)
+    return job
+
+
+def test_streams_the_full_answer(gateway):
+    job = gateway.submit("ana", "How do I save power?")
+    assert "".join(job.stream()) == ANSWER
+    assert job.generation.context
+    metrics = gateway.metrics()
+    assert metrics["completed"] == 1
+    assert 0 <= metrics["wait_p50"] <= metrics["wait_p95"]
+    assert 0 < metrics["service_p50"] <= metrics["service_p95"]
+
+
+def test_identical_prompts_share_one_generation(gateway, stub):
+    jobs = [gateway.submit(user, "How do I save power?") for user in ("ana", "bo", "cy")]
+    assert jobs[0] is jobs[1] is jobs[2]
+    answers = []
+    threads = [threading.Thread(target=lambda j=j: answers.append("".join(j.stream()))) for j in jobs]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+    assert answers == [ANSWER] * 3
+    assert stub.counts["generate"] == 1
+    assert gateway.stats["coalesced"] == 2
+
+
+def test_context_is_part_of_the_coalescing_key(gateway):
+    first = gateway.submit("ana", "And at home?", context=[1, 2, 3])
+    assert gateway.submit("bo", "And at home?", context=[4, 5]) is not first
+    assert gateway.submit("cy", "And at home?", context=[1, 2, 3]) is first
+
+
+def test_per_user_and_global_queue_limits(gateway):
+    started(gateway.submit("ana", "q1"))   # taken by the only worker
+    gateway.submit("ana", "q2")
+    gateway.submit("ana", "q3")
+    with pytest.raises(QueueFull):
+        gateway.submit("ana", "q4")
+    for i in range(2):   # fills the queue to max_queue=4
+        gateway.submit(f"user-{i}", f"other {i}")
+    with pytest.raises(QueueFull):
+        gateway.submit("late", "one too many")
+    assert gateway.stats["rejected"] == 2
+
+
+def test_cancelling_a_queued_job_removes_it(gateway):
+    running = started(gateway.submit("ana", "first"))
+    queued = gateway.submit("bo", "second")
+    queued.cancel()
+    assert queued.done and "".join(queued.stream()) == ""
+    assert gateway.queue_depth() == 0
+    assert gateway.submit("bo", "second") is not queued
+    assert "".join(running.stream()) == ANSWER
+
+
+def test_a_job_keeps_running_while_any_subscriber_listens(gateway):
+    job = gateway.submit("ana", "shared")
+    assert gateway.submit("bo", "shared") is job
+    job.cancel()
+    assert "".join(job.stream()) == ANSWER
+    assert gateway.stats["abandoned"] == 0
+
+
+def test_resubmitting_after_cancel_starts_a_fresh_generation(gateway, stub):
+    job = started(gateway.submit("ana", "How do I save power?"))
+    time.sleep(0.1)   # a few tokens in
+    job.cancel()
+    again = gateway.submit("ana", "How do I save power?")
+    assert again is not job
+    assert "".join(again.stream()) == ANSWER
+    assert not again.generation.cancelled
+    assert stub.counts["generate"] == 2
+    assert gateway.stats["abandoned"] == 1
+    assert (gateway.stats["cancelled"], gateway.stats["completed"]) == (1, 1)
+
+
+def test_a_cancelled_generation_finishing_does_not_drop_its_successor(gateway):
+    job = started(gateway.submit("ana", "q"))
+    job.cancel()
+    again = gateway.submit("bo", "q")
+    while not job.done:
+        time.sleep(0.005)
+    assert gateway.submit("cy", "q") is again   # still coalesces with the live job
+    assert "".join(again.stream()) == ANSWER
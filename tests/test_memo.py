@@ -0,0 +1,89 @@
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import memo
+import telemetry
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(memo, "MEMO_ENABLED", True)
+
+
+def test_limits_come_from_config_and_env_overrides(monkeypatch):
+    monkeypatch.setitem(memo.MEMO_LIMITS, "test_quiz", (64, 3600))
+    assert memo.limits("test_quiz") == (64, 3600)
+    assert memo.limits("test_unlisted") == memo.DEFAULT_LIMITS
+    monkeypatch.setenv("ECO_MEMO_TEST_QUIZ", "8")
+    assert memo.limits("test_quiz") == (8, 3600)
+    monkeypatch.setenv("ECO_MEMO_TEST_QUIZ", "8:60")
+    assert memo.limits("test_quiz") == (8, 60.0)
+
+
+def test_data_is_keyed_on_hashed_arguments_only(enabled):
+    calls = []
+
+    @memo.data("test_keyed")
+    def double(x, _store=None):
+        calls.append(x)
+        return [x * 2]
+
+    assert double(1) == double(1, _store=object()) == [2]
+    assert double(2) == [4]
+    assert calls == [1, 2]
+    double(1).append("mutated")   # cache_data hands out copies
+    assert double(1) == [2]
+
+
+def test_the_least_recently_used_entry_is_evicted(enabled, monkeypatch):
+    monkeypatch.setenv("ECO_MEMO_TEST_LRU", "2")
+    calls = []
+
+    @memo.resource("test_lru")
+    def load(x):
+        calls.append(x)
+        return object()
+
+    first = load("a")
+    load("b")
+    assert load("a") is first   # shared, not copied; "b" is now the oldest
+    load("c")
+    assert load("a") is first
+    load("b")
+    assert calls == ["a", "b", "c", "b"]
+
+
+def test_disabled_memo_is_a_plain_call(monkeypatch):
+    monkeypatch.setattr(memo, "MEMO_ENABLED", False)
+    calls = []
+
+    @memo.data("test_off")
+    def f(x):
+        calls.append(x)
+        return x
+
+    f(1), f(1)
+    assert calls == [1, 1]
+
+
+def page():
+    import streamlit as st
+
+    import memo
+
+    @memo.section("test_section")
+    def greeting(name):
+        st.write(f"Hello {name}")
+
+    greeting("ana")
+
+
+@pytest.mark.parametrize("memo_enabled", [True, False])
+def test_a_section_renders_and_is_timed(monkeypatch, memo_enabled):
+    telemetry.REGISTRY.reset()
+    monkeypatch.setattr(memo, "MEMO_ENABLED", memo_enabled)
+    at = AppTest.from_function(page).run()
+    assert not at.exception
+    assert [m.value for m in at.markdown] == ["Hello ana"]
+    [row] = [r for r in telemetry.REGISTRY.snapshot() if r["name"] == "section_render"]
+    assert row["labels"] == {"section": "test_section"} and row["count"] == 1
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import emissions
+import parallel
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(4)
+    df = pd.DataFrame(rng.uniform(0, 100, (500, len(emissions.CATEGORIES))), columns=emissions.CATEGORIES)
+    df["district"] = rng.choice(["Dhaka", "Khulna", "Sylhet", "Barishal"], len(df))
+    return df
+
+
+def direct(df, factors=None):
+    result = emissions.score(df, factors)
+    out = pd.DataFrame(result.totals / 1000, columns=[f"{p}_tons" for p in emissions.PERIODS])
+    monthly = result.breakdown("monthly") / 1000
+    for i, c in enumerate(emissions.CATEGORIES):
+        out[f"{c}_monthly_tons"] = monthly[:, i]
+    grouped = out.groupby(df["district"].to_numpy()).sum().rename_axis("district")
+    grouped.insert(0, "households", df.groupby("district").size())
+    return grouped
+
+
+@pytest.mark.parametrize("shard_rows", [None, 7, 10_000])
+def test_shared_memory_scoring_matches_direct_scoring(frame, shard_rows):
+    got = parallel.score_by_district(frame, frame["district"], workers=2, shard_rows=shard_rows)
+    pd.testing.assert_frame_equal(got, direct(frame), check_exact=False, rtol=1e-12)
+
+
+def test_custom_factors_reach_the_workers(frame):
+    doubled = 2 * emissions.factor_vector()
+    got = parallel.score_by_district(frame, frame["district"], factors=doubled, workers=2)
+    pd.testing.assert_frame_equal(got, direct(frame, doubled), check_exact=False, rtol=1e-12)
+
+
+def test_missing_districts_are_rejected(frame):
+    districts = frame["district"].where(frame.index != 3)
+    with pytest.raises(ValueError):
+        parallel.score_by_district(frame, districts, workers=1)
@@ -0,0 +1,72 @@
+import pytest
+
+import response_cache
+from response_cache import ResponseCache
+from textvec import TfidfIndex
+
+CACHED = "How can I save electricity and water at home?"
+NEAR = "How can I save electricity at home?"
+ANSWER = "Switch off lights and fans when you leave a room."
+
+
+def similarity(a, b):
+    index = TfidfIndex()
+    index.add("a", a)
+    index.add("other", "What is the Bangladesh Delta Plan?")   # gives the shared words a non-zero IDF
+    [(_, score)] = index.query(b, k=1)
+    return score
+
+
+@pytest.fixture
+def open_cache(tmp_path):
+    def open_cache(**kwargs):
+        return ResponseCache(str(tmp_path / "responses.sqlite"), **kwargs)
+    return open_cache
+
+
+def test_exact_hits_ignore_case_spacing_and_punctuation(open_cache):
+    cache = open_cache()
+    cache.put(CACHED, "mistral", "system", ANSWER)
+    assert cache.get("  how can I save ELECTRICITY and water at home ", "mistral", "system") == (ANSWER, "exact")
+    assert cache.get(CACHED, "llama3", "system") is None
+    assert cache.get(CACHED, "mistral", "another system") is None
+    assert cache.stats == {"exact_hits": 1, "similar_hits": 0, "misses": 2, "evictions": 0}
+    assert cache.hit_rate() == pytest.approx(1 / 3)
+
+
+def test_near_duplicates_hit_only_at_or_above_the_threshold(open_cache):
+    score = similarity(CACHED, NEAR)
+    assert 0 < score < 1
+    at = open_cache(similarity=score)
+    at.put(CACHED, "mistral", "system", ANSWER)
+    at.put("What is the Bangladesh Delta Plan?", "mistral", "system", "A 100-year water plan.")
+    assert at.get(NEAR, "mistral", "system") == (ANSWER, "similar")
+    assert at.get("How do I compost kitchen waste?", "mistral", "system") is None
+
+    above = open_cache(similarity=score + 1e-6)
+    assert above.get(NEAR, "mistral", "system") is None
+    assert open_cache(similarity=score, semantic=False).get(NEAR, "mistral", "system") is None
+
+
+def test_entries_survive_a_reopen_until_they_expire(open_cache, monkeypatch):
+    open_cache().put(CACHED, "mistral", "system", ANSWER)
+    assert open_cache().get(CACHED, "mistral", "system") == (ANSWER, "exact")
+
+    now = response_cache.time.time()
+    monkeypatch.setattr(response_cache.time, "time", lambda: now + 3600)
+    expired = open_cache(ttl=60)
+    assert expired.get(CACHED, "mistral", "system") is None
+    assert expired.stats["evictions"] == 1
+
+
+def test_the_least_recently_used_entry_is_evicted_first(open_cache, monkeypatch):
+    clock = iter(range(1_000_000, 2_000_000))
+    monkeypatch.setattr(response_cache.time, "time", lambda: next(clock))
+    cache = open_cache(max_entries=2, semantic=False)
+    cache.put("first question", "m", "s", "1")
+    cache.put("second question", "m", "s", "2")
+    assert cache.get("first question", "m", "s") == ("1", "exact")   # now the most recently used
+    cache.put("third question", "m", "s", "3")
+    assert cache.get("second question", "m", "s") is None
+    assert cache.get("first question", "m", "s") == ("1", "exact")
+    assert cache.stats["evictions"] == 1
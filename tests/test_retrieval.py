@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from retrieval import FlatIndex, HashingEmbedder, IVFIndex, Retriever, chunk_text, estimate_tokens, format_context
+
+DOCS = [
+    {"id": "solar", "title": "Rooftop solar", "text": "Solar panels on the roof cut electricity bills in Dhaka."},
+    {"id": "compost", "title": "Composting", "text": "Turn kitchen waste into compost for the garden."},
+    {"id": "bus", "title": "Commuting", "text": "Taking the bus emits far less CO2 than driving alone."},
+]
+
+
+def unit_vectors(n, dim=32, seed=0):
+    v = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def exact_top_k(vectors, query, k):
+    return np.argsort(-(vectors @ query), kind="stable")[:k]
+
+
+def test_hashing_embeddings_are_unit_length_and_deterministic():
+    embedder = HashingEmbedder(dim=64)
+    vectors = embedder.embed(["Save electricity at home", "save  ELECTRICITY at home!", "বিদ্যুৎ সাশ্রয়"])
+    assert vectors.shape == (3, 64)
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1, rtol=1e-6)
+    np.testing.assert_allclose(vectors[0], vectors[1])
+    assert embedder.embed([]).shape == (0, 64)
+
+
+def test_flat_index_matches_exact_search_across_blocks():
+    vectors = unit_vectors(1000)
+    index = FlatIndex(32, block=128)
+    index.add(vectors[:300])
+    index.add(vectors[300:])
+    for query in unit_vectors(5, seed=1):
+        scores, ids, complete = index.search(query, k=10)
+        assert complete
+        np.testing.assert_array_equal(ids, exact_top_k(vectors, query, 10))
+        np.testing.assert_allclose(scores, vectors[ids] @ query, rtol=1e-6)
+
+
+def test_an_exhausted_budget_returns_the_best_hits_so_far():
+    vectors = unit_vectors(1000)
+    index = FlatIndex(32, block=100)
+    index.add(vectors)
+    scores, ids, complete = index.search(vectors[0], k=3, budget_ms=0)
+    assert not complete
+    assert ids[0] == 0 and len(ids) == 3
+
+
+def test_ivf_probing_every_list_is_exact_and_keeps_original_ids():
+    vectors = unit_vectors(600)
+    index = IVFIndex(32, nlist=16, nprobe=16)
+    index.add(vectors[:400])
+    index.add(vectors[400:])   # assigned to the lists trained on the first batch
+    assert len(index) == 600
+    for query in unit_vectors(5, seed=2):
+        _, ids, complete = index.search(query, k=10)
+        assert complete
+        np.testing.assert_array_equal(ids, exact_top_k(vectors, query, 10))
+    _, ids, _ = index.search(vectors[450], k=1, nprobe=2)
+    assert ids[0] == 450   # a stored vector is always in its own centroid's list
+
+
+def test_chunks_overlap_and_notes_stop_at_the_token_budget():
+    words = [f"w{i}" for i in range(250)]
+    chunks = chunk_text(" ".join(words), max_words=100, overlap=20)
+    assert [c.split()[0] for c in chunks] == ["w0", "w80", "w160"]
+    assert chunks[-1].split()[-1] == "w249"
+    assert chunk_text("   ") == []
+
+    hits = [(0.9, {"title": "A", "text": "one two three"}), (0.8, {"title": "B", "text": "four five six"})]
+    first = "[1] A: one two three"
+    assert format_context(hits, max_tokens=estimate_tokens(first)) == first
+    assert format_context(hits).splitlines()[1] == "[2] B: four five six"
+
+
+@pytest.mark.parametrize("index_factory", [None, lambda dim: IVFIndex(dim, nlist=2, nprobe=2)])
+def test_retriever_finds_the_relevant_note(index_factory):
+    retriever = Retriever(HashingEmbedder(), index_factory)
+    assert retriever.retrieve("anything") == []
+    retriever.add_documents(DOCS)
+    [(score, chunk)] = retriever.retrieve("How do I compost kitchen waste?", k=1)
+    assert chunk["doc_id"] == "compost" and score > retriever.min_score
+    assert retriever.retrieve("compost kitchen waste", k=3)[0][1]["doc_id"] == "compost"
+    retriever.min_score = 0.99
+    assert retriever.retrieve("compost kitchen waste", k=3) == []
+    assert retriever.stats["queries"] == 3 and retriever.stats["last_ms"] is not None
@@ -0,0 +1,80 @@
+import pytest
+
+from search import SearchClient
+from search_index import SearchIndex, web_result_doc
+from textvec import query_key
+
+
+@pytest.fixture
+def client(tmp_path, stub_url):
+    return SearchClient(f"{stub_url}/search", str(tmp_path / "search.sqlite"))
+
+
+def test_query_key():
+    assert query_key("  Solar  Energy? ") == "solar energy"
+    assert query_key("🌱 ?") == "🌱 ?"
+    assert query_key("  ") == ""
+
+
+def test_equivalent_queries_share_one_upstream_call(client, stub):
+    assert client.get("Solar  Energy?")[1] == "live"
+    assert client.get("solar energy")[1] == "memory"
+    assert stub.counts["search"] == 1
+
+
+@pytest.mark.parametrize("query", ["???", "🌱🌍", "¿¡", "中文 能源"])
+def test_queries_that_normalize_to_nothing_are_still_searched(client, stub, query):
+    data, source = client.get(query)
+    assert source == "live" and "RelatedTopics" in data
+    assert client.get(f"  {query} ")[1] == "memory"
+    assert client.popular() == [(query, 2)]
+
+
+def test_blank_query_is_rejected(client):
+    with pytest.raises(ValueError):
+        client.get("   ")
+
+
+def test_web_docs_for_symbol_queries_get_distinct_ids():
+    data = {"Abstract": "Plants absorb CO2."}
+    assert web_result_doc("🌱", data)["id"] != web_result_doc("🌍", data)["id"]
+
+
+DOCS = [
+    {"id": "solar", "title": "Rooftop solar", "text": "Solar panels cut electricity bills.", "source": "corpus"},
+    {"id": "compost", "title": "Composting", "text": "Kitchen waste becomes garden compost.", "source": "corpus"},
+    {"id": "bus", "title": "Buses", "text": "A bus commute emits less than driving alone.", "source": "corpus"},
+]
+
+
+def scored(index, query):
+    return [(round(score, 5), doc["id"]) for score, doc in index.search(query, k=10)]
+
+
+def test_replaced_and_merged_docs_score_like_a_fresh_index(tmp_path):
+    index = SearchIndex(str(tmp_path / "index"), max_segments=100)
+    index.add(DOCS)
+    for i in range(3):   # old copies of "solar" stay in their segments, marked dead
+        index.add([{**DOCS[0], "text": f"Solar power, revision {i}. Solar panels cut electricity bills."}])
+    fresh = SearchIndex(str(tmp_path / "fresh"))
+    fresh.add(DOCS[1:] + [index.segments[-1].stored[0]])
+
+    assert len(index) == 3 and len(index.segments) == 4
+    for query in ["solar electricity", "compost garden", "bus"]:
+        assert scored(index, query) == scored(fresh, query)
+    index.merge()
+    assert len(index.segments) == 1
+    for query in ["solar electricity", "compost garden", "bus"]:
+        assert scored(index, query) == scored(fresh, query)
+
+
+def test_a_segment_left_by_a_crashed_write_is_replaced(tmp_path):
+    path = tmp_path / "index"
+    SearchIndex(str(path)).add(DOCS[:1])
+    for leftover in ("seg_000001", "seg_000001.tmp"):   # written, but never listed in the manifest
+        (path / leftover).mkdir()
+        (path / leftover / "docs.jsonl").write_text("stale\n")
+    index = SearchIndex(str(path))
+    index.add(DOCS[1:])
+    assert len(index) == 3
+    assert scored(index, "compost")[0][1] == "compost"
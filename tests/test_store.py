@@ -0,0 +1,136 @@
+import random
+import sqlite3
+
+import pytest
+
+from store import MemoryStore, SQLiteStore, next_streak, period_buckets
+
+USERS = [f"user-{i}" for i in range(12)]
+CITIES = ["Dhaka", "Chittagong", "Khulna", None]
+DAYS = ["2024-12-29", "2024-12-30", "2024-12-31", "2025-01-01", "2025-01-03", "2025-01-04"]
+
+
+@pytest.fixture
+def sqlite_store(tmp_path):
+    store = SQLiteStore(str(tmp_path / "tasks.sqlite"), batch_size=7, flush_interval=0.05, aggregate_batch=13)
+    yield store
+    store.close()
+
+
+def replay(stores, n=400, seed=0):
+    """The same random mix of profiles, tasks, quizzes and reward events applied to every store."""
+    rng = random.Random(seed)
+    cities = {user: rng.choice(CITIES) for user in USERS}
+    for user, city in cities.items():
+        for store in stores:
+            store.set_profile(user, city)
+    for i in range(n):
+        user, day = rng.choice(USERS), rng.choice(DAYS)
+        kind = rng.choice(["task", "quiz"])
+        points = rng.choice([10, 20]) if kind == "task" else rng.randint(0, 4) * 10
+        for store in stores:
+            if kind == "task":
+                store.save_task(user, day, f"t{i % 5}", f"Task {i % 5}", False, True)
+            else:
+                store.record_quiz(user, day, points // 10)
+            store.record_event(user, cities[user], day, kind, points, ref=str(i))
+
+
+def test_period_buckets_use_iso_weeks():
+    assert period_buckets("2024-12-30") == [("day", "2024-12-30"), ("week", "2025-W01"), ("month", "2024-12")]
+
+
+def test_next_streak():
+    streak = next_streak(None, "2025-01-01")
+    assert streak == ("2025-01-01", 1, 1)
+    streak = next_streak(streak, "2025-01-02")
+    assert streak == ("2025-01-02", 2, 2)
+    assert next_streak(streak, "2025-01-02") == streak
+    assert next_streak(streak, "2025-01-01") == streak   # late event for a day already counted
+    assert next_streak(streak, "2025-01-05") == ("2025-01-05", 1, 2)
+
+
+def test_sqlite_matches_memory(sqlite_store):
+    memory = MemoryStore()
+    replay([memory, sqlite_store])
+    for day in DAYS:
+        for user in USERS + ["nobody"]:
+            assert sqlite_store.user_summary(user, day) == memory.user_summary(user, day)
+            assert sqlite_store.load_day(user, day)["quiz_score"] == memory.load_day(user, day)["quiz_score"]
+    assert sqlite_store.leaderboard(limit=5) == memory.leaderboard(limit=5)
+    assert sqlite_store.leaderboard(limit=100) == memory.leaderboard(limit=100)
+    for city in CITIES[:-1]:
+        assert sqlite_store.leaderboard(limit=3, city=city) == memory.leaderboard(limit=3, city=city)
+    assert sqlite_store.city_totals() == memory.city_totals()
+
+
+def test_tasks_round_trip_in_insertion_order(sqlite_store):
+    sqlite_store.save_task("ana", "2025-01-01", "b", "Walk", False, False)
+    sqlite_store.save_task("ana", "2025-01-01", "a", "Plant a tree", True, False)
+    sqlite_store.save_task("ana", "2025-01-01", "b", "Walk", False, True)
+    assert sqlite_store.load_day("ana", "2025-01-01")["tasks"] == [
+        {"key": "b", "task": "Walk", "custom": False, "done": True},
+        {"key": "a", "task": "Plant a tree", "custom": True, "done": False},
+    ]
+
+
+def test_aggregation_resumes_from_the_watermark(tmp_path):
+    path = str(tmp_path / "tasks.sqlite")
+    store = SQLiteStore(path, flush_interval=60, aggregate_batch=3)
+    for day in DAYS[:4]:
+        store.record_event("ana", "Dhaka", day, "task", 10)
+    store.flush()
+    assert store.aggregate() == 4
+    assert store.aggregate() == 0   # nothing is applied twice
+    store.close()
+
+    store = SQLiteStore(path, flush_interval=60, aggregate_batch=3)
+    store.record_event("ana", "Dhaka", DAYS[4], "task", 10)
+    assert store.user_points("ana") == 50
+    assert store.user_summary("ana", DAYS[4])["streak"] == 1
+    assert store.user_summary("ana", DAYS[4])["best_streak"] == 4
+    assert store.city_totals() == [("Dhaka", 50, 1)]
+    store.close()
+
+
+def test_a_replayed_event_is_rewarded_once(sqlite_store):
+    memory = MemoryStore()
+    for store in (memory, sqlite_store):
+        for _ in range(2):
+            store.record_event("ana", "Dhaka", "2025-01-01", "task", 1, ref="daily:0")
+            store.record_event("ana", "Dhaka", "2025-01-01", "quiz", 8, ref="2025-01-01")
+        store.record_event("ana", "Dhaka", "2025-01-02", "task", 1, ref="daily:0")   # a new day counts again
+        assert store.user_points("ana") == 10
+        assert store.user_summary("ana", "2025-01-01")["today"] == 9
+        assert store.city_totals() == [("Dhaka", 10, 1)]
+    assert len(memory.events) == 3
+
+
+class FailOnce:
+    """Wraps the store's connection so the next COMMIT fails, as a full disk or a locked database would."""
+
+    def __init__(self, db):
+        self.db = db
+        self.failed = False
+
+    def execute(self, sql, *params):
+        if sql == "COMMIT" and not self.failed:
+            self.failed = True
+            raise sqlite3.OperationalError("database or disk is full")
+        return self.db.execute(sql, *params)
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+
+def test_a_failed_flush_keeps_its_batch(tmp_path):
+    store = SQLiteStore(str(tmp_path / "tasks.sqlite"), flush_interval=60)
+    store.save_task("ana", "2025-01-01", "a", "Walk", False, True)
+    store.record_event("ana", "Dhaka", "2025-01-01", "task", 10)
+    store._db = FailOnce(store._db)
+    with pytest.raises(sqlite3.OperationalError):
+        store.flush()
+    store.record_event("ana", "Dhaka", "2025-01-01", "quiz", 5)   # queued after the failed batch
+    assert store.user_points("ana") == 15
+    assert store.load_day("ana", "2025-01-01")["tasks"][0]["done"] is True
+    store.close()
@@ -0,0 +1,77 @@
+import json
+import urllib.request
+
+import pytest
+import requests
+
+import telemetry
+from assistant import Generation
+
+
+@pytest.fixture
+def registry():
+    telemetry.REGISTRY.reset()
+    yield telemetry.REGISTRY
+    telemetry.REGISTRY.reset()
+
+
+def series(registry, name):
+    return {row["series"]: row for row in registry.snapshot() if row["name"] == name}
+
+
+def test_span_times_the_block_and_counts_errors():
+    registry = telemetry.Registry()
+    with registry.span("chart_build", chart="breakdown"):
+        pass
+    with pytest.raises(KeyError):
+        with registry.span("chart_build", chart="breakdown"):
+            raise KeyError("city")
+    [row] = registry.snapshot()
+    assert row["series"] == 'chart_build{chart="breakdown"}'
+    assert (row["count"], row["errors"]) == (2, 1)
+    assert 0 <= row["p50"] <= row["p95"] <= row["p99"]
+
+
+def test_quantiles_of_a_known_sample():
+    s = telemetry.Series(samples=1000)
+    s.samples.extend(range(101))
+    assert s.quantiles() == {0.5: 50, 0.95: 95, 0.99: 99}
+    assert telemetry.Series(10).quantiles() == {0.5: None, 0.95: None, 0.99: None}
+
+
+def test_prometheus_text_and_metrics_server():
+    registry = telemetry.Registry()
+    for seconds in (0.1, 0.2, 0.3):
+        registry.observe("upstream", seconds, target='wttr "in"')
+    registry.observe("upstream", 1.0, error=True, target='wttr "in"')
+    text = registry.prometheus()
+    assert "# TYPE eco_upstream_seconds summary" in text
+    assert 'eco_upstream_seconds{target="wttr \\"in\\"",quantile="0.5"} 0.3' in text
+    assert 'eco_upstream_seconds_count{target="wttr \\"in\\""} 4' in text
+    assert 'eco_upstream_errors_total{target="wttr \\"in\\""} 1' in text
+
+    server = telemetry.MetricsServer(registry, port=0).start()
+    try:
+        base = f"http://127.0.0.1:{server.port}"
+        with urllib.request.urlopen(f"{base}/metrics", timeout=5) as res:
+            assert res.read().decode() == text
+        with urllib.request.urlopen(f"{base}/metrics.json", timeout=5) as res:
+            assert json.load(res)[0]["count"] == 4
+    finally:
+        server.stop()
+
+
+def test_a_streamed_generation_is_recorded(registry, stub_url):
+    generation = Generation(f"{stub_url}/api/generate", "mistral", "How to save electricity?")
+    assert "".join(generation)
+    row = series(registry, "upstream")['upstream{target="ollama"}']
+    assert (row["count"], row["errors"]) == (1, 0)
+    assert series(registry, "llm_first_token")
+
+
+def test_a_refused_connection_is_recorded_as_an_upstream_error(registry):
+    generation = Generation("http://127.0.0.1:9/api/generate", "mistral", "hi", connect_timeout=1)
+    with pytest.raises(requests.ConnectionError):
+        list(generation)
+    row = series(registry, "upstream")['upstream{target="ollama"}']
+    assert (row["count"], row["errors"]) == (1, 1)
@@ -0,0 +1,74 @@
+import pandas as pd
+import pytest
+
+import stub_server
+import timeseries
+from timeseries import FORECAST, WeatherHistory
+
+
+def payload(obs_time, temp, forecast_temp=30):
+    return {
+        "current_condition": [{"localObsDateTime": obs_time, "temp_C": str(temp), "humidity": "70",
+                               "pressure": "1008", "weatherDesc": [{"value": "Haze"}]}],
+        "weather": [{"date": "2025-05-01", "hourly": [
+            {"time": str(h * 300), "tempC": str(forecast_temp), "humidity": "60"} for h in range(8)]}],
+    }
+
+
+@pytest.fixture
+def history(tmp_path):
+    return WeatherHistory(str(tmp_path))
+
+
+def test_observations_come_from_current_condition():
+    frame = timeseries.observations(payload("2025-05-01 02:30 PM", 31))
+    assert frame["ts"].tolist() == [pd.Timestamp("2025-05-01 14:30")]
+    assert frame["temp_c"].tolist() == [31.0]
+    assert frame["pressure_hpa"].tolist() == [1008.0]
+    assert frame["uv_index"].isna().all()
+    assert list(frame.columns) == ["ts", *timeseries.FIELDS.values()]
+
+
+def test_payload_without_observation_time_records_nothing_observed():
+    assert timeseries.observations({"current_condition": [{"temp_C": "30"}]}).empty
+    assert timeseries.observations({"current_condition": [{"localObsDateTime": "n/a"}]}).empty
+    assert timeseries.observations({}).empty
+
+
+def test_forecasts_have_the_observation_columns():
+    frame = timeseries.forecasts(payload("2025-05-01 02:30 PM", 31))
+    assert len(frame) == 8 and frame["ts"].iloc[-1] == pd.Timestamp("2025-05-01 21:00")
+    assert list(frame.columns) == list(timeseries.observations({}).columns)
+
+
+def test_rollups_hold_observations_only(history):
+    assert history.record("Dhaka", payload("2025-05-01 02:30 PM", 31)) == 1
+    assert history.record("Dhaka", payload("2025-05-01 02:30 PM", 31, forecast_temp=35)) == 0   # same reading
+    assert history.record("Dhaka", payload("2025-05-01 03:00 PM", 33, forecast_temp=36)) == 1
+
+    daily = history.rollup("Dhaka", "daily")
+    assert daily["count"].tolist() == [2]
+    assert daily["temp_c_mean"].tolist() == [32.0]
+    assert daily["temp_c_max"].tolist() == [33.0]
+    assert history.raw("Dhaka")["temp_c"].tolist() == [31.0, 33.0]
+
+    # Forecast slots are stored apart, latest forecast per slot
+    forecast = history.raw("Dhaka", series=FORECAST)
+    assert len(forecast) == 8 and (forecast["temp_c"] == 36).all()
+    assert history.cities() == history.cities(FORECAST) == ["Dhaka"]
+
+
+def test_rebuild_matches_incremental_rollups(history):
+    for day in range(1, 4):
+        for hour in ("09:00 AM", "03:00 PM"):
+            history.record("Sylhet", payload(f"2025-0{day}-0{day} {hour}", 20 + day))
+    before = {freq: history.rollup("Sylhet", freq) for freq in timeseries.FREQS}
+    history.rebuild("Sylhet")
+    for freq, rollup in before.items():
+        pd.testing.assert_frame_equal(WeatherHistory(history.root).rollup("Sylhet", freq), rollup)
+    assert history.rollup("Sylhet", "monthly")["count"].tolist() == [2, 2, 2]
+
+
+def test_stub_payload_is_recorded(history):
+    assert history.record("Dhaka", stub_server.fake_weather("Dhaka")) == 1
+    assert len(history.raw("Dhaka", series=FORECAST)) == 24
@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+
+import tts
+from tts import AudioCache, TTSService, detect_lang, split_chunks
+
+
+class GatedBackend:
+    """Counts calls and holds every synthesis until the test opens the gate."""
+    mime = "audio/test"
+
+    def __init__(self):
+        self.calls = []
+        self.gate = threading.Event()
+
+    def synthesize(self, text, lang):
+        self.calls.append((text, lang))
+        assert self.gate.wait(5)
+        if text == "fail.":
+            raise OSError("speech service unreachable")
+        return f"{lang}:{text}".encode()
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setitem(tts.BACKENDS, "gated", GatedBackend)
+    return TTSService("gated", max_chars=40)
+
+
+def test_split_chunks_starts_with_the_first_sentence_alone():
+    text = "Save power. Turn off fans when you leave. Use LED bulbs! Unplug chargers? Walk more."
+    assert split_chunks(text, max_chars=40) == [
+        "Save power.", "Turn off fans when you leave.", "Use LED bulbs! Unplug chargers?", "Walk more."]
+    assert split_chunks("  ") == []
+    assert "".join(split_chunks(text, max_chars=1000)).replace(" ", "") == text.replace(" ", "")
+
+
+def test_detect_lang():
+    assert detect_lang("বিদ্যুৎ সাশ্রয় করুন।") == "bn"
+    assert detect_lang("Save electricity (বিদ্যুৎ).") == "en"
+    assert detect_lang("123") == "en"
+
+
+def test_audio_cache_evicts_the_least_recently_used():
+    cache = AudioCache(max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    assert cache.get("a") == b"1234"
+    cache.put("c", b"1234")
+    assert cache.get("b") is None
+    assert cache.get("a") == cache.get("c") == b"1234"
+    assert cache.size == 8 and cache.stats["evictions"] == 1
+
+
+def test_chunks_are_synthesized_once_and_then_served_from_the_cache(service):
+    jobs = service.synthesize("Save power. Turn off fans when you leave.")
+    assert service.submit("Save power.") is jobs[0]   # in flight: shared, not synthesized twice
+    service.backend.gate.set()
+    assert [job.result(timeout=5) for job in jobs] == [b"en:Save power.", b"en:Turn off fans when you leave."]
+    again = service.synthesize("Save power. Turn off fans when you leave.")
+    assert all(job.done() for job in again)
+    assert len(service.backend.calls) == 2
+    assert service.cache.stats["hits"] == 2
+
+
+def test_a_failed_chunk_raises_from_its_future_and_is_not_cached(service):
+    service.backend.gate.set()
+    [job] = service.synthesize("fail.")
+    with pytest.raises(OSError):
+        job.result(timeout=5)
+    service.synthesize("fail.")[0].exception(timeout=5)
+    assert len(service.backend.calls) == 2
+
+
+def test_speak_ahead_starts_the_first_sentence_while_tokens_stream(service):
+    stream = service.speak_ahead(iter(["Save ", "power.", " Turn ", "off ", "fans."]))
+    assert [next(stream), next(stream)] == ["Save ", "power."]
+    assert not service._pending   # "power." might not end the sentence yet
+    assert next(stream) == " Turn "
+    assert len(service._pending) == 1
+    assert "".join(stream) == "off fans."
+    service.backend.gate.set()
+    assert service.submit("Save power.").result(timeout=5) == b"en:Save power."
+    assert service.backend.calls == [("Save power.", "en")]
+
+
+def test_gtts_requests_carry_a_timeout(monkeypatch):
+    import gtts
+
+    seen = {}
+
+    class FakeGTTS:
+        def __init__(self, text, lang="en", timeout=None):
+            seen.update(text=text, lang=lang, timeout=timeout)
+
+        def write_to_fp(self, fp):
+            fp.write(b"mp3")
+
+    monkeypatch.setattr(gtts, "gTTS", FakeGTTS)
+    assert tts.GTTSBackend().synthesize("Hello.", "en") == b"mp3"
+    assert seen == {"text": "Hello.", "lang": "en", "timeout": tts.GTTSBackend.timeout}
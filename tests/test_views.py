@@ -0,0 +1,45 @@
+import json
+import subprocess
+import sys
+
+import importtime
+import views
+
+PROBE = """
+import json, sys
+import views
+before = sorted(m for m in sys.modules if m.startswith("views."))
+module = views.load("🔍 Eco Search")
+after = sorted(m for m in sys.modules if m.startswith("views."))
+print(json.dumps({"before": before, "after": after, "module": module.__name__, "timed": list(views.load_times),
+                  "again": views.load("🔍 Eco Search") is module}))
+"""
+
+
+def test_a_page_module_is_imported_only_when_first_shown():
+    proc = subprocess.run([sys.executable, "-c", PROBE], cwd=importtime.ROOT, capture_output=True, text=True,
+                          timeout=120)
+    assert proc.returncode == 0, proc.stderr
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    assert result["before"] == []
+    assert "views.search_page" in result["after"]
+    assert not any(m in result["after"] for m in ("views.assistant_page", "views.weather_page"))
+    assert result["module"] == "views.search_page"
+    assert result["timed"] == ["views.search_page"]
+    assert result["again"]
+
+
+def test_every_label_maps_to_a_page_module():
+    for label, name in views.PAGES.items():
+        assert views.module_name(label) == f"views.{name}"
+
+
+def test_import_time_report_lists_the_measured_module_and_its_imports():
+    rows = importtime.report("search_index")
+    assert rows[-1]["module"] == "search_index" and rows[-1]["depth"] == 0
+    assert importtime.total_ms(rows) > 0
+    direct = [row["module"] for row in importtime.top_level(rows)]
+    assert "textvec" in direct
+    assert all(row["depth"] == 1 for row in importtime.top_level(rows))
+    costs = [row["cumulative_ms"] for row in importtime.top_level(rows)]
+    assert costs == sorted(costs, reverse=True)
@@ -0,0 +1,130 @@
+import threading
+import time
+
+import pytest
+
+import weather
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(weather.time, "monotonic", clock)
+    return clock
+
+
+def client_with(fetch, **kwargs):
+    client = weather.WeatherClient("http://weather.invalid/", **kwargs)
+    client._fetch = fetch
+    return client
+
+
+def counting_fetch(calls):
+    def fetch(city):
+        calls.append(city)
+        return {"city": city, "n": len(calls)}
+    return fetch
+
+
+def wait_for(predicate, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_fresh_entries_are_served_from_cache(clock):
+    calls = []
+    client = client_with(counting_fetch(calls), ttl=600)
+    assert client.get("Dhaka") == {"city": "Dhaka", "n": 1}
+    clock.now += 599
+    assert client.get("Dhaka") == {"city": "Dhaka", "n": 1}
+    assert calls == ["Dhaka"]
+    assert client.stats["hits"] == 1 and client.stats["misses"] == 1
+
+
+def test_expired_entry_is_served_stale_while_one_refresh_runs(clock):
+    calls, release = [], threading.Event()
+
+    def slow_fetch(city):
+        if calls:
+            release.wait(2)
+        return counting_fetch(calls)(city)
+
+    client = client_with(slow_fetch, ttl=600, stale_ttl=3600)
+    client.get("Dhaka")
+    clock.now += 601
+    # Every reader gets the stale copy at once; only one background refresh goes upstream
+    assert [client.get("Dhaka")["n"] for _ in range(5)] == [1] * 5
+    assert client.stats["stale_hits"] == 5
+    release.set()
+    wait_for(lambda: not client._refreshing)
+    assert calls == ["Dhaka", "Dhaka"]
+    assert client.get("Dhaka")["n"] == 2
+
+
+def test_entries_past_the_stale_window_are_fetched_inline(clock):
+    calls = []
+    client = client_with(counting_fetch(calls), ttl=600, stale_ttl=3600)
+    client.get("Dhaka")
+    clock.now += 600 + 3600
+    assert client.get("Dhaka")["n"] == 2
+    assert client.stats["misses"] == 2
+
+
+def test_failed_background_refresh_keeps_the_stale_copy(clock):
+    calls = []
+
+    def failing_fetch(city):
+        calls.append(city)
+        if len(calls) > 1:
+            raise ConnectionError("upstream down")
+        return {"city": city}
+
+    client = client_with(failing_fetch, ttl=600)
+    client.get("Dhaka")
+    clock.now += 601
+    assert client.get("Dhaka") == {"city": "Dhaka"}
+    wait_for(lambda: not client._refreshing)
+    assert client.stats["errors"] == 1
+    assert client.get("Dhaka") == {"city": "Dhaka"}
+
+
+def test_least_recently_used_city_is_evicted(clock):
+    calls = []
+    client = client_with(counting_fetch(calls), max_entries=2)
+    client.get("Dhaka")
+    client.get("Sylhet")
+    client.get("Dhaka")          # Sylhet is now the least recently used
+    client.get("Khulna")
+    assert client.peek("Sylhet") is None
+    assert client.peek("Dhaka") is not None and client.peek("Khulna") is not None
+    assert client.stats["evictions"] == 1
+
+
+def test_listener_sees_every_fetch_and_cannot_break_it(clock):
+    seen = []
+
+    def listener(city, data):
+        seen.append(city)
+        raise RuntimeError("listener bug")
+
+    client = client_with(counting_fetch([]), on_result=listener)
+    assert client.get("Dhaka")["n"] == 1
+    assert seen == ["Dhaka"]
+
+
+def test_fetches_the_stub_server(stub_url, stub):
+    client = weather.WeatherClient(f"{stub_url}/weather/")
+    data = client.get("Cox's Bazar")
+    assert data["current_condition"][0]["temp_C"]
+    client.get("Cox's Bazar")
+    assert stub.counts["weather"] == 1
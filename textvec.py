@@ -0,0 +1,116 @@
+"""Tokenization and hashed TF-IDF vectors for English and Bangla text."""
+import math
+import re
+import unicodedata
+import zlib
+
+import numpy as np
+
+# Latin letters/digits plus the Bengali block (letters, vowel signs, digits)
+TOKEN_RE = re.compile(r"[0-9a-zঀ-৿]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it me my of on or should "
+    "so that the this to was what when where which who why will with you your".split()
+)
+
+
+def normalize(text):
+    """Lowercased, punctuation-free, whitespace-collapsed form used for exact-match keys."""
+    text = unicodedata.normalize("NFC", text).lower()
+    return " ".join(TOKEN_RE.findall(text))
+
+
+def query_key(text):
+    """normalize(text), or the whitespace-collapsed text itself when nothing survives normalization
+    (punctuation, emoji, other scripts), so every non-blank query still gets its own key."""
+    return normalize(text) or " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def tokenize(text, stopwords=STOPWORDS):
+    return [t for t in normalize(text).split() if t not in stopwords]
+
+
+def _bucket(term, dim):
+    # crc32 rather than hash(): str hashes are randomized per process
+    return zlib.crc32(term.encode("utf-8")) % dim
+
+
+def hashed_terms(text, dim):
+    """Sorted feature ids and counts for unigrams and bigrams of `text`."""
+    tokens = tokenize(text)
+    terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not terms:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    ids, counts = np.unique([_bucket(t, dim) for t in terms], return_counts=True)
+    return ids, counts.astype(np.float32)
+
+
+class TfidfIndex:
+    """Incremental cosine-similarity index over hashed TF-IDF vectors."""
+
+    def __init__(self, dim=2 ** 16):
+        self.dim = dim
+        self.df = np.zeros(dim, dtype=np.int64)
+        self._docs = {}         # key -> (ids, counts)
+        self._compiled = None   # (keys, indptr, ids, weights) rebuilt lazily after changes
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __contains__(self, key):
+        return key in self._docs
+
+    def add(self, key, text):
+        if key in self._docs:
+            self.remove(key)
+        ids, counts = hashed_terms(text, self.dim)
+        self._docs[key] = (ids, counts)
+        self.df[ids] += 1
+        self._compiled = None
+
+    def remove(self, key):
+        doc = self._docs.pop(key, None)
+        if doc is not None:
+            self.df[doc[0]] -= 1
+            self._compiled = None
+
+    def _idf(self):
+        return np.log((1 + len(self._docs)) / (1 + self.df)) + 1.0
+
+    def _compile(self):
+        keys = list(self._docs)
+        lengths = np.array([len(self._docs[k][0]) for k in keys], dtype=np.int64)
+        indptr = np.concatenate([[0], np.cumsum(lengths)])
+        if keys and indptr[-1]:
+            ids = np.concatenate([self._docs[k][0] for k in keys])
+            counts = np.concatenate([self._docs[k][1] for k in keys])
+        else:
+            ids, counts = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        weights = (1 + np.log(counts)) * self._idf()[ids]
+        # L2-normalise each document's weights in place
+        nonempty = lengths > 0
+        norms = np.ones(len(keys), dtype=np.float32)
+        if len(ids):
+            norms[nonempty] = np.sqrt(np.add.reduceat(weights ** 2, indptr[:-1][nonempty]))
+        weights /= np.repeat(norms, lengths)
+        self._compiled = (keys, indptr, lengths, ids, weights)
+
+    def query(self, text, k=1):
+        """Return up to k (key, cosine similarity) pairs, best first."""
+        if not self._docs:
+            return []
+        if self._compiled is None:
+            self._compile()
+        keys, indptr, lengths, ids, weights = self._compiled
+        q_ids, q_counts = hashed_terms(text, self.dim)
+        if not len(q_ids) or not len(ids):
+            return []
+        q = np.zeros(self.dim, dtype=np.float32)
+        q[q_ids] = (1 + np.log(q_counts)) * self._idf()[q_ids]
+        q /= math.sqrt(float(q @ q))
+        sims = np.zeros(len(keys), dtype=np.float32)
+        nonempty = lengths > 0
+        sims[nonempty] = np.add.reduceat(weights * q[ids], indptr[:-1][nonempty])
+        top = np.argsort(-sims)[:k]
+        return [(keys[i], float(sims[i])) for i in top]
@@ -0,0 +1,252 @@
+"""Observed weather per city in partitioned Parquet, with hourly/daily/monthly rollups.
+
+Every wttr.in payload the app fetches carries one real observation
+(current_condition, stamped with the station's localObsDateTime) and a
+3-day forecast. The observation is merged into
+observed/raw/city=<city>/month=<YYYY-MM>.parquet; fetching the same
+observation again changes nothing. Each append recomputes the rollups of
+the months it touched and splices them into
+observed/rollups/<freq>/city=<city>.parquet. A multi-year chart then reads
+one small file instead of aggregating raw rows. Timestamps are the city's
+local time.
+
+Forecast slots are kept apart in forecast/raw/..., where a later forecast
+for a slot replaces the earlier one. They are never rolled up, so a trend
+never mixes predictions into the history.
+
+wttr.in's j1 format has no air-quality fields. append() accepts any
+numeric columns, though, so a future air-quality source can be stored and
+rolled up next to the weather.
+
+    python timeseries.py show Dhaka --freq monthly
+    python timeseries.py rebuild        # recompute every rollup from the raw partitions
+"""
+import os
+import threading
+from urllib.parse import quote, unquote
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import fileio
+import telemetry
+
+# wttr.in current_condition key -> stored column
+FIELDS = {
+    "temp_C": "temp_c",
+    "FeelsLikeC": "feels_like_c",
+    "humidity": "humidity",
+    "precipMM": "precip_mm",
+    "windspeedKmph": "wind_kmph",
+    "pressure": "pressure_hpa",
+    "cloudcover": "cloud_pct",
+    "uvIndex": "uv_index",
+}
+# The same columns from the hourly forecast slots, which spell temperature "tempC"
+FORECAST_FIELDS = {"tempC" if key == "temp_C" else key: column for key, column in FIELDS.items()}
+FREQS = {"hourly": "h", "daily": "D", "monthly": "MS"}   # every bucket falls inside one calendar month
+OBSERVED, FORECAST = "observed", "forecast"
+OBS_TIME_FORMAT = "%Y-%m-%d %I:%M %p"   # localObsDateTime, e.g. "2024-05-01 02:30 PM"
+
+
+def observations(data, fields=FIELDS):
+    """The payload's observed conditions at their localObsDateTime: ts plus a float column per field
+    (NaN when missing). Empty when the payload has no observation time."""
+    current = [c for c in data.get("current_condition", []) if c.get("localObsDateTime")]
+    ts = pd.to_datetime(pd.Series([c["localObsDateTime"] for c in current], dtype=object),
+                        format=OBS_TIME_FORMAT, errors="coerce").astype("datetime64[ns]")
+    frame = pd.DataFrame({"ts": ts})
+    for key, column in fields.items():
+        frame[column] = pd.to_numeric(pd.Series([c.get(key) for c in current], dtype=object),
+                                      errors="coerce").astype("float64")
+    return frame[frame["ts"].notna()].reset_index(drop=True)
+
+
+def forecasts(data, fields=FORECAST_FIELDS):
+    """One row per hourly forecast slot of a j1 payload, with the same columns as observations()."""
+    days = [day for day in data.get("weather", []) if day.get("hourly")]
+    if not days:
+        return pd.DataFrame({"ts": pd.Series(dtype="datetime64[ns]"),
+                             **{c: pd.Series(dtype="float64") for c in fields.values()}})
+    hourly = pd.json_normalize(days, record_path="hourly", meta=["date"])
+    frame = pd.DataFrame({"ts": pd.to_datetime(hourly["date"])
+                          + pd.to_timedelta(pd.to_numeric(hourly["time"]) // 100, unit="h")})
+    for key, column in fields.items():
+        frame[column] = pd.to_numeric(hourly[key], errors="coerce").astype("float64") if key in hourly else np.nan
+    return frame
+
+
+def aggregate(frame, freq):
+    """Mean/min/max of every value column per hourly, daily or monthly bucket, plus the row count."""
+    grouped = frame.groupby(pd.Grouper(key="ts", freq=FREQS[freq]))
+    # One cythonized pass per statistic over all columns; agg([...]) would loop column by column
+    stats = pd.concat([grouped.mean().add_suffix("_mean"), grouped.min().add_suffix("_min"),
+                       grouped.max().add_suffix("_max")], axis=1)
+    columns = [f"{c}_{stat}" for c in frame.columns.drop("ts") for stat in ("mean", "min", "max")]
+    stats = stats[columns]
+    stats.insert(0, "count", grouped.size())
+    return stats[stats["count"] > 0].reset_index()
+
+
+def _months(ts):
+    """Calendar month of each timestamp as datetime64[M] (much faster than strftime)."""
+    return ts.to_numpy().astype("datetime64[M]")
+
+
+def _changed(old, new):
+    """How many rows of `new` add a timestamp or change a value compared with `old`."""
+    new = new.set_index("ts")
+    prev = old.set_index("ts").reindex(index=new.index, columns=new.columns)
+    same = (new.eq(prev) | (new.isna() & prev.isna())).all(axis=1)
+    return int((~same).sum())
+
+
+class WeatherHistory:
+    def __init__(self, root, freqs=tuple(FREQS)):
+        self.root = root
+        self.freqs = freqs
+        self._lock = threading.Lock()
+        self._cache = {}   # rollup path -> (mtime_ns, DataFrame)
+
+    def _city_dir(self, *parts):
+        *parents, city = parts
+        return os.path.join(self.root, *parents, f"city={quote(city, safe='')}")
+
+    def _raw_path(self, city, month, series=OBSERVED):
+        return os.path.join(self._city_dir(series, "raw", city), f"month={month}.parquet")
+
+    def _rollup_path(self, city, freq):
+        return self._city_dir(OBSERVED, "rollups", freq, city) + ".parquet"
+
+    def _read(self, path, cache=False):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        cached = self._cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        df = pq.read_table(path).to_pandas()
+        if cache:
+            self._cache[path] = (mtime, df)
+        return df
+
+    def record(self, city, data):
+        """WeatherClient listener: store a freshly fetched j1 payload's observation and, apart from it,
+        its forecast; returns how many observed rows were new."""
+        self.append(city, forecasts(data), series=FORECAST)
+        return self.append(city, observations(data))
+
+    def append(self, city, frame, series=OBSERVED):
+        """Merge rows into the city's monthly partitions of `series` (the latest row for a timestamp wins)
+        and, for observed rows, update the rollups of the months that changed; returns how many rows were
+        new or different."""
+        if frame.empty:
+            return 0
+        frame = frame.drop_duplicates("ts", keep="last")
+        changed, months = 0, []
+        with self._lock, telemetry.span("timeseries_write", series=series):
+            for month, rows in frame.groupby(_months(frame["ts"])):
+                month = str(month)[:7]   # "YYYY-MM"
+                path = self._raw_path(city, month, series)
+                old = self._read(path)
+                n = len(rows) if old is None else _changed(old, rows)
+                if not n:
+                    continue
+                if old is not None:
+                    rows = pd.concat([old, rows]).drop_duplicates("ts", keep="last")
+                rows = rows.sort_values("ts", ignore_index=True)
+                fileio.write_atomic(pa.Table.from_pandas(rows, preserve_index=False), path)
+                changed += n
+                months.append(month)
+            if months and series == OBSERVED:
+                self._update_rollups(city, months)
+        return changed
+
+    def _update_rollups(self, city, months):
+        raw = pd.concat([self._read(self._raw_path(city, month)) for month in months], ignore_index=True)
+        for freq in self.freqs:
+            fresh = aggregate(raw, freq)
+            path = self._rollup_path(city, freq)
+            old = self._read(path, cache=True)
+            if old is not None:
+                kept = old[~np.isin(_months(old["ts"]), np.array(months, dtype="datetime64[M]"))]
+                fresh = pd.concat([kept, fresh], ignore_index=True).sort_values("ts", ignore_index=True)
+            fileio.write_atomic(pa.Table.from_pandas(fresh, preserve_index=False), path)
+
+    def rollup(self, city, freq="daily", start=None, end=None):
+        """The precomputed `freq` rollup of `city`'s observations (empty if nothing was stored yet); treat
+        it as read-only."""
+        df = self._read(self._rollup_path(city, freq), cache=True)
+        if df is None:
+            return pd.DataFrame({"ts": pd.Series(dtype="datetime64[ns]"), "count": pd.Series(dtype="int64")})
+        if start is not None:
+            df = df[df["ts"] >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df["ts"] < pd.Timestamp(end)]
+        return df
+
+    def months(self, city, series=OBSERVED):
+        directory = self._city_dir(series, "raw", city)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[len("month="):-len(".parquet")] for name in os.listdir(directory)
+                      if name.startswith("month=") and name.endswith(".parquet"))
+
+    def raw(self, city, start=None, end=None, series=OBSERVED):
+        """Every stored row of `series` for `city` between `start` and `end`, reading only the months in
+        range."""
+        first = pd.Timestamp(start).strftime("%Y-%m") if start is not None else ""
+        last = pd.Timestamp(end).strftime("%Y-%m") if end is not None else "9999-99"
+        frames = [self._read(self._raw_path(city, m, series)) for m in self.months(city, series)
+                  if first <= m <= last]
+        if not frames:
+            return observations({})
+        df = pd.concat(frames, ignore_index=True)
+        if start is not None:
+            df = df[df["ts"] >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df["ts"] < pd.Timestamp(end)]
+        return df
+
+    def cities(self, series=OBSERVED):
+        directory = os.path.join(self.root, series, "raw")
+        if not os.path.isdir(directory):
+            return []
+        return sorted(unquote(name[len("city="):]) for name in os.listdir(directory) if name.startswith("city="))
+
+    def rebuild(self, city=None):
+        """Recompute rollups from the raw partitions, e.g. after adding a frequency."""
+        with self._lock:
+            for name in [city] if city else self.cities():
+                for freq in self.freqs:
+                    path = self._rollup_path(name, freq)
+                    if os.path.exists(path):
+                        os.remove(path)
+                months = self.months(name)
+                if months:
+                    self._update_rollups(name, months)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from config import DATA_DIR
+
+    parser = argparse.ArgumentParser(description="Inspect or rebuild the weather history.")
+    parser.add_argument("command", choices=["show", "rebuild"])
+    parser.add_argument("city", nargs="?")
+    parser.add_argument("--freq", choices=list(FREQS), default="daily")
+    parser.add_argument("--root", default=os.path.join(DATA_DIR, "weather_history"))
+    args = parser.parse_args()
+
+    history = WeatherHistory(args.root)
+    if args.command == "rebuild":
+        history.rebuild(args.city)
+        print(f"rebuilt rollups for {args.city or ', '.join(history.cities())}")
+    else:
+        for city in [args.city] if args.city else history.cities():
+            print(f"--- {city}")
+            print(history.rollup(city, args.freq).to_string(index=False))
@@ -0,0 +1,188 @@
+"""Background text-to-speech with a content-hash keyed, size-bounded audio cache.
+
+Backends are looked up by name in BACKENDS; "gtts" calls Google's TTS
+service, "pyttsx3" uses the local OS speech engine and works offline,
+and "silent" returns a short silent clip (for load tests and offline runs).
+"""
+import hashlib
+import io
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import telemetry
+
+BACKENDS = {}
+
+
+def register(name):
+    def decorator(cls):
+        BACKENDS[name] = cls
+        return cls
+    return decorator
+
+
+@register("gtts")
+class GTTSBackend:
+    mime = "audio/mpeg"
+    timeout = 15  # seconds per request; a stalled request fails its chunk instead of holding a worker
+
+    def synthesize(self, text, lang):
+        from gtts import gTTS
+
+        buf = io.BytesIO()
+        gTTS(text, lang=lang, timeout=self.timeout).write_to_fp(buf)
+        return buf.getvalue()
+
+
+@register("pyttsx3")
+class Pyttsx3Backend:
+    mime = "audio/wav"
+
+    def __init__(self):
+        self._lock = threading.Lock()   # the engine is not thread-safe
+
+    def synthesize(self, text, lang):
+        import pyttsx3
+
+        with self._lock, tempfile.TemporaryDirectory() as tmp:
+            # pyttsx3 can only render to a file
+            path = os.path.join(tmp, "speech.wav")
+            engine = pyttsx3.init()
+            engine.save_to_file(text, path)
+            engine.runAndWait()
+            with open(path, "rb") as f:
+                return f.read()
+
+
+@register("silent")
+class SilentBackend:
+    mime = "audio/wav"
+
+    def synthesize(self, text, lang):
+        import wave
+
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(8000)
+            w.writeframes(b"\0\0" * 800)   # 0.1 s
+        return buf.getvalue()
+
+
+_SENTENCE_END = re.compile(r"(?<=[.!?।])\s+")
+_BANGLA = re.compile(r"[ঀ-৿]")
+
+
+def detect_lang(text):
+    letters = [c for c in text if c.isalpha()]
+    bangla = sum(1 for c in letters if _BANGLA.match(c))
+    return "bn" if letters and bangla / len(letters) > 0.5 else "en"
+
+
+def split_chunks(text, max_chars=400):
+    """The first sentence on its own (so playback starts early), then sentences packed up to max_chars."""
+    sentences = [s.strip() for s in _SENTENCE_END.split(text) if s.strip()]
+    if not sentences:
+        return []
+    chunks = [sentences[0]]
+    current = ""
+    for sentence in sentences[1:]:
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}".strip()
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class AudioCache:
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key):
+        with self._lock:
+            audio = self._items.get(key)
+            if audio is None:
+                self.stats["misses"] += 1
+                return None
+            self._items.move_to_end(key)
+            self.stats["hits"] += 1
+            return audio
+
+    def put(self, key, audio):
+        with self._lock:
+            if key in self._items:
+                self.size -= len(self._items.pop(key))
+            self._items[key] = audio
+            self.size += len(audio)
+            while self.size > self.max_bytes and len(self._items) > 1:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+                self.stats["evictions"] += 1
+
+
+class TTSService:
+    def __init__(self, backend="gtts", workers=2, cache_bytes=32 * 1024 * 1024, max_chars=400):
+        self.backend_name = backend
+        self.backend = BACKENDS[backend]()
+        self.mime = self.backend.mime
+        self.max_chars = max_chars
+        self.cache = AudioCache(cache_bytes)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts")
+        self._pending = {}              # key -> Future, so concurrent requests share one synthesis
+        self._lock = threading.Lock()
+
+    def _key(self, text, lang):
+        return hashlib.sha256(f"{self.backend_name}\0{lang}\0{text}".encode("utf-8")).hexdigest()
+
+    def _run(self, key, text, lang):
+        try:
+            with telemetry.span("tts_synthesize", backend=self.backend_name):
+                audio = self.backend.synthesize(text, lang)
+            self.cache.put(key, audio)
+            return audio
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def submit(self, text, lang=None):
+        """Future resolving to the audio bytes for `text` (already resolved on a cache hit)."""
+        lang = lang or detect_lang(text)
+        key = self._key(text, lang)
+        audio = self.cache.get(key)
+        if audio is not None:
+            done = Future()
+            done.set_result(audio)
+            return done
+        with self._lock:
+            if key not in self._pending:
+                self._pending[key] = self._pool.submit(self._run, key, text, lang)
+            return self._pending[key]
+
+    def synthesize(self, text, lang=None):
+        """One future per chunk, in playback order; chunks are synthesized in the background."""
+        lang = lang or detect_lang(text)
+        return [self.submit(chunk, lang) for chunk in split_chunks(text, self.max_chars)]
+
+    def speak_ahead(self, tokens):
+        """Pass a token stream through, starting synthesis of the first sentence as soon as it is complete."""
+        text = ""
+        started = False
+        for token in tokens:
+            text += token
+            if not started and _SENTENCE_END.search(text):
+                started = True
+                first = split_chunks(text, self.max_chars)[0]
+                self.submit(first, detect_lang(first))
+            yield token
@@ -0,0 +1,41 @@
+"""Page registry: each page lives in its own module, imported the first time it is shown.
+
+Not named `pages/` on purpose, since Streamlit would turn that directory
+into its own multipage navigation.
+"""
+import importlib
+import time
+
+import telemetry
+
+PAGES = {
+    "🏙️ Weather": "weather_page",
+    "🧮 Emission Calculator": "calculator_page",
+    "📊 Emission Breakdown": "breakdown_page",
+    "🔍 Eco Search": "search_page",
+    "🤖 Eco AI Assistant": "assistant_page",
+    "✅ Tasks & Rewards": "tasks_page",
+}
+
+# module name -> seconds its first import took in this process
+load_times = {}
+
+
+def module_name(label):
+    return f"{__name__}.{PAGES[label]}"
+
+
+def load(label):
+    name = module_name(label)
+    if name not in load_times:
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        load_times[name] = time.perf_counter() - start
+        return module
+    return importlib.import_module(name)
+
+
+def render(label):
+    module = load(label)
+    with telemetry.span("page_render", page=PAGES[label]):
+        module.render()
@@ -0,0 +1,109 @@
+"""🤖 Eco AI Assistant: streamed answers from the local model, with speech."""
+import time
+
+import streamlit as st
+
+import assistant
+import retrieval
+from config import (OLLAMA_CONTEXT_LIMIT, OLLAMA_MODEL, RAG_BUDGET_MS, RAG_CONTEXT_TOKENS, RAG_TOP_K,
+                    TTS_WAIT_SECONDS)
+from llm_gateway import QueueFull
+from services import get_llm_gateway, get_response_cache, get_retriever, get_tts_service
+
+
+def render_tts_audio(jobs, mime):
+    # Show chunks in playback order as the background worker finishes them, but only until the wait budget
+    # runs out: a slow speech service then leaves the remaining parts listed as pending, not a hung run
+    deadline = time.monotonic() + TTS_WAIT_SECONDS
+    for i, job in enumerate(jobs):
+        try:
+            with st.spinner("🔊 Preparing audio..."):
+                audio = job.result(timeout=max(0.0, deadline - time.monotonic()))
+        except TimeoutError:
+            st.caption(f"🔊 {len(jobs) - i} more audio part(s) still being prepared; "
+                       "ask again shortly to hear them.")
+            return
+        except Exception as audio_err:
+            st.error(f"Audio error: {audio_err}")
+            return
+        st.audio(audio, format=mime)
+
+
+def render():
+    st.title("🤖 Ask Eco AI (Offline Model)")
+
+    prompt = st.text_area("Ask something about eco-friendly practices, climate, Bangladesh policies, etc.")
+
+    # A rerun abandons the previous answer; stop its upstream stream too
+    if "llm_job" in st.session_state:
+        st.session_state.llm_job.cancel()
+        del st.session_state.llm_job
+
+    # Ollama's context tokens from the last answer; sending them back continues that conversation
+    history = st.session_state.get("llm_context")
+    if history and st.button("🧹 New conversation"):
+        del st.session_state.llm_context
+        history = None
+    follow_up = bool(history) and st.checkbox("💬 Follow-up to the previous answer")
+
+    if st.button("Get AI Answer"):
+        if not prompt:
+            st.warning("Please enter a question for the AI.")
+        else:
+            try:
+                response_cache = get_response_cache()
+                if not follow_up:
+                    st.session_state.pop("llm_context", None)
+                # A follow-up's answer depends on the conversation, so it is never served from the cache
+                cached = None if follow_up else response_cache.get(prompt, OLLAMA_MODEL, assistant.SYSTEM_PROMPT)
+                if cached is not None:
+                    reply, match = cached
+                    st.markdown(f"**AI says:** {reply}")
+                    st.caption(f"⚡ Cached answer ({match} match) · cache hit rate {response_cache.hit_rate():.0%}")
+                else:
+                    # Ground the answer in the eco library; an unavailable retriever just means no notes
+                    try:
+                        notes = get_retriever().retrieve(prompt, RAG_TOP_K, budget_ms=RAG_BUDGET_MS)
+                    except Exception:
+                        notes = []
+                    context = retrieval.format_context(notes, RAG_CONTEXT_TOKENS)
+                    if context:
+                        with st.expander(f"📚 Notes given to the AI ({len(context.splitlines())})"):
+                            st.text(context)
+                    gateway = get_llm_gateway()
+                    job = gateway.submit(st.session_state.user_id, assistant.build_prompt(prompt, context, follow_up),
+                                         context=history if follow_up else None)
+                    st.session_state.llm_job = job
+                    if job.started is None:
+                        st.caption(f"⏳ Waiting for the AI model ({gateway.queue_depth()} in queue)")
+                    st.markdown("**AI says:**")
+                    reply = st.write_stream(get_tts_service().speak_ahead(job.stream())).strip()
+                    del st.session_state.llm_job
+                    generation = job.generation
+                    if reply and not generation.cancelled:
+                        if not follow_up:
+                            response_cache.put(prompt, OLLAMA_MODEL, assistant.SYSTEM_PROMPT, reply)
+                        # Long conversations start afresh rather than overflowing the model's context window
+                        if generation.context and len(generation.context) <= OLLAMA_CONTEXT_LIMIT:
+                            st.session_state.llm_context = generation.context
+                        else:
+                            st.session_state.pop("llm_context", None)
+                        ttft = generation.time_to_first_token
+                        tps = generation.tokens_per_sec
+                        st.caption(f"⏱️ Queued {job.wait_time:.2f}s · first token in {ttft:.2f}s · "
+                                   f"{generation.tokens} tokens" + (f" · {tps:.1f} tokens/s" if tps else ""))
+                        durations = generation.durations
+                        if durations:
+                            st.caption(f"🧠 Model load {durations['load']:.2f}s · prompt {durations['prompt_eval']:.2f}s "
+                                       f"({durations['prompt_tokens']} tokens) · generation {durations['eval']:.2f}s")
+                if reply:
+                    tts_service = get_tts_service()
+                    render_tts_audio(tts_service.synthesize(reply), tts_service.mime)
+                else:
+                    st.warning("⚠️ AI did not return a response.")
+            except QueueFull as e:
+                st.warning(f"⏳ {e}")
+            except assistant.OllamaError as e:
+                st.error(f"❌ {e}")
+            except Exception as e:
+                st.error(f"Connection error: {e}")
@@ -0,0 +1,60 @@
+"""📊 Emission Breakdown: per-source charts for the calculator inputs."""
+import streamlit as st
+
+import charts
+import emissions
+from services import get_chart_cache
+
+
+def render():
+    st.title("📊 Emission Breakdown (Based on Calculator)")
+    st.markdown("Input your values to see the **Daily, Monthly, and Yearly CO₂ emission** summary:")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        cng = st.slider("🚖 Daily CNG Usage (km)", 0.0, 100.0, 10.0)
+        bus = st.slider("🚌 Daily Bus Usage (km)", 0.0, 100.0, 10.0)
+        uber = st.slider("🚗 Daily Uber Usage (km)", 0.0, 50.0, 5.0)
+        bike = st.slider("🚲 Daily Bicycle Usage (km)", 0.0, 50.0, 5.0)
+        motorbike = st.slider("🏍️ Daily Motorbike Usage (km)", 0.0, 50.0, 5.0)
+        air = st.slider("✈️ Monthly Air Travel (km)", 0.0, 3000.0, 0.0)
+    with col2:
+        elec = st.slider("🔌 Monthly Electricity Usage (kWh)", 0.0, 1000.0, 200.0)
+        lpg = st.slider("⛽ Monthly LPG Usage (kg)", 0.0, 50.0, 5.0)
+        water = st.slider("🚿 Daily Water Usage (liters)", 0.0, 500.0, 100.0)
+        meals = st.number_input("🍱 Daily Meals (person)", 1, 10, 3)
+        waste = st.slider("🗑️ Weekly Waste Generation (kg)", 0.0, 50.0, 5.0)
+
+    household = {
+        "CNG": cng, "Bus": bus, "Uber": uber, "Bike": bike, "Motorbike": motorbike,
+        "Air": air, "Electricity": elec, "LPG": lpg, "Water": water,
+        "Diet": meals, "Waste": waste
+    }
+    result = emissions.calculate(household)
+
+    total_daily = round(result["daily"], 4)
+    total_monthly = round(result["monthly"], 3)
+    total_yearly = round(result["yearly"], 3)
+
+    st.success(f"""
+    🌍 **Your Estimated Emissions**  
+    - 🗓️ Daily: `{total_daily} tons CO₂`  
+    - 📆 Monthly: `{total_monthly} tons CO₂`  
+    - 📅 Yearly: `{total_yearly} tons CO₂`
+    """)
+
+    # Charts are shared between sessions with (nearly) the same inputs
+    chart_key = charts.quantize(household)
+    breakdown_charts = get_chart_cache().get_or_build(chart_key, lambda: charts.build_breakdown(chart_key))
+
+    # Pie Chart for Monthly Emissions
+    st.markdown("### 📊 Monthly Emission Composition (Pie Chart)")
+    st.plotly_chart(breakdown_charts["pie"], width="stretch")
+
+    # Bar Chart for Daily, Monthly, Yearly
+    st.markdown("### 📊 Emission Comparison (Bar Chart)")
+    st.plotly_chart(breakdown_charts["bar"], width="stretch")
+
+    # Table View
+    with st.expander("📋 Detailed Emission Breakdown Table (tons)"):
+        st.dataframe(breakdown_charts["table"], width="stretch")
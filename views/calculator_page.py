@@ -0,0 +1,106 @@
+"""🧮 Emission Calculator: score one household, a whole survey file, or add it to the map."""
+import io
+
+import pandas as pd
+import streamlit as st
+
+import emissions
+import geo
+import ingest
+from emission_factors import DEFAULT_REGION, default_registry
+from services import get_emission_dataset, get_household_log
+
+
+def render():
+    st.title("🧮 CO₂ Emission Calculator (Enhanced)")
+
+    c1, c2 = st.columns(2)
+    with c1:
+        cng = st.slider("🚖 CNG (km/day)", 0.0, 100.0, 10.0)
+        bus = st.slider("🚌 Bus (km/day)", 0.0, 100.0, 10.0)
+        uber = st.slider("🚗 Uber (km/day)", 0.0, 50.0, 5.0)
+        bike = st.slider("🚲 Bike (km/day)", 0.0, 50.0, 5.0)
+        motorbike = st.slider("🏍️ Motorbike (km/day)", 0.0, 50.0, 5.0)
+        air = st.slider("✈️ Air Travel (km/month)", 0.0, 3000.0, 0.0)
+    with c2:
+        elec = st.slider("🔌 Electricity (kWh/month)", 0.0, 1000.0, 200.0)
+        lpg = st.slider("⛽ LPG (kg/month)", 0.0, 50.0, 5.0)
+        water = st.slider("🚿 Water (liters/day)", 0.0, 500.0, 100.0)
+        meals = st.number_input("🍱 Meals/day", 1, 10, 3)
+        waste = st.slider("🗑️ Waste (kg/week)", 0.0, 50.0, 5.0)
+
+    household = {
+        "CNG": cng, "Bus": bus, "Uber": uber, "Bike": bike, "Motorbike": motorbike,
+        "Air": air, "Electricity": elec, "LPG": lpg, "Water": water,
+        "Diet": meals, "Waste": waste
+    }
+
+    registry = default_registry()
+    factor_row = st.selectbox("📚 Emission factor set", range(len(registry)),
+                              index=registry.row(DEFAULT_REGION), format_func=registry.label)
+
+    if st.button("Calculate Emissions"):
+        result = emissions.calculate(household, registry.matrix[factor_row])
+        st.success(f"""
+        📆 **Daily Emissions**: {round(result['daily'], 3)} tons  
+        📅 **Monthly Emissions**: {round(result['monthly'], 3)} tons  
+        📊 **Yearly Emissions**: {round(result['yearly'], 3)} tons
+        """)
+        st.subheader("📌 Breakdown (Monthly Estimate in tons)")
+        for k, v in result["breakdown"]["monthly"].items():
+            st.markdown(f"- **{k}**: {round(v, 3)}")
+
+    with st.expander("🗺️ Add My Household to the District Map"):
+        districts = geo.districts()
+        district_names = sorted(districts.names)
+        map_city = st.selectbox("Your district", district_names, index=district_names.index("Dhaka"), key="map_city")
+        share_location = st.checkbox("📍 Share my approximate location instead")
+        map_lat = map_lon = None
+        if share_location:
+            c1, c2 = st.columns(2)
+            map_lat = c1.number_input("Latitude", 20.5, 26.7, 23.8103, format="%.4f")
+            map_lon = c2.number_input("Longitude", 88.0, 92.7, 90.4125, format="%.4f")
+            map_city, km = districts.nearest(map_lat, map_lon)[0]
+            st.caption(f"Nearest district: {map_city} ({km:.0f} km from its centre)")
+        if st.button("Submit Household"):
+            get_household_log().append(map_city, household, lat=map_lat, lon=map_lon)
+            get_emission_dataset().refresh()
+            st.success(f"✅ Thanks! Your household is now part of {map_city}'s average on the Weather page map.")
+
+    if len(registry) > 1:
+        with st.expander("🔀 Compare Emission Factor Versions"):
+            totals = emissions.score_versions(household, registry.matrix)[0] / 1000
+            df_versions = pd.DataFrame(totals, columns=[f"{p.title()} (tons)" for p in emissions.PERIODS])
+            df_versions.insert(0, "Factor Set", [registry.label(i) for i in range(len(registry))])
+            st.dataframe(df_versions.set_index("Factor Set"), width="stretch")
+
+    with st.expander("📂 Bulk Household Scoring (CSV / Parquet)"):
+        st.markdown("Upload a survey export with one row per household and one column per category "
+                    f"({', '.join(emissions.CATEGORIES)}). Other columns are kept as-is.")
+        upload = st.file_uploader("Household activity file", type=["csv", "parquet"])
+        if upload is not None and st.button("Score File"):
+            scored = io.BytesIO()
+            try:
+                stats = ingest.score_file(upload, scored)
+                st.success(f"✅ Scored {stats['rows']:,} households in {stats['seconds']:.2f}s "
+                           f"({stats['rows_per_sec']:,.0f} rows/s)")
+                st.download_button("⬇️ Download results (Parquet)", scored.getvalue(),
+                                   file_name="household_emissions.parquet")
+            except Exception as e:
+                st.error(f"🚫 Could not score file: {e}")
+
+    st.subheader("🌱 Tips to Reduce Emissions")
+    with st.expander("💡 Smart Tips"):
+        st.markdown("""
+        - 🚶 Walk, cycle, or carpool for daily travel.
+        - 💡 Use energy-efficient appliances.
+        - 🍽️ Reduce food waste and try plant-based diets.
+        - 🚿 Reduce water waste (shorter showers, fix leaks).
+        - 🌍 Fly less and use alternatives when possible.
+        """)
+    with st.expander("📈 Track Your Progress"):
+        st.markdown("""
+        - 📒 Keep a personal log of your monthly emissions.
+        - 🏆 Set targets (e.g., reduce by 5% every month).
+        - 📉 Measure reduction by comparing breakdowns.
+        """)
@@ -0,0 +1,59 @@
+"""🔍 Eco Search: the offline eco library first, then DuckDuckGo instant answers (cached)."""
+import streamlit as st
+
+from config import SEARCH_LOCAL_MIN_MATCH, SEARCH_LOCAL_MIN_SCORE
+from search import RateLimited
+from services import get_search_client, get_search_index, get_search_prefetcher
+
+SOURCE_LABELS = {"tips": "💡 Tip", "quiz": "❓ Quiz", "policy": "📜 Policy", "web": "🌐 Web"}
+
+
+def render():
+    st.title("🔍 Eco Search")
+
+    query = st.text_input("Search eco-friendly topics:")
+    search_web = st.checkbox("🌐 Always search the web too")
+
+    if st.button("Search"):
+        if not query.strip():
+            st.warning("❗ Please enter a search term.")
+            return
+
+        local = get_search_index().search(query, k=3, min_match=SEARCH_LOCAL_MIN_MATCH)
+        if local:
+            st.markdown("📚 **From the Eco Library:**")
+            for score, doc in local:
+                title = f"[{doc['title']}]({doc['url']})" if doc.get("url") else doc["title"]
+                st.markdown(f"- {SOURCE_LABELS.get(doc['source'], '📄')} **{title}** — {doc['text']}")
+        if not search_web and local and local[0][0] >= SEARCH_LOCAL_MIN_SCORE:
+            return
+
+        with st.spinner("Searching DuckDuckGo..."):
+            try:
+                get_search_prefetcher()
+                search_client = get_search_client()
+                data, source = search_client.get(query)
+
+                abstract = data.get("Abstract", "").strip()
+                related = data.get("RelatedTopics", [])
+
+                if abstract:
+                    st.markdown(f"🔹 **Summary**: {abstract}")
+                elif related:
+                    valid_links = [item for item in related if isinstance(item, dict) and "Text" in item and "FirstURL" in item]
+                    if valid_links:
+                        st.markdown("🔗 **Related Links:**")
+                        for item in valid_links[:5]:
+                            st.markdown(f"- [{item['Text']}]({item['FirstURL']})")
+                    else:
+                        st.info("📭 No relevant information found for your query.")
+                else:
+                    st.info("📭 No relevant information found for your query.")
+
+                st.caption(("⚡ Cached result" if source != "live" else "🌐 Live result") +
+                           f" · search cache hit rate {search_client.hit_rate():.0%}")
+
+            except RateLimited as e:
+                st.warning(f"⏳ {e}")
+            except Exception as e:
+                st.error(f"🚫 Search error: {e}")
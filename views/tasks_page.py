@@ -0,0 +1,230 @@
+"""✅ Tasks & Rewards: daily tasks, quiz, streaks and leaderboards."""
+import random
+import re
+import uuid
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+import memo
+from config import CITIES
+from services import get_task_store
+
+QUIZ_QUESTIONS = [
+    {
+        "question": "Which of the following vehicles has the least carbon emissions?",
+        "options": ["Diesel Car", "Electric Scooter", "Petrol Bike", "Gasoline SUV"],
+        "answer": "Electric Scooter"
+    },
+    {
+        "question": "What gas do plants absorb from the atmosphere?",
+        "options": ["Oxygen", "Nitrogen", "Carbon Dioxide", "Hydrogen"],
+        "answer": "Carbon Dioxide"
+    },
+    {
+        "question": "Which of these is a renewable energy source?",
+        "options": ["Coal", "Solar", "Oil", "Natural Gas"],
+        "answer": "Solar"
+    },
+    {
+        "question": "Which material is NOT biodegradable?",
+        "options": ["Banana Peel", "Plastic Bottle", "Paper", "Cotton Cloth"],
+        "answer": "Plastic Bottle"
+    },
+    {
+        "question": "What is the biggest contributor to climate change?",
+        "options": ["Plastic", "Water Waste", "Greenhouse Gas Emissions", "Noise Pollution"],
+        "answer": "Greenhouse Gas Emissions"
+    },
+    {
+        "question": "Which of these actions helps reduce air pollution?",
+        "options": ["Using public transport", "Burning trash", "Using diesel cars", "Cutting trees"],
+        "answer": "Using public transport"
+    },
+    {
+        "question": "What can you do to conserve water?",
+        "options": ["Leave tap open", "Fix leaking taps", "Use bathtub daily", "Water lawn daily"],
+        "answer": "Fix leaking taps"
+    },
+    {
+        "question": "Which of the following is an eco-friendly habit?",
+        "options": ["Throwing plastic into rivers", "Using reusable bags", "Driving solo daily", "Leaving lights on"],
+        "answer": "Using reusable bags"
+    },
+    {
+        "question": "Which mode of transport is most eco-friendly?",
+        "options": ["Walking", "SUV", "Motorcycle", "Airplane"],
+        "answer": "Walking"
+    },
+    {
+        "question": "What does 'reduce' in the 3Rs mean?",
+        "options": ["Use less", "Throw away", "Recycle more", "Buy more"],
+        "answer": "Use less"
+    }
+]
+QUIZ_LENGTH = 10
+SESSION_ID = re.compile(r"[0-9a-f]{32}")   # app.py's per-session user id, the store key of users without a name
+
+
+@memo.data("quiz")
+def daily_quiz(user, day):
+    """Today's questions in an order fixed per user and day, so answers survive reruns."""
+    return random.Random(f"{user}:{day}").sample(QUIZ_QUESTIONS, QUIZ_LENGTH)
+
+
+@memo.data("user_summary")
+def user_summary(_store, user, day, points):
+    # `points` is only part of the key: the summary is recomputed whenever the user earns points
+    return _store.user_summary(user, day)
+
+
+def public_rows(rows):
+    """Leaderboard rows with session ids replaced by "anonymous #n": anyone who knew one could enter
+    it as a username and take over that visitor's tasks and points."""
+    shown, anonymous = [], 0
+    for user, city, points in rows:
+        if SESSION_ID.fullmatch(user):
+            anonymous += 1
+            user = f"anonymous #{anonymous}"
+        shown.append((user, city, points))
+    return shown
+
+
+@memo.data("leaderboard")
+def leaderboard(_store, limit):
+    return public_rows(_store.leaderboard(limit))
+
+
+@memo.data("leaderboard")
+def city_totals(_store):
+    return _store.city_totals()
+
+
+@memo.section("quiz")
+def quiz_section(store, user, user_city, today):
+    # A fragment: picking an answer reruns only the quiz, not the tasks and leaderboards
+    st.subheader("🌱 Environmental Awareness Quiz (10 Questions)")
+    if st.session_state.quiz_date == today:
+        if st.session_state.pop("quiz_just_scored", False):
+            st.success(f"🎉 You scored {st.session_state.quiz_score} points in today's quiz!")
+        else:
+            st.info(f"✅ You already completed today's quiz. You earned: {st.session_state.quiz_score} points.")
+        return
+
+    user_answers = []
+    for i, q in enumerate(daily_quiz(user, today.isoformat())):
+        st.write(f"**Q{i+1}. {q['question']}**")
+        user_choice = st.radio(q["question"], q["options"], key=f"quiz_q{i}", label_visibility="collapsed")
+        user_answers.append((user_choice, q["answer"]))
+
+    if st.button("Submit Quiz"):
+        score = 0
+        for user_ans, correct_ans in user_answers:
+            if user_ans == correct_ans:
+                score += 2
+        st.session_state.quiz_score = score
+        st.session_state.rewards += score
+        st.session_state.quiz_date = today
+        st.session_state.quiz_just_scored = True
+        store.record_quiz(user, today.isoformat(), score)
+        store.record_event(user, user_city, today.isoformat(), "quiz", score, ref=today.isoformat())
+        st.rerun()   # refresh the rewards and streaks outside this section
+
+
+def render():
+    st.title("✅ Daily Eco Tasks & Quiz")
+
+    # Get today's date
+    today = datetime.now().date()
+
+    store = get_task_store()
+    day = today.isoformat()
+
+    c1, c2 = st.columns(2)
+    # The username is a public handle, not a login: whoever enters the same name shares its progress
+    username = c1.text_input("👤 Username (to keep your progress across visits)",
+                             help="A public name shown on the leaderboard, not a password: anyone who enters "
+                                  "the same name sees and adds to the same tasks and points.")
+    user_city = c2.selectbox("🏙️ Your city", CITIES)
+    user = username.strip().lower() or st.session_state.user_id
+    if st.session_state.get("task_profile") != (user, user_city):
+        store.set_profile(user, user_city)
+        st.session_state.task_profile = (user, user_city)
+
+    # Load today's state when the user or the date changes
+    if st.session_state.get("task_owner") != (user, today):
+        saved = store.load_day(user, day)
+        done = {t["key"]: t["done"] for t in saved["tasks"]}
+        st.session_state.daily_tasks = [
+            {"key": f"daily:{i}", "task": task, "done": done.get(f"daily:{i}", False)}
+            for i, task in enumerate([
+                "Turn off lights when not in use",
+                "Use a reusable water bottle",
+                "Walk or cycle instead of using a car",
+                "Avoid using plastic bags",
+                "Unplug unused devices"
+            ])
+        ]
+        st.session_state.custom_tasks = [t for t in saved["tasks"] if t["custom"]]
+        st.session_state.rewards = store.user_points(user)
+        st.session_state.quiz_score = saved["quiz_score"] or 0
+        st.session_state.quiz_date = today if saved["quiz_score"] is not None else None
+        st.session_state.task_owner = (user, today)
+
+    # Section: Daily Tasks
+    st.header("📝 Today's Eco Tasks")
+
+    st.subheader("📌 Assigned Tasks")
+    for i, task in enumerate(st.session_state.daily_tasks):
+        col1, col2 = st.columns([0.8, 0.2])
+        col1.markdown(f"- {task['task']}")
+        done = col2.checkbox("Done", key=f"daily_task_{user}_{day}_{i}", value=task["done"])
+        if done and not task["done"]:
+            st.session_state.daily_tasks[i]["done"] = True
+            st.session_state.rewards += 1
+            store.save_task(user, day, task["key"], task["task"], False, True)
+            store.record_event(user, user_city, day, "task", 1, ref=task["key"])
+
+    st.subheader("➕ Add Your Own Task")
+    new_task = st.text_input("Enter your own eco task:")
+    if st.button("Add Task") and new_task:
+        # Two sessions sharing a username would both count their own list, so the key can't be a position in it
+        task = {"key": f"custom:{uuid.uuid4().hex}", "task": new_task, "custom": True, "done": False}
+        st.session_state.custom_tasks.append(task)
+        store.save_task(user, day, task["key"], new_task, True, False)
+
+    st.subheader("📋 Custom Task List")
+    for i, task in enumerate(st.session_state.custom_tasks):
+        col1, col2 = st.columns([0.8, 0.2])
+        col1.markdown(f"- {task['task']}")
+        done = col2.checkbox("Done", key=f"custom_task_{user}_{day}_{i}", value=task["done"])
+        if done and not task["done"]:
+            st.session_state.custom_tasks[i]["done"] = True
+            st.session_state.rewards += 1
+            store.save_task(user, day, task["key"], task["task"], True, True)
+            store.record_event(user, user_city, day, "task", 1, ref=task["key"])
+
+    st.markdown("---")
+    quiz_section(store, user, user_city, today)
+
+    # Final reward display
+    st.markdown("---")
+    st.success(f"🏆 Total Rewards Earned: {st.session_state.rewards} points")
+    summary = user_summary(store, user, day, st.session_state.rewards)
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("🔥 Streak", f"{summary['streak']} days", help=f"Best: {summary['best_streak']} days")
+    m2.metric("📅 Today", summary["today"])
+    m3.metric("🗓️ This Week", summary["week"])
+    m4.metric("📆 This Month", summary["month"])
+
+    st.subheader("🏅 Leaderboard")
+    lb1, lb2 = st.columns(2)
+    with lb1:
+        st.markdown("**Top Eco Citizens**")
+        st.dataframe(pd.DataFrame(leaderboard(store, 10), columns=["User", "City", "Points"]),
+                     hide_index=True, width="stretch")
+    with lb2:
+        st.markdown("**Greenest Cities**")
+        st.dataframe(pd.DataFrame(city_totals(store), columns=["City", "Points", "Users"]),
+                     hide_index=True, width="stretch")
@@ -0,0 +1,139 @@
+"""🏙️ Weather: current conditions, observed weather trends and the household emission map."""
+import plotly.express as px
+import pydeck as pdk
+import streamlit as st
+
+import memo
+import telemetry
+import timeseries
+from config import CITIES, CITY_COORDS, EMISSION_MAP_TILE_KM
+from services import get_emission_dataset, get_weather_client, get_weather_history, get_weather_prefetcher
+
+TREND_RESOLUTIONS = {"Daily": "daily", "Hourly": "hourly", "Monthly": "monthly"}
+
+
+@st.cache_resource(max_entries=4)
+def get_emission_deck(version, view):
+    # Rebuilt only when the dataset file changes (version = its mtime)
+    with telemetry.span("chart_build", chart=f"emission_map_{view}"):
+        return _build_emission_deck(view)
+
+
+def _build_emission_deck(view):
+    view_state = pdk.ViewState(latitude=23.6850, longitude=90.3563, zoom=6.0, pitch=40 if view == "grid" else 0)
+    if view == "grid":
+        df_tiles = get_emission_dataset().load_tiles()
+        df_tiles["mean"] = df_tiles["mean"].round(3)
+        layer = pdk.Layer(
+            "GridCellLayer",
+            data=df_tiles,
+            get_position='[lon, lat]',
+            cell_size=EMISSION_MAP_TILE_KM * 1000,
+            get_elevation='count',
+            elevation_scale=200,
+            extruded=True,
+            get_fill_color='[255, 140 - Math.min(mean, 1) * 140, 50, 180]',
+            pickable=True
+        )
+        return pdk.Deck(
+            map_style='mapbox://styles/mapbox/light-v9',
+            layers=[layer],
+            initial_view_state=view_state,
+            tooltip={"text": "{count} households · {mean} t CO₂ per household/month"}
+        )
+    df_emission = get_emission_dataset().load()
+    df_emission["monthly_tons"] = df_emission["monthly_tons"].round(3)
+    layer = pdk.Layer(
+        "ScatterplotLayer",
+        data=df_emission,
+        get_position='[lon, lat]',
+        get_color='[emission * 2, 255 - emission * 2, 50, 160]',
+        get_radius='emission * 100',
+        pickable=True
+    )
+    return pdk.Deck(
+        map_style='mapbox://styles/mapbox/light-v9',
+        layers=[layer],
+        initial_view_state=view_state,
+        tooltip={"text": "{City}: {monthly_tons} t CO₂ per household/month ({households} households)"}
+    )
+
+
+@memo.section("weather_trend")
+def trend_section(city, data):
+    # A fragment: changing the resolution redraws only the trend charts
+    resolution = st.radio("Trend resolution", list(TREND_RESOLUTIONS), horizontal=True)
+    freq = TREND_RESOLUTIONS[resolution]
+    with telemetry.span("timeseries_read", freq=freq):
+        trend = get_weather_history().rollup(city, freq)
+    observed = len(trend) > 1
+    if not observed:
+        # Too little observed history for a line yet: chart the payload's forecast, labelled as one
+        with telemetry.span("dataframe_build", frame="weather_trend"):
+            trend = timeseries.aggregate(timeseries.forecasts(data), freq)
+    trend_df = trend.rename(columns={"ts": "Date", "temp_c_mean": "Temperature", "humidity_mean": "Humidity"})
+    kind = "Historical" if observed else "Forecast"
+
+    st.subheader(f"📈 {kind} Temperature Trend")
+    if observed:
+        st.caption(f"{resolution} averages of {int(trend['count'].sum())} observed readings "
+                   f"since {trend['ts'].min():%b %Y}")
+    else:
+        st.caption(f"Not enough observed history yet: {resolution.lower()} averages of wttr.in's "
+                   f"{int(trend['count'].sum())} forecast slots")
+    with telemetry.span("chart_build", chart="weather_trend"):
+        fig_temp = px.line(trend_df, x="Date", y="Temperature", title=f"{city} Temperature Trend")
+    st.plotly_chart(fig_temp)
+
+    st.subheader(f"💧 {kind} Humidity Trend")
+    with telemetry.span("chart_build", chart="weather_trend"):
+        fig_humid = px.line(trend_df, x="Date", y="Humidity", title=f"{city} Humidity Trend")
+    st.plotly_chart(fig_humid)
+
+
+@memo.section("emission_map")
+def map_section():
+    # A fragment: switching the map view leaves the weather and trend charts alone
+    st.subheader("🗺️ Estimated Carbon Emission by District (Map View)")
+
+    map_view = st.radio("Map view", ["Districts", "Household grid"], horizontal=True)
+    dataset = get_emission_dataset()
+    deck = get_emission_deck(dataset.version(), "grid" if map_view == "Household grid" else "districts")
+    with telemetry.span("chart_render", chart="emission_map"):
+        st.pydeck_chart(deck)
+    if map_view == "Districts":
+        st.caption("Average monthly household emissions submitted from the Emission Calculator; "
+                   "districts without submissions show the default household.")
+    else:
+        st.caption(f"Households that shared their location, in {EMISSION_MAP_TILE_KM} km cells; "
+                   "height is the number of households, colour the average monthly emissions.")
+
+
+def render():
+    st.title("🌍 Carbon Emission Map + Weather Trend")
+
+    selected_city = st.selectbox("Select a city for trend analysis:", CITIES)
+
+    try:
+        # ---- Current Weather ----
+        get_weather_prefetcher()
+        weather_client = get_weather_client()
+        with telemetry.span("weather_fetch"):
+            data = weather_client.get(selected_city)
+        curr = data["current_condition"][0]
+        lat, lon = CITY_COORDS[selected_city]
+        st.success(f"📍 {selected_city}: {curr['temp_C']}°C | {curr['weatherDesc'][0]['value']} | Humidity: {curr['humidity']}%")
+
+        # ---- Historical Weather Trend ----
+        trend_section(selected_city, data)
+
+        # ---- Carbon Emission Map ----
+        map_section()
+
+        stats = weather_client.stats
+        st.caption(f"Weather cache: {stats['hits']} hits · {stats['stale_hits']} stale · "
+                   f"{stats['misses']} misses · {weather_client.hit_rate():.0%} hit rate")
+
+    except Exception as e:
+        st.warning("⚠️ Weather data not available.")
+        st.text(str(e))
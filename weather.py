@@ -0,0 +1,173 @@
+"""wttr.in client with a shared per-city cache (TTL + LRU + stale-while-revalidate)."""
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import telemetry
+
+
+class WeatherClient:
+    def __init__(self, base_url, ttl=600, stale_ttl=3600, max_entries=64,
+                 connect_timeout=3.05, read_timeout=10, pool_size=10, max_per_host=4, on_result=None):
+        self.base_url = base_url
+        self.on_result = on_result    # called with (city, data) after every upstream fetch
+        self.ttl = ttl                # seconds an entry is served as fresh
+        self.stale_ttl = stale_ttl    # seconds an expired entry may still be served while refreshing
+        self.max_entries = max_entries
+        self.timeout = (connect_timeout, read_timeout)
+
+        # One pooled keep-alive session shared by every Streamlit session
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._cache = OrderedDict()   # city -> (fetched_at, data)
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._host_slots = {}         # host -> semaphore capping concurrent upstream requests
+        self.max_per_host = max_per_host
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "errors": 0, "evictions": 0}
+
+    def _host_slot(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_slots[host]
+
+    def _fetch(self, city):
+        url = f"{self.base_url}{quote(city)}"
+        with self._host_slot(url), telemetry.span("upstream", target="wttr"):
+            res = self.session.get(url, params={"format": "j1"}, timeout=self.timeout)
+        res.raise_for_status()
+        return res.json()
+
+    def _store(self, city, data):
+        with self._lock:
+            self._cache[city] = (time.monotonic(), data)
+            self._cache.move_to_end(city)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def refresh(self, city):
+        try:
+            data = self._fetch(city)
+        except Exception:
+            with self._lock:
+                self.stats["errors"] += 1
+            raise
+        self._store(city, data)
+        if self.on_result is not None:
+            try:
+                self.on_result(city, data)
+            except Exception:
+                pass  # a failing listener must not fail the fetch
+        return data
+
+    def _refresh_in_background(self, city):
+        try:
+            self.refresh(city)
+        except Exception:
+            pass  # keep serving the stale copy; the next read retries
+        finally:
+            with self._lock:
+                self._refreshing.discard(city)
+
+    def get(self, city):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(city)
+            if entry is not None:
+                age = now - entry[0]
+                if age < self.ttl:
+                    self._cache.move_to_end(city)
+                    self.stats["hits"] += 1
+                    return entry[1]
+                if age < self.ttl + self.stale_ttl:
+                    self._cache.move_to_end(city)
+                    self.stats["stale_hits"] += 1
+                    if city not in self._refreshing:
+                        self._refreshing.add(city)
+                        threading.Thread(target=self._refresh_in_background, args=(city,), daemon=True).start()
+                    return entry[1]
+            self.stats["misses"] += 1
+        return self.refresh(city)
+
+    def peek(self, city):
+        with self._lock:
+            entry = self._cache.get(city)
+        return None if entry is None else entry[1]
+
+    def hit_rate(self):
+        served = self.stats["hits"] + self.stats["stale_hits"]
+        total = served + self.stats["misses"]
+        return served / total if total else 0.0
+
+
+class WeatherPrefetcher:
+    """Refreshes every city on a schedule so page reads are always cache hits."""
+
+    def __init__(self, client, cities, interval=300, workers=4, base_backoff=5, max_backoff=600):
+        self.client = client
+        self.cities = list(cities)
+        self.interval = interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="weather-prefetch")
+        self._failures = {}      # city -> consecutive failures
+        self._retry_at = {}      # city -> monotonic time before which the city is skipped
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_cycle = {"started": None, "duration": None, "ok": 0, "failed": 0, "skipped": 0}
+
+    def _backoff(self, failures):
+        # Full jitter: spread retries so failing cities do not hit upstream in lockstep
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** (failures - 1)))
+
+    def _refresh(self, city):
+        try:
+            self.client.refresh(city)
+        except Exception:
+            failures = self._failures.get(city, 0) + 1
+            self._failures[city] = failures
+            self._retry_at[city] = time.monotonic() + self._backoff(failures)
+            return False
+        self._failures.pop(city, None)
+        self._retry_at.pop(city, None)
+        return True
+
+    def refresh_all(self):
+        started = time.monotonic()
+        due = [c for c in self.cities if self._retry_at.get(c, 0) <= started]
+        results = list(self._pool.map(self._refresh, due))
+        self.last_cycle = {
+            "started": time.time(),
+            "duration": time.monotonic() - started,
+            "ok": sum(results),
+            "failed": len(results) - sum(results),
+            "skipped": len(self.cities) - len(due),
+        }
+        return self.last_cycle
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh_all()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="weather-prefetcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()